@@ -546,6 +546,43 @@ ENVIRONMENT_SEGMENTS_CACHE_BACKEND = env(
 CACHE_ENVIRONMENT_DOCUMENT_SECONDS = env.int("CACHE_ENVIRONMENT_DOCUMENT_SECONDS", 0)
 ENVIRONMENT_DOCUMENT_CACHE_LOCATION = "environment-documents"
 
+CACHE_DYNAMO_ENVIRONMENT_DOCUMENT_SECONDS = env.int(
+    "CACHE_DYNAMO_ENVIRONMENT_DOCUMENT_SECONDS", 0
+)
+DYNAMO_ENVIRONMENT_DOCUMENT_CACHE_LOCATION = "dynamo-environment-documents"
+
+# The ids of the features with identity overrides in each environment. The cache is
+# cleared whenever they change, so it must be shared by all of the API processes.
+CACHE_IDENTITY_OVERRIDES_SECONDS = env.int("CACHE_IDENTITY_OVERRIDES_SECONDS", 0)
+IDENTITY_OVERRIDES_CACHE_NAME = "identity-overrides"
+IDENTITY_OVERRIDES_CACHE_LOCATION = env.str(
+    "IDENTITY_OVERRIDES_CACHE_LOCATION", IDENTITY_OVERRIDES_CACHE_NAME
+)
+IDENTITY_OVERRIDES_CACHE_BACKEND = env.str(
+    "IDENTITY_OVERRIDES_CACHE_BACKEND",
+    "django.core.cache.backends.db.DatabaseCache",
+)
+
+# The identity integrations (amplitude, segment, etc.) configured for each environment.
+# The cache is cleared whenever they change, so it must be shared by all of the API
+# processes.
+INTEGRATION_MANIFEST_CACHE_NAME = "integration-manifests"
+INTEGRATION_MANIFEST_CACHE_SECONDS = env.int("INTEGRATION_MANIFEST_CACHE_SECONDS", 60)
+INTEGRATION_MANIFEST_CACHE_LOCATION = env.str(
+    "INTEGRATION_MANIFEST_CACHE_LOCATION", INTEGRATION_MANIFEST_CACHE_NAME
+)
+INTEGRATION_MANIFEST_CACHE_BACKEND = env.str(
+    "INTEGRATION_MANIFEST_CACHE_BACKEND",
+    "django.core.cache.backends.db.DatabaseCache",
+)
+
+# Projects for which the identity migration to edge is done are cached for
+# EDGE_MIGRATION_STATUS_CACHE_SECONDS to save a dynamodb lookup per forwarded request
+EDGE_MIGRATION_STATUS_CACHE_SECONDS = env.int(
+    "EDGE_MIGRATION_STATUS_CACHE_SECONDS", 300
+)
+EDGE_MIGRATION_STATUS_CACHE_LOCATION = "edge-migration-status"
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
@@ -574,6 +611,26 @@ CACHES = {
         "LOCATION": ENVIRONMENT_DOCUMENT_CACHE_LOCATION,
         "timeout": CACHE_ENVIRONMENT_DOCUMENT_SECONDS,
     },
+    DYNAMO_ENVIRONMENT_DOCUMENT_CACHE_LOCATION: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": DYNAMO_ENVIRONMENT_DOCUMENT_CACHE_LOCATION,
+        "TIMEOUT": CACHE_DYNAMO_ENVIRONMENT_DOCUMENT_SECONDS,
+    },
+    EDGE_MIGRATION_STATUS_CACHE_LOCATION: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": EDGE_MIGRATION_STATUS_CACHE_LOCATION,
+        "TIMEOUT": EDGE_MIGRATION_STATUS_CACHE_SECONDS,
+    },
+    IDENTITY_OVERRIDES_CACHE_NAME: {
+        "BACKEND": IDENTITY_OVERRIDES_CACHE_BACKEND,
+        "LOCATION": IDENTITY_OVERRIDES_CACHE_LOCATION,
+        "TIMEOUT": CACHE_IDENTITY_OVERRIDES_SECONDS,
+    },
+    INTEGRATION_MANIFEST_CACHE_NAME: {
+        "BACKEND": INTEGRATION_MANIFEST_CACHE_BACKEND,
+        "LOCATION": INTEGRATION_MANIFEST_CACHE_LOCATION,
+        "TIMEOUT": INTEGRATION_MANIFEST_CACHE_SECONDS,
+    },
     GET_FLAGS_ENDPOINT_CACHE_NAME: {
         "BACKEND": GET_FLAGS_ENDPOINT_CACHE_BACKEND,
         "LOCATION": GET_FLAGS_ENDPOINT_CACHE_LOCATION,
@@ -770,9 +827,57 @@ EDGE_API_URL = env.str("EDGE_API_URL", None)
 # Used for signing forwarded request to edge
 EDGE_REQUEST_SIGNING_KEY = env.str("EDGE_REQUEST_SIGNING_KEY", None)
 
+# Requests forwarded to edge are buffered per project for (up to)
+# EDGE_REQUEST_FORWARDING_WINDOW_SECONDS (or until there are
+# EDGE_REQUEST_FORWARDING_MAX_BATCH_SIZE requests) and then sent by a single task.
+# The requests for each identity are sent in order, and those for different
+# identities concurrently.
+EDGE_REQUEST_FORWARDING_WINDOW_SECONDS = env.float(
+    "EDGE_REQUEST_FORWARDING_WINDOW_SECONDS", 1.0
+)
+EDGE_REQUEST_FORWARDING_MAX_BATCH_SIZE = env.int(
+    "EDGE_REQUEST_FORWARDING_MAX_BATCH_SIZE", 100
+)
+
+# The users identified for each identity integration (amplitude, heap, etc.) are
+# buffered for (up to) IDENTITY_INTEGRATION_BATCH_WINDOW_SECONDS (or until there are
+# IDENTITY_INTEGRATION_MAX_BATCH_SIZE users) and then sent to the integration in a
+# single batch. Once IDENTITY_INTEGRATION_MAX_BUFFERED_USERS users are waiting to be
+# sent, any further users are dropped.
+IDENTITY_INTEGRATION_BATCH_WINDOW_SECONDS = env.float(
+    "IDENTITY_INTEGRATION_BATCH_WINDOW_SECONDS", 1.0
+)
+IDENTITY_INTEGRATION_MAX_BATCH_SIZE = env.int(
+    "IDENTITY_INTEGRATION_MAX_BATCH_SIZE", 100
+)
+IDENTITY_INTEGRATION_MAX_BUFFERED_USERS = env.int(
+    "IDENTITY_INTEGRATION_MAX_BUFFERED_USERS", 10000
+)
+
+# Outbound HTTP requests (webhooks, integrations, etc.) share connection pools per
+# host, with at most OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST concurrent connections to
+# each host. Requests submitted to be made in the background are made by a pool of
+# OUTBOUND_HTTP_MAX_WORKERS threads.
+OUTBOUND_HTTP_MAX_WORKERS = env.int("OUTBOUND_HTTP_MAX_WORKERS", 20)
+OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST = env.int(
+    "OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST", 10
+)
+OUTBOUND_HTTP_TIMEOUT_SECONDS = env.float("OUTBOUND_HTTP_TIMEOUT_SECONDS", 10.0)
+OUTBOUND_HTTP_MAX_RETRIES = env.int("OUTBOUND_HTTP_MAX_RETRIES", 2)
+OUTBOUND_HTTP_RETRY_BACKOFF_FACTOR = env.float(
+    "OUTBOUND_HTTP_RETRY_BACKOFF_FACTOR", 0.5
+)
+
 # Aws Event bus used for sending identity migration events
 IDENTITY_MIGRATION_EVENT_BUS_NAME = env.str("IDENTITY_MIGRATION_EVENT_BUS_NAME", None)
 
+# Identities are migrated to dynamodb in ranges of (up to) IDENTITY_MIGRATION_RANGE_SIZE
+# identities, by a pool of worker threads.
+# Migrated ranges are recorded in the project metadata so that a failed migration
+# can be resumed (see the `migrate_to_edge` management command).
+IDENTITY_MIGRATION_RANGE_SIZE = env.int("IDENTITY_MIGRATION_RANGE_SIZE", 50000)
+IDENTITY_MIGRATION_WORKERS = env.int("IDENTITY_MIGRATION_WORKERS", 4)
+
 # Should be a string representing a timezone aware datetime, e.g. 2022-03-31T12:35:00Z
 EDGE_RELEASE_DATETIME = env.datetime("EDGE_RELEASE_DATETIME", None)
 # Note: using django.utils.timezone.now doesn't work reliably in settings so we use
@@ -785,6 +890,25 @@ EDGE_ENABLED = (
 
 DISABLE_WEBHOOKS = env.bool("DISABLE_WEBHOOKS", False)
 
+# Webhooks are delivered by tasks. When using the task processor, failed deliveries
+# are retried up to WEBHOOK_MAX_ATTEMPTS times, waiting
+# WEBHOOK_RETRY_BACKOFF_SECONDS * 2 ^ (attempt - 1) seconds between attempts (the
+# OUTBOUND_HTTP_MAX_RETRIES retries are not used for these deliveries), and at most
+# WEBHOOK_MAX_CONCURRENT_DELIVERIES_PER_ENDPOINT deliveries (per process) are made to
+# the same url at once; further deliveries are delayed by
+# WEBHOOK_THROTTLE_DELAY_SECONDS.
+WEBHOOK_MAX_ATTEMPTS = env.int("WEBHOOK_MAX_ATTEMPTS", 5)
+WEBHOOK_RETRY_BACKOFF_SECONDS = env.float("WEBHOOK_RETRY_BACKOFF_SECONDS", 10.0)
+WEBHOOK_MAX_CONCURRENT_DELIVERIES_PER_ENDPOINT = env.int(
+    "WEBHOOK_MAX_CONCURRENT_DELIVERIES_PER_ENDPOINT", 4
+)
+WEBHOOK_THROTTLE_DELAY_SECONDS = env.float("WEBHOOK_THROTTLE_DELAY_SECONDS", 1.0)
+# If set, the events for each webhook are buffered for WEBHOOK_BATCH_WINDOW_SECONDS
+# (or until there are WEBHOOK_MAX_BATCH_SIZE events) and delivered in a single
+# request, with a payload containing the list of events.
+WEBHOOK_BATCH_WINDOW_SECONDS = env.float("WEBHOOK_BATCH_WINDOW_SECONDS", 0.0)
+WEBHOOK_MAX_BATCH_SIZE = env.int("WEBHOOK_MAX_BATCH_SIZE", 100)
+
 SERVE_FE_ASSETS = os.path.exists(BASE_DIR + "/app/templates/webpack/index.html")
 
 # Used to configure the number of application proxies that the API runs behind
@@ -795,6 +919,29 @@ SAML_USE_NAME_ID_AS_EMAIL = env.bool("SAML_USE_NAME_ID_AS_EMAIL", False)
 # Used to control the size(number of identities) of the project that can be self migrated to edge
 MAX_SELF_MIGRATABLE_IDENTITIES = env.int("MAX_SELF_MIGRATABLE_IDENTITIES", 100000)
 
+# Identity retention settings. Identities with no overrides and no activity for
+# IDENTITY_RETENTION_DAYS are purged by the delete_stale_identities task. Each run
+# deletes at most IDENTITY_RETENTION_MAX_BATCHES batches of IDENTITY_RETENTION_BATCH_SIZE.
+IDENTITY_RETENTION_DAYS = env.int("IDENTITY_RETENTION_DAYS", 0)
+IDENTITY_RETENTION_BATCH_SIZE = env.int("IDENTITY_RETENTION_BATCH_SIZE", 1000)
+IDENTITY_RETENTION_MAX_BATCHES = env.int("IDENTITY_RETENTION_MAX_BATCHES", 100)
+
+# Identity last seen times are buffered in memory by each worker and written to
+# the database at most once per IDENTITY_LAST_SEEN_FLUSH_INTERVAL_SECONDS (or
+# sooner if the buffer holds more than IDENTITY_LAST_SEEN_MAX_BUFFER_SIZE identities).
+IDENTITY_LAST_SEEN_FLUSH_INTERVAL_SECONDS = env.int(
+    "IDENTITY_LAST_SEEN_FLUSH_INTERVAL_SECONDS", 60
+)
+IDENTITY_LAST_SEEN_MAX_BUFFER_SIZE = env.int("IDENTITY_LAST_SEEN_MAX_BUFFER_SIZE", 1000)
+
+# Functions decorated with util.util.postpone (e.g. analytics tracking and
+# integrations) are run in a pool of POSTPONE_EXECUTOR_MAX_WORKERS threads. When more
+# than POSTPONE_EXECUTOR_MAX_QUEUE_SIZE calls are waiting for a thread, further calls
+# are either dropped (DROP) or run in the calling thread (CALLER_RUNS).
+POSTPONE_EXECUTOR_MAX_WORKERS = env.int("POSTPONE_EXECUTOR_MAX_WORKERS", 10)
+POSTPONE_EXECUTOR_MAX_QUEUE_SIZE = env.int("POSTPONE_EXECUTOR_MAX_QUEUE_SIZE", 1000)
+POSTPONE_EXECUTOR_OVERFLOW_POLICY = env.str("POSTPONE_EXECUTOR_OVERFLOW_POLICY", "DROP")
+
 # Setting to allow asynchronous tasks to be run synchronously for testing purposes
 # or in a separate thread for self-hosted users
 TASK_RUN_METHOD = env.enum(
@@ -803,6 +950,22 @@ TASK_RUN_METHOD = env.enum(
 ENABLE_TASK_PROCESSOR_HEALTH_CHECK = env.bool(
     "ENABLE_TASK_PROCESSOR_HEALTH_CHECK", default=False
 )
+# Tasks are leased by a task processor worker while they are run. If the worker
+# dies, the tasks can be run by another worker once the lease has expired, so this
+# should be longer than the longest running task.
+TASK_PROCESSOR_LEASE_SECONDS = env.int("TASK_PROCESSOR_LEASE_SECONDS", 30 * 60)
+
+# If enabled, completed tasks (and, optionally, tasks which have failed too many
+# times to be retried) are deleted, along with their runs, once they are older than
+# the retention period. The runs are summarised (per task and day) before they are
+# deleted. Tasks are deleted in batches, each in its own transaction. This is
+# disabled by default since the deleted task history can't be recovered.
+ENABLE_CLEAN_UP_OLD_TASKS = env.bool("ENABLE_CLEAN_UP_OLD_TASKS", default=False)
+TASK_DELETE_RETENTION_DAYS = env.int("TASK_DELETE_RETENTION_DAYS", default=15)
+TASK_DELETE_BATCH_SIZE = env.int("TASK_DELETE_BATCH_SIZE", default=2000)
+TASK_DELETE_INCLUDE_FAILED_TASKS = env.bool(
+    "TASK_DELETE_INCLUDE_FAILED_TASKS", default=False
+)
 
 # Real time(server sent events) settings
 SSE_SERVER_BASE_URL = env.str("SSE_SERVER_BASE_URL", None)
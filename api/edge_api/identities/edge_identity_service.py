@@ -1,68 +1,63 @@
 import typing
+from datetime import datetime
 
-from django.db.models import Prefetch, Q
+from flag_engine.environments.builders import build_environment_model
+from flag_engine.environments.models import EnvironmentModel
 from flag_engine.features.models import FeatureStateModel
 from flag_engine.identities.models import IdentityModel
+from flag_engine.segments.evaluator import get_identity_segments
+from flag_engine.segments.models import SegmentModel
 
-from environments.identities.models import Identity
-from environments.models import Environment
-from features.models import FeatureState
-from features.multivariate.models import MultivariateFeatureStateValue
+from environments.dynamodb import DynamoEnvironmentWrapper
 
 
-def get_all_feature_states_for_edge_identity(
-    identity: IdentityModel,
-) -> typing.Tuple[
-    typing.List[typing.Union[FeatureState, FeatureStateModel]], typing.Set[str]
-]:
-    """
-    Get all feature states for a flag engine identity model. The list returned by
-    this function contains two distinct types: features.models.FeatureState &
-    flag_engine.features.models.FeatureStateModel.
+class EdgeIdentityFeatureStates(typing.NamedTuple):
+    environment: EnvironmentModel
+    feature_states: typing.List[FeatureStateModel]
+    # Maps the names of the features that are overridden by a segment
+    # to the (highest priority) segment that overrides them
+    segment_overrides: typing.Dict[str, SegmentModel]
+    identity_feature_names: typing.Set[str]
+
 
-    :param identity: the IdentityModel to get the feature states for
-    :return: tuple of (list of feature states, set of feature names that were overridden
-        for the identity specifically)
+def get_edge_identity_feature_states_from_environment_document(
+    identity: IdentityModel, environment_updated_at: datetime = None
+) -> EdgeIdentityFeatureStates:
     """
-    segment_ids = Identity.dynamo_wrapper.get_segment_ids(identity_model=identity)
-    django_environment = Environment.objects.get(api_key=identity.environment_api_key)
+    Get all feature states for a flag engine identity model using only the
+    (cached) environment document, i.e. without querying the database.
 
-    q = Q(identity__isnull=True) & (
-        Q(feature_segment__segment__id__in=segment_ids)
-        | Q(feature_segment__isnull=True)
-    )
-    environment_and_segment_feature_states = (
-        django_environment.feature_states.select_related(
-            "feature",
-            "feature_segment",
-            "feature_segment__segment",
-            "feature_state_value",
-        )
-        .prefetch_related(
-            Prefetch(
-                "multivariate_feature_state_values",
-                queryset=MultivariateFeatureStateValue.objects.select_related(
-                    "multivariate_feature_option"
-                ),
-            )
+    If given, `environment_updated_at` is used to make sure that the cached
+    environment document is not older than the environment.
+    """
+    environment = build_environment_model(
+        DynamoEnvironmentWrapper().get_item_from_cache(
+            identity.environment_api_key, updated_at=environment_updated_at
         )
-        .filter(q)
     )
 
-    feature_states = {}
-    for feature_state in environment_and_segment_feature_states:
-        feature_name = feature_state.feature.name
-        if (
-            feature_name not in feature_states
-            or feature_state > feature_states[feature_name]
-        ):
+    feature_states = {fs.feature.name: fs for fs in environment.feature_states}
+    segment_overrides = {}
+    for segment in get_identity_segments(environment, identity):
+        for feature_state in segment.feature_states:
+            feature_name = feature_state.feature.name
+            if feature_name in feature_states and feature_states[
+                feature_name
+            ].is_higher_segment_priority(feature_state):
+                continue
             feature_states[feature_name] = feature_state
+            segment_overrides[feature_name] = segment
 
-    identity_feature_states = identity.identity_features
     identity_feature_names = set()
-    for identity_feature_state in identity_feature_states:
+    for identity_feature_state in identity.identity_features:
         feature_name = identity_feature_state.feature.name
         feature_states[feature_name] = identity_feature_state
+        segment_overrides.pop(feature_name, None)
         identity_feature_names.add(feature_name)
 
-    return list(feature_states.values()), identity_feature_names
+    return EdgeIdentityFeatureStates(
+        environment=environment,
+        feature_states=list(feature_states.values()),
+        segment_overrides=segment_overrides,
+        identity_feature_names=identity_feature_names,
+    )
@@ -1,17 +1,196 @@
+import atexit
 import json
+import logging
+import threading
+import typing
+from collections import defaultdict
+from concurrent.futures import wait
 
 import requests
 from core.constants import FLAGSMITH_SIGNATURE_HEADER
 from core.signing import sign_payload
 from django.conf import settings
+from django.core.cache import caches
 
 from environments.dynamodb.migrator import IdentityMigrator
 from task_processor.decorators import register_task_handler
+from task_processor.task_run_method import TaskRunMethod
+from util.flusher import BackgroundFlusher
+from util.http import http_dispatcher
+
+logger = logging.getLogger(__name__)
+
+migration_status_cache = caches[settings.EDGE_MIGRATION_STATUS_CACHE_LOCATION]
+
+
+class EdgeRequestForwardingBuffer:
+    """
+    Buffers the requests to forward to the edge api for each project so that
+    requests received within a short window are forwarded by a single task,
+    rather than one task per request.
+
+    A project's requests are flushed once there are `max_size` of them, or else
+    by a single background thread which flushes all the buffered requests every
+    `window_seconds`.
+    """
+
+    def __init__(self, window_seconds: float, max_size: int):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+
+        self._requests: typing.Dict[int, typing.List[dict]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._flusher = BackgroundFlusher(
+            self.flush_all, window_seconds, name="edge-request-forwarding"
+        )
+
+    def add(self, project_id: int, forwarded_request: dict) -> None:
+        with self._lock:
+            self._requests[project_id].append(forwarded_request)
+            should_flush = (
+                not self.window_seconds
+                or len(self._requests[project_id]) >= self.max_size
+            )
+
+        if should_flush:
+            self.flush(project_id)
+        else:
+            self._flusher.ensure_started()
+
+    def flush(self, project_id: int) -> None:
+        with self._lock:
+            forwarded_requests = self._requests.pop(project_id, [])
+
+        if not forwarded_requests:
+            return
+
+        forward_requests.delay(args=(project_id, forwarded_requests))
+
+    def flush_all(self) -> None:
+        with self._lock:
+            project_ids = list(self._requests)
+
+        for project_id in project_ids:
+            self.flush(project_id)
+
+
+edge_request_forwarding_buffer = EdgeRequestForwardingBuffer(
+    window_seconds=settings.EDGE_REQUEST_FORWARDING_WINDOW_SECONDS,
+    max_size=settings.EDGE_REQUEST_FORWARDING_MAX_BATCH_SIZE,
+)
+
+
+@atexit.register
+def _flush_edge_request_forwarding_buffer_on_exit():
+    # tasks run in a separate thread would be killed during interpreter shutdown
+    # so we only flush if the task can be persisted for the task processor
+    if settings.TASK_RUN_METHOD == TaskRunMethod.TASK_PROCESSOR:
+        edge_request_forwarding_buffer.flush_all()
+
+
+def enqueue_identity_request(
+    request_method: str,
+    headers: typing.Mapping[str, str],
+    project_id: int,
+    query_params: dict = None,
+    request_data: dict = None,
+):
+    edge_request_forwarding_buffer.add(
+        project_id,
+        {
+            "path": "identities/",
+            "request_method": request_method,
+            "headers": headers,
+            "query_params": query_params,
+            "payload": request_data,
+        },
+    )
+
+
+def enqueue_trait_request(
+    request_method: str,
+    headers: typing.Mapping[str, str],
+    project_id: int,
+    payload: dict,
+):
+    edge_request_forwarding_buffer.add(
+        project_id,
+        {
+            "path": "traits/",
+            "request_method": request_method,
+            "headers": headers,
+            "payload": payload,
+        },
+    )
+
+
+def enqueue_trait_requests(
+    request_method: str,
+    headers: typing.Mapping[str, str],
+    project_id: int,
+    payload: typing.List[dict],
+):
+    for trait_data in payload:
+        enqueue_trait_request(request_method, headers, project_id, trait_data)
 
 
 def _should_forward(project_id: int) -> bool:
+    # Once a project has been migrated it stays migrated, hence we only
+    # cache the projects for which the migration is done.
+    if migration_status_cache.get(project_id):
+        return True
+
     migrator = IdentityMigrator(project_id)
-    return bool(migrator.is_migration_done)
+    is_migration_done = bool(migrator.is_migration_done)
+    if is_migration_done:
+        migration_status_cache.set(project_id, True)
+    return is_migration_done
+
+
+@register_task_handler()
+def forward_requests(project_id: int, forwarded_requests: typing.List[dict]):
+    if not _should_forward(project_id):
+        return
+
+    # The requests for each identity are sent one after another, so that they are
+    # applied by the edge api in the order they were received, but the requests
+    # for different identities are sent concurrently (the number of concurrent
+    # connections to the edge api is limited by the dispatcher)
+    futures = [
+        http_dispatcher.submit_call(_forward_requests_in_order, identity_requests)
+        for identity_requests in _group_requests_by_identity(forwarded_requests)
+    ]
+    wait(futures)
+
+
+def _group_requests_by_identity(
+    forwarded_requests: typing.List[dict],
+) -> typing.List[typing.List[dict]]:
+    requests_by_identity = defaultdict(list)
+    for forwarded_request in forwarded_requests:
+        requests_by_identity[_get_identifier(forwarded_request)].append(
+            forwarded_request
+        )
+    return list(requests_by_identity.values())
+
+
+def _get_identifier(forwarded_request: dict) -> typing.Optional[str]:
+    data = forwarded_request.get("query_params") or forwarded_request.get("payload")
+    if not isinstance(data, dict):
+        return None
+    if forwarded_request["path"] == "traits/":
+        data = data.get("identity") or {}
+    return data.get("identifier")
+
+
+def _forward_requests_in_order(forwarded_requests: typing.List[dict]):
+    for forwarded_request in forwarded_requests:
+        try:
+            _forward_request(**forwarded_request)
+        except Exception:
+            logger.exception(
+                "Failed to forward request to %s", forwarded_request["path"]
+            )
 
 
 @register_task_handler()
@@ -25,14 +204,9 @@ def forward_identity_request(
     if not _should_forward(project_id):
         return
 
-    url = settings.EDGE_API_URL + "identities/"
-    headers = _get_headers(
-        request_method, headers, json.dumps(request_data) if request_data else ""
+    return _forward_request(
+        "identities/", request_method, headers, query_params, request_data
     )
-    if request_method == "POST":
-        requests.post(url, data=json.dumps(request_data), headers=headers)
-        return
-    return requests.get(url, params=query_params, headers=headers)
 
 
 @register_task_handler()
@@ -51,14 +225,7 @@ def forward_trait_request_sync(
     if not _should_forward(project_id):
         return
 
-    url = settings.EDGE_API_URL + "traits/"
-    payload = payload
-    payload = json.dumps(payload)
-    requests.post(
-        url,
-        data=payload,
-        headers=_get_headers(request_method, headers, payload),
-    )
+    _forward_request("traits/", request_method, headers, payload=payload)
 
 
 @register_task_handler()
@@ -72,6 +239,33 @@ def forward_trait_requests(
         forward_trait_request_sync(request_method, headers, project_id, trait_data)
 
 
+def _forward_request(
+    path: str,
+    request_method: str,
+    headers: dict,
+    query_params: dict = None,
+    payload: dict = None,
+) -> requests.Response:
+    return http_dispatcher.request(
+        **_build_request(path, request_method, headers, query_params, payload)
+    )
+
+
+def _build_request(
+    path: str,
+    request_method: str,
+    headers: dict,
+    query_params: dict = None,
+    payload: dict = None,
+) -> dict:
+    url = settings.EDGE_API_URL + path
+    data = json.dumps(payload) if payload else ""
+    headers = _get_headers(request_method, headers, data)
+    if request_method == "GET":
+        return {"method": "GET", "url": url, "params": query_params, "headers": headers}
+    return {"method": "POST", "url": url, "data": data, "headers": headers}
+
+
 def _get_headers(request_method: str, headers: dict, payload: str = "") -> dict:
     headers = {k: v for k, v in headers.items()}
     # Django by default sets the content-length to "", which in the case of get request(lack of content body)
@@ -60,7 +60,9 @@ from features.permissions import IdentityFeatureStatePermissions
 from projects.exceptions import DynamoNotEnabledError
 from sse import send_identity_update_message
 
-from .edge_identity_service import get_all_feature_states_for_edge_identity
+from .edge_identity_service import (
+    get_edge_identity_feature_states_from_environment_document,
+)
 from .exceptions import TraitPersistenceError
 from .permissions import EdgeIdentityWithIdentifierViewPermissions
 from .tasks import sync_identity_document_features
@@ -274,19 +276,27 @@ class EdgeIdentityFeatureStateViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(responses={200: IdentityAllFeatureStatesSerializer(many=True)})
     @action(detail=False, methods=["GET"])
     def all(self, request, *args, **kwargs):
-        (
-            feature_states,
-            identity_feature_names,
-        ) = get_all_feature_states_for_edge_identity(self.identity)
+        # the (cached) environment is only used to make sure that the cached
+        # environment document isn't older than it, without querying the database
+        environment = Environment.get_from_cache(self.identity.environment_api_key)
+        edge_identity_feature_states = (
+            get_edge_identity_feature_states_from_environment_document(
+                self.identity, environment_updated_at=environment.updated_at
+            )
+        )
 
         serializer = IdentityAllFeatureStatesSerializer(
-            instance=feature_states,
+            instance=edge_identity_feature_states.feature_states,
             many=True,
             context={
                 "request": request,
                 "identity": self.identity,
                 "environment_api_key": self.identity.environment_api_key,
-                "identity_feature_names": identity_feature_names,
+                "environment": edge_identity_feature_states.environment,
+                "identity_feature_names": (
+                    edge_identity_feature_states.identity_feature_names
+                ),
+                "segment_overrides": edge_identity_feature_states.segment_overrides,
             },
         )
 
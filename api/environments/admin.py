@@ -34,5 +34,9 @@ class EnvironmentAdmin(admin.ModelAdmin):
 
     @admin.action(description="Rebuild selected environment documents")
     def rebuild_environments(self, request, queryset):
-        for environment in queryset:
-            rebuild_environment_document.delay(args=(environment.id,))
+        rebuild_environment_document.delay_many(
+            args_list=[
+                (environment_id,)
+                for environment_id in queryset.values_list("id", flat=True)
+            ]
+        )
@@ -1,12 +1,15 @@
 import logging
 import typing
 from contextlib import suppress
+from datetime import datetime
 from typing import Iterable
 
 import boto3
 from boto3.dynamodb.conditions import Key
 from django.conf import settings
+from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils.dateparse import parse_datetime
 from flag_engine.api.document_builders import (
     build_environment_document,
     build_identity_document,
@@ -23,6 +26,8 @@ if typing.TYPE_CHECKING:
 
 logger = logging.getLogger()
 
+environment_document_cache = caches[settings.DYNAMO_ENVIRONMENT_DOCUMENT_CACHE_LOCATION]
+
 
 class DynamoWrapper:
     table_name: str = None
@@ -117,7 +122,10 @@ class DynamoIdentityWrapper(DynamoWrapper):
         return self.query_items(**query_kwargs)
 
     def get_segment_ids(
-        self, identity_pk: str = None, identity_model: IdentityModel = None
+        self,
+        identity_pk: str = None,
+        identity_model: IdentityModel = None,
+        environment_updated_at: datetime = None,
     ) -> list:
         if not (identity_pk or identity_model):
             raise ValueError("Must provide one of identity_pk or identity_model.")
@@ -128,7 +136,9 @@ class DynamoIdentityWrapper(DynamoWrapper):
             )
             environment_wrapper = DynamoEnvironmentWrapper()
             environment = build_environment_model(
-                environment_wrapper.get_item(identity.environment_api_key)
+                environment_wrapper.get_item_from_cache(
+                    identity.environment_api_key, updated_at=environment_updated_at
+                )
             )
             segments = get_identity_segments(environment, identity)
             return [segment.id for segment in segments]
@@ -152,3 +162,17 @@ class DynamoEnvironmentWrapper(DynamoWrapper):
             return self._table.get_item(Key={"api_key": api_key})["Item"]
         except KeyError as e:
             raise ObjectDoesNotExist() from e
+
+    def get_item_from_cache(self, api_key: str, updated_at: datetime = None) -> dict:
+        """
+        Get the environment document from a short lived, in process, cache. If
+        `updated_at` is given, any cached document older than it is ignored.
+        """
+        environment_document = environment_document_cache.get(api_key)
+        if not environment_document or (
+            updated_at
+            and parse_datetime(environment_document["updated_at"]) < updated_at
+        ):
+            environment_document = self.get_item(api_key)
+            environment_document_cache.set(api_key, environment_document)
+        return environment_document
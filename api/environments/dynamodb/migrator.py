@@ -1,4 +1,10 @@
-from django.db.models import Prefetch
+import logging
+import typing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Min, Prefetch
 
 from edge_api.identities.events import send_migration_event
 from environments.identities.models import Identity
@@ -11,6 +17,8 @@ from util.queryset import iterator_with_prefetch
 from .dynamodb_wrapper import DynamoEnvironmentWrapper, DynamoIdentityWrapper
 from .types import DynamoProjectMetadata, ProjectIdentityMigrationStatus
 
+logger = logging.getLogger(__name__)
+
 
 class IdentityMigrator:
     def __init__(self, project_id):
@@ -32,16 +40,27 @@ class IdentityMigrator:
             ProjectIdentityMigrationStatus.MIGRATION_SCHEDULED,
         )
 
+    @property
+    def can_resume(self) -> bool:
+        return (
+            self.migration_status
+            == ProjectIdentityMigrationStatus.MIGRATION_IN_PROGRESS
+        )
+
     def trigger_migration(self):
         # Note: since we mark the project as `migration in progress` before we start the migration,
         # there is a small chance for the project of being stuck in `migration in progress`
         # if the migration event is lost or the task fails.
-        # Since the probability of this happening is low, we don't worry about it.
+        # A migration that failed midway can be resumed using the `migrate_to_edge`
+        # management command with `--resume`.
         send_migration_event(self.project_metadata.id)
         self.project_metadata.trigger_identity_migration()
 
     def migrate(self):
-        self.project_metadata.start_identity_migration()
+        # A migration that is already in progress (e.g. one that failed midway)
+        # is resumed from the identity ranges that haven't been migrated yet
+        if not self.can_resume:
+            self.project_metadata.start_identity_migration()
 
         project_id = self.project_metadata.id
 
@@ -52,9 +71,91 @@ class IdentityMigrator:
         )
         environment_wrapper.write_environments(environments)
 
+        if self.project_metadata.identity_migration_ranges is None:
+            self.project_metadata.set_identity_migration_ranges(
+                self._get_identity_ranges()
+            )
+        self._migrate_identity_ranges(
+            self.project_metadata.pending_identity_migration_ranges
+        )
+        self.project_metadata.finish_identity_migration()
+
+    def _get_identity_ranges(self) -> typing.List[typing.Tuple[int, int]]:
+        """
+        Split the ids of the project's identities into ranges which each hold
+        (up to) IDENTITY_MIGRATION_RANGE_SIZE identities, using keyset pagination
+        over the ids so that sparse ids don't result in (many) empty ranges.
+        """
+        range_size = settings.IDENTITY_MIGRATION_RANGE_SIZE
+        identity_ids = (
+            Identity.objects.filter(environment__project__id=self.project_metadata.id)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        identity_ranges = []
+        range_ids = identity_ids
+        while True:
+            id_range = range_ids[:range_size].aggregate(start=Min("id"), end=Max("id"))
+            if id_range["start"] is None:
+                return identity_ranges
+            identity_ranges.append((id_range["start"], id_range["end"]))
+            range_ids = identity_ids.filter(id__gt=id_range["end"])
+
+    def _migrate_identity_ranges(
+        self, identity_ranges: typing.List[typing.Tuple[int, int]]
+    ):
+        if settings.IDENTITY_MIGRATION_WORKERS <= 1:
+            for start, end in identity_ranges:
+                self._migrate_identity_range(start, end)
+                self.project_metadata.complete_identity_migration_range(start, end)
+            return
+
+        error = None
+        with ThreadPoolExecutor(
+            max_workers=settings.IDENTITY_MIGRATION_WORKERS
+        ) as executor:
+            futures = {
+                executor.submit(self._migrate_identity_range_in_thread, *id_range): (
+                    id_range
+                )
+                for id_range in identity_ranges
+            }
+            for future in as_completed(futures):
+                start, end = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.exception(
+                        "Failed to migrate identities %d-%d of project %d",
+                        start,
+                        end,
+                        self.project_metadata.id,
+                    )
+                    error = error or e
+                    continue
+                self.project_metadata.complete_identity_migration_range(start, end)
+
+        if error:
+            # The ranges that were migrated successfully are persisted above so
+            # that the migration can be resumed from where it failed.
+            raise error
+
+    def _migrate_identity_range_in_thread(self, start: int, end: int):
+        try:
+            self._migrate_identity_range(start, end)
+        finally:
+            # Each thread opens its own database connection
+            connection.close()
+
+    def _migrate_identity_range(self, start: int, end: int):
         identity_wrapper = DynamoIdentityWrapper()
-        identities = (
-            Identity.objects.filter(environment__project__id=project_id)
+        identities = self._get_identities_queryset().filter(id__gte=start, id__lte=end)
+        identity_wrapper.write_identities(iterator_with_prefetch(identities))
+
+    def _get_identities_queryset(self):
+        return (
+            Identity.objects.filter(environment__project__id=self.project_metadata.id)
             .select_related("environment")
             .prefetch_related(
                 "identity_traits",
@@ -72,5 +173,3 @@ class IdentityMigrator:
                 ),
             )
         )
-        identity_wrapper.write_identities(iterator_with_prefetch(identities))
-        self.project_metadata.finish_identity_migration()
@@ -1,8 +1,11 @@
+from datetime import datetime
+
 import pytest
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.exceptions import ObjectDoesNotExist
 from flag_engine.api.document_builders import build_environment_document
 
-from environments.dynamodb import DynamoEnvironmentWrapper
+from environments.dynamodb import DynamoEnvironmentWrapper, dynamodb_wrapper
 from environments.models import Environment
 
 
@@ -59,3 +62,56 @@ def test_get_item_raises_object_does_not_exists_if_get_item_does_not_return_any_
     # Then
     with pytest.raises(ObjectDoesNotExist):
         dynamo_environment_wrapper.get_item(api_key)
+
+
+@pytest.fixture()
+def environment_document_cache(mocker):
+    cache = LocMemCache("test-dynamo-environment-documents", {})
+    cache.clear()
+    mocker.patch.object(dynamodb_wrapper, "environment_document_cache", cache)
+    return cache
+
+
+def test_get_item_from_cache_uses_cached_document(environment_document_cache, mocker):
+    # Given
+    dynamo_environment_wrapper = DynamoEnvironmentWrapper()
+    api_key = "test_key"
+    environment_document = {"api_key": api_key, "updated_at": "2023-01-01T00:00:00"}
+    mocked_get_item = mocker.patch.object(
+        dynamo_environment_wrapper, "get_item", return_value=environment_document
+    )
+
+    # When
+    first_document = dynamo_environment_wrapper.get_item_from_cache(api_key)
+    second_document = dynamo_environment_wrapper.get_item_from_cache(
+        api_key, updated_at=datetime(2022, 12, 31)
+    )
+
+    # Then
+    assert first_document == second_document == environment_document
+    mocked_get_item.assert_called_once_with(api_key)
+
+
+def test_get_item_from_cache_ignores_stale_cached_document(
+    environment_document_cache, mocker
+):
+    # Given
+    dynamo_environment_wrapper = DynamoEnvironmentWrapper()
+    api_key = "test_key"
+    stale_document = {"api_key": api_key, "updated_at": "2023-01-01T00:00:00"}
+    fresh_document = {"api_key": api_key, "updated_at": "2023-01-02T00:00:00"}
+    mocked_get_item = mocker.patch.object(
+        dynamo_environment_wrapper,
+        "get_item",
+        side_effect=[stale_document, fresh_document],
+    )
+    dynamo_environment_wrapper.get_item_from_cache(api_key)
+
+    # When
+    document = dynamo_environment_wrapper.get_item_from_cache(
+        api_key, updated_at=datetime(2023, 1, 2)
+    )
+
+    # Then
+    assert document == fresh_document
+    assert mocked_get_item.call_count == 2
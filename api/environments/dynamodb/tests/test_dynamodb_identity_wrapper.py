@@ -267,7 +267,9 @@ def test_get_segment_ids_returns_correct_segment_ids(
     mocked_environment_wrapper = mocker.patch(
         "environments.dynamodb.dynamodb_wrapper.DynamoEnvironmentWrapper"
     )
-    mocked_environment_wrapper.return_value.get_item.return_value = environment_document
+    mocked_environment_wrapper.return_value.get_item_from_cache.return_value = (
+        environment_document
+    )
 
     # When
     segment_ids = dynamo_identity_wrapper.get_segment_ids(identity_uuid)
@@ -275,8 +277,8 @@ def test_get_segment_ids_returns_correct_segment_ids(
     # Then
     assert segment_ids == [identity_matching_segment.id]
     mocked_get_item_from_uuid.assert_called_with(identity_uuid)
-    mocked_environment_wrapper.return_value.get_item.assert_called_with(
-        environment.api_key
+    mocked_environment_wrapper.return_value.get_item_from_cache.assert_called_with(
+        environment.api_key, updated_at=None
     )
 
 
@@ -336,7 +338,9 @@ def test_get_segment_ids_with_identity_model(identity, environment, mocker):
     mocked_environment_wrapper = mocker.patch(
         "environments.dynamodb.dynamodb_wrapper.DynamoEnvironmentWrapper"
     )
-    mocked_environment_wrapper.return_value.get_item.return_value = environment_document
+    mocked_environment_wrapper.return_value.get_item_from_cache.return_value = (
+        environment_document
+    )
 
     # When
     segment_ids = dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+import pytest
 from pytest_django.asserts import assertQuerysetEqual as assert_queryset_equal
 
 from environments.dynamodb.migrator import IdentityMigrator
@@ -14,19 +17,16 @@ def test_migrate_calls_internal_methods_with_correct_arguments(
 ):
     # Given
     settings.EDGE_RELEASE_DATETIME = None
+    settings.IDENTITY_MIGRATION_WORKERS = 1
 
     assert project.enable_dynamo_db is False
-    mocked_project_metadata = mocker.patch(
-        "environments.dynamodb.migrator.DynamoProjectMetadata"
+    mocked_project_metadata_table = mocker.patch(
+        "environments.dynamodb.types.project_metadata_table"
     )
+    mocked_project_metadata_table.get_item.return_value = {}
     mocked_environment_wrapper = mocker.patch(
         "environments.dynamodb.migrator.DynamoEnvironmentWrapper"
     )
-    mocked_project_metadata_instance = mocker.MagicMock(
-        spec=DynamoProjectMetadata, id=project.id
-    )
-    mocked_project_metadata.get_or_new.return_value = mocked_project_metadata_instance
-
     mocked_identity_wrapper = mocker.patch(
         "environments.dynamodb.migrator.DynamoIdentityWrapper"
     )
@@ -41,25 +41,162 @@ def test_migrate_calls_internal_methods_with_correct_arguments(
 
     args, kwargs = mocked_identity_wrapper.return_value.write_identities.call_args
     assert kwargs == {}
+    assert list(args[0]) == [identity]
 
-    assert_queryset_equal(
-        args[0], Identity.objects.filter(environment__project__id=project.id)
-    )
     # and
     args, kwargs = mocked_environment_wrapper.return_value.write_environments.call_args
     assert kwargs == {}
 
     assert_queryset_equal(args[0], Environment.objects.filter(project_id=project.id))
 
-    # and, Make sure that Project Metadata Wrapper was called correctly
-    mocked_project_metadata.get_or_new.assert_called_with(project.id)
-    mocked_project_metadata_instance.finish_identity_migration.assert_called_once_with()
+    # and, Make sure that Project Metadata was updated correctly
+    mocked_project_metadata_table.get_item.assert_called_with(Key={"id": project.id})
+    assert identity_migrator.project_metadata.identity_migration_ranges == {
+        f"{identity.id}-{identity.id}": True
+    }
+    assert identity_migrator.is_migration_done is True
     project.refresh_from_db()
 
     # and enable dynamodb was updated to True
     assert project.enable_dynamo_db is True
 
 
+def test_migrate_migrates_identities_in_ranges(mocker, project, environment, settings):
+    # Given
+    settings.IDENTITY_MIGRATION_WORKERS = 1
+    settings.IDENTITY_MIGRATION_RANGE_SIZE = 2
+
+    identities = [
+        Identity.objects.create(identifier=f"identity_{i}", environment=environment)
+        for i in range(3)
+    ]
+    first_id, last_id = identities[0].id, identities[-1].id
+
+    mocked_project_metadata_table = mocker.patch(
+        "environments.dynamodb.types.project_metadata_table"
+    )
+    mocked_project_metadata_table.get_item.return_value = {}
+    mocker.patch("environments.dynamodb.migrator.DynamoEnvironmentWrapper")
+    mocked_identity_wrapper = mocker.patch(
+        "environments.dynamodb.migrator.DynamoIdentityWrapper"
+    )
+    written_identities = []
+    mocked_identity_wrapper.return_value.write_identities.side_effect = (
+        lambda identities: written_identities.append(list(identities))
+    )
+
+    identity_migrator = IdentityMigrator(project.id)
+
+    # When
+    identity_migrator.migrate()
+
+    # Then
+    assert written_identities == [identities[:2], identities[2:]]
+    assert identity_migrator.project_metadata.identity_migration_ranges == {
+        f"{first_id}-{first_id + 1}": True,
+        f"{last_id}-{last_id}": True,
+    }
+
+
+def test_get_identity_ranges_splits_sparse_identity_ids_by_number_of_identities(
+    mocker, project, environment, settings
+):
+    # Given
+    settings.IDENTITY_MIGRATION_RANGE_SIZE = 2
+
+    identities = [
+        Identity.objects.create(identifier=f"identity_{i}", environment=environment)
+        for i in range(5)
+    ]
+    # make the ids sparse, i.e. with large gaps between them
+    for i, identity in enumerate(identities):
+        Identity.objects.filter(id=identity.id).update(id=identity.id + i * 100000)
+    ids = sorted(Identity.objects.values_list("id", flat=True))
+
+    mocked_project_metadata_table = mocker.patch(
+        "environments.dynamodb.types.project_metadata_table"
+    )
+    mocked_project_metadata_table.get_item.return_value = {}
+    identity_migrator = IdentityMigrator(project.id)
+
+    # When
+    identity_ranges = identity_migrator._get_identity_ranges()
+
+    # Then
+    assert identity_ranges == [(ids[0], ids[1]), (ids[2], ids[3]), (ids[4], ids[4])]
+
+
+def test_migrate_resumes_migration_in_progress_from_pending_ranges(
+    mocker, project, settings
+):
+    # Given
+    settings.IDENTITY_MIGRATION_WORKERS = 1
+    mocked_project_metadata_table = mocker.patch(
+        "environments.dynamodb.types.project_metadata_table"
+    )
+    mocked_project_metadata_table.get_item.return_value = {
+        "Item": {
+            "id": project.id,
+            "migration_start_time": datetime.now().isoformat(),
+            "identity_migration_ranges": {"1-10": True, "11-20": False},
+        }
+    }
+    mocker.patch("environments.dynamodb.migrator.DynamoEnvironmentWrapper")
+    mocked_migrate_identity_range = mocker.patch.object(
+        IdentityMigrator, "_migrate_identity_range"
+    )
+
+    identity_migrator = IdentityMigrator(project.id)
+
+    # When
+    identity_migrator.migrate()
+
+    # Then
+    mocked_migrate_identity_range.assert_called_once_with(11, 20)
+    assert identity_migrator.project_metadata.identity_migration_ranges == {
+        "1-10": True,
+        "11-20": True,
+    }
+    assert identity_migrator.is_migration_done is True
+
+
+def test_migrate_records_migrated_ranges_if_a_worker_fails(mocker, project, settings):
+    # Given
+    settings.IDENTITY_MIGRATION_WORKERS = 2
+    mocked_project_metadata_table = mocker.patch(
+        "environments.dynamodb.types.project_metadata_table"
+    )
+    mocked_project_metadata_table.get_item.return_value = {
+        "Item": {
+            "id": project.id,
+            "migration_start_time": datetime.now().isoformat(),
+            "identity_migration_ranges": {"1-10": False, "11-20": False},
+        }
+    }
+    mocker.patch("environments.dynamodb.migrator.DynamoEnvironmentWrapper")
+
+    def migrate_identity_range(start, end):
+        if start == 11:
+            raise RuntimeError()
+
+    mocker.patch.object(
+        IdentityMigrator, "_migrate_identity_range", side_effect=migrate_identity_range
+    )
+
+    identity_migrator = IdentityMigrator(project.id)
+
+    # When
+    with pytest.raises(RuntimeError):
+        identity_migrator.migrate()
+
+    # Then
+    assert identity_migrator.project_metadata.identity_migration_ranges == {
+        "1-10": True,
+        "11-20": False,
+    }
+    assert identity_migrator.can_resume is True
+
+
 def test_trigger_migration_calls_internal_methods_with_correct_arguments(
     mocker, project
 ):
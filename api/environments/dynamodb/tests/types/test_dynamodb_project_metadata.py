@@ -1,14 +1,34 @@
 from datetime import datetime
 from decimal import Decimal
 
+import boto3
 import pytest
+from moto import mock_dynamodb
 
+from environments.dynamodb import types
 from environments.dynamodb.types import (
     DynamoProjectMetadata,
     ProjectIdentityMigrationStatus,
 )
 
 
+@pytest.fixture()
+def project_metadata_table(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+    with mock_dynamodb():
+        dynamodb = boto3.resource("dynamodb", region_name="eu-west-2")
+        table = dynamodb.create_table(
+            TableName="project_metadata",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "N"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        monkeypatch.setattr(types, "project_metadata_table", table)
+        yield table
+
+
 def test_get_or_new_returns_instance_with_default_values_if_document_does_not_exists(
     mocker,
 ):
@@ -55,7 +75,7 @@ def test_get_or_new_returns_instance_with_document_data_if_document_does_exists(
     mocked_dynamo_table.get_item.assert_called_with(Key={"id": project_id})
 
 
-def test_start_identity_migration_calls_put_item_with_correct_arguments(mocker):
+def test_start_identity_migration_calls_update_item_with_correct_arguments(mocker):
     # Given
     project_id = 1
 
@@ -75,13 +95,17 @@ def test_start_identity_migration_calls_put_item_with_correct_arguments(mocker):
     project_metadata.start_identity_migration()
     # Then
     mocked_dynamo_table.get_item.assert_called_with(Key={"id": project_id})
-    mocked_dynamo_table.put_item.assert_called_with(
-        Item={
-            "id": project_id,
-            "migration_end_time": None,
-            "migration_start_time": migration_start_time.isoformat(),
-            "triggered_at": None,
-        }
+    mocked_dynamo_table.update_item.assert_called_with(
+        Key={"id": project_id},
+        UpdateExpression="SET #name = :value",
+        ConditionExpression=(
+            "attribute_not_exists(#name) OR attribute_type(#name, :null)"
+        ),
+        ExpressionAttributeNames={"#name": "migration_start_time"},
+        ExpressionAttributeValues={
+            ":value": migration_start_time.isoformat(),
+            ":null": "NULL",
+        },
     )
 
 
@@ -116,7 +140,7 @@ def test_identity_migration_status(instance, status):
     assert instance.identity_migration_status == status
 
 
-def test_finish_identity_migration_calls_put_item_with_correct_arguments(
+def test_finish_identity_migration_calls_update_item_with_correct_arguments(
     mocker,
 ):
     # Given
@@ -138,11 +162,95 @@ def test_finish_identity_migration_calls_put_item_with_correct_arguments(
     project_metadata.finish_identity_migration()
 
     # Then
-    mocked_dynamo_table.put_item.assert_called_with(
+    mocked_dynamo_table.update_item.assert_called_with(
+        Key={"id": project_id},
+        UpdateExpression="SET #name = :value",
+        ConditionExpression=(
+            "attribute_not_exists(#name) OR attribute_type(#name, :null)"
+        ),
+        ExpressionAttributeNames={"#name": "migration_end_time"},
+        ExpressionAttributeValues={
+            ":value": migration_end_time.isoformat(),
+            ":null": "NULL",
+        },
+    )
+
+
+def test_complete_identity_migration_range_keeps_ranges_completed_concurrently(
+    project_metadata_table,
+):
+    # Given
+    project_id = 1
+    project_metadata = DynamoProjectMetadata(id=project_id)
+    project_metadata.start_identity_migration()
+    project_metadata.set_identity_migration_ranges([(1, 10), (11, 20)])
+
+    # a second worker which loaded the metadata before any range was completed
+    other_project_metadata = DynamoProjectMetadata.get_or_new(project_id)
+
+    # When
+    project_metadata.complete_identity_migration_range(1, 10)
+    other_project_metadata.complete_identity_migration_range(11, 20)
+
+    # Then
+    assert DynamoProjectMetadata.get_or_new(project_id).identity_migration_ranges == {
+        "1-10": True,
+        "11-20": True,
+    }
+
+
+def test_set_identity_migration_ranges_keeps_ranges_set_by_another_migration(
+    project_metadata_table,
+):
+    # Given
+    project_id = 1
+    DynamoProjectMetadata(id=project_id).set_identity_migration_ranges([(1, 10)])
+    project_metadata = DynamoProjectMetadata(id=project_id)
+
+    # When
+    project_metadata.set_identity_migration_ranges([(1, 5), (6, 10)])
+
+    # Then
+    assert project_metadata.identity_migration_ranges == {"1-10": False}
+    assert DynamoProjectMetadata.get_or_new(project_id).identity_migration_ranges == {
+        "1-10": False
+    }
+
+
+def test_finish_identity_migration_updates_item_saved_with_null_attributes(
+    project_metadata_table,
+):
+    # Given
+    project_id = 1
+    project_metadata_table.put_item(
         Item={
             "id": project_id,
-            "migration_start_time": migration_start_time,
-            "migration_end_time": migration_end_time.isoformat(),
+            "migration_start_time": datetime.now().isoformat(),
+            "migration_end_time": None,
             "triggered_at": None,
+            "identity_migration_ranges": None,
         }
     )
+    project_metadata = DynamoProjectMetadata.get_or_new(project_id)
+
+    # When
+    project_metadata.finish_identity_migration()
+
+    # Then
+    assert (
+        DynamoProjectMetadata.get_or_new(project_id).identity_migration_status
+        == ProjectIdentityMigrationStatus.MIGRATION_COMPLETED
+    )
+
+
+def test_start_identity_migration_raises_if_started_by_another_migration(
+    project_metadata_table,
+):
+    # Given
+    project_id = 1
+    project_metadata = DynamoProjectMetadata.get_or_new(project_id)
+    DynamoProjectMetadata.get_or_new(project_id).start_identity_migration()
+
+    # When
+    with pytest.raises(AttributeError):
+        project_metadata.start_identity_migration()
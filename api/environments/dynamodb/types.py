@@ -1,8 +1,10 @@
 import enum
-from dataclasses import asdict, dataclass
+import typing
+from dataclasses import dataclass
 from datetime import datetime
 
 import boto3
+from botocore.exceptions import ClientError
 from django.conf import settings
 
 project_metadata_table = None
@@ -29,6 +31,11 @@ class DynamoProjectMetadata:
     migration_start_time: str = None
     migration_end_time: str = None
     triggered_at: str = None
+    # Maps identity id ranges(e.g: "1-1000") to whether or not the identities
+    # in that range have been migrated; used for resuming a failed migration.
+    # Each range holds (up to) IDENTITY_MIGRATION_RANGE_SIZE identities, so the
+    # size of this map is bounded by the number of identities in the project.
+    identity_migration_ranges: typing.Dict[str, bool] = None
 
     @classmethod
     def get_or_new(cls, project_id: int) -> "DynamoProjectMetadata":
@@ -53,19 +60,78 @@ class DynamoProjectMetadata:
         if self.triggered_at:
             raise AttributeError("Migration has already been triggered.")
         self.triggered_at = datetime.now().isoformat()
-        self._save()
+        if not self._set_attribute("triggered_at", self.triggered_at):
+            raise AttributeError("Migration has already been triggered.")
 
     def start_identity_migration(self):
         if self.migration_start_time:
             raise AttributeError("Migration has already been started.")
         self.migration_start_time = datetime.now().isoformat()
-        self._save()
+        if not self._set_attribute("migration_start_time", self.migration_start_time):
+            raise AttributeError("Migration has already been started.")
+
+    @property
+    def pending_identity_migration_ranges(self) -> typing.List[typing.Tuple[int, int]]:
+        return [
+            tuple(int(id_) for id_ in identity_range.split("-"))
+            for identity_range, migrated in (
+                self.identity_migration_ranges or {}
+            ).items()
+            if not migrated
+        ]
+
+    def set_identity_migration_ranges(
+        self, identity_ranges: typing.Iterable[typing.Tuple[int, int]]
+    ):
+        identity_migration_ranges = {
+            f"{start}-{end}": False for start, end in identity_ranges
+        }
+        if self._set_attribute("identity_migration_ranges", identity_migration_ranges):
+            self.identity_migration_ranges = identity_migration_ranges
+        else:
+            # another migration of the project has already set the ranges
+            self.identity_migration_ranges = self.get_or_new(
+                self.id
+            ).identity_migration_ranges
+
+    def complete_identity_migration_range(self, start: int, end: int):
+        identity_range = f"{start}-{end}"
+        # Only the entry for the given range is updated (rather than the whole
+        # item) so that ranges completed concurrently by other workers are kept
+        project_metadata_table.update_item(
+            Key={"id": self.id},
+            UpdateExpression="SET identity_migration_ranges.#range = :migrated",
+            ConditionExpression="attribute_exists(identity_migration_ranges.#range)",
+            ExpressionAttributeNames={"#range": identity_range},
+            ExpressionAttributeValues={":migrated": True},
+        )
+        self.identity_migration_ranges[identity_range] = True
 
     def finish_identity_migration(self):
         if self.migration_end_time:
             raise AttributeError("Migration has already been finished.")
         self.migration_end_time = datetime.now().isoformat()
-        self._save()
+        if not self._set_attribute("migration_end_time", self.migration_end_time):
+            raise AttributeError("Migration has already been finished.")
 
-    def _save(self):
-        return project_metadata_table.put_item(Item=asdict(self))
+    def _set_attribute(self, name: str, value: typing.Any) -> bool:
+        """
+        Set the given attribute of the item, unless it's already set (e.g. by a
+        concurrent migration of the same project). Returns whether it was set.
+        """
+        try:
+            project_metadata_table.update_item(
+                Key={"id": self.id},
+                UpdateExpression="SET #name = :value",
+                # items saved by older versions store unset attributes as null
+                ConditionExpression=(
+                    "attribute_not_exists(#name) OR attribute_type(#name, :null)"
+                ),
+                ExpressionAttributeNames={"#name": name},
+                ExpressionAttributeValues={":value": value, ":null": "NULL"},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return False
+        return True
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class IdentitiesConfig(AppConfig):
     name = "environments.identities"
+
+    def ready(self):
+        from . import tasks  # noqa
@@ -0,0 +1,124 @@
+import atexit
+import logging
+import threading
+import time
+import typing
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+
+from task_processor.task_run_method import TaskRunMethod
+from util.flusher import BackgroundFlusher
+
+logger = logging.getLogger(__name__)
+
+
+class IdentityLastSeenBuffer:
+    """
+    Buffers the identifiers (by environment id) of identities that have been seen
+    by this worker so that we can coalesce them into a single task per environment
+    (and therefore a small number of UPDATE queries) rather than writing to the
+    database on every request. Identities are recorded by identifier, rather than
+    by id, so that they can be recorded without reading them from the database.
+
+    The buffer is flushed once it holds `max_size` identities, and at least every
+    `flush_interval_seconds` by a background thread.
+    """
+
+    def __init__(self, flush_interval_seconds: int, max_size: int):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_size = max_size
+
+        self._identifiers: typing.DefaultDict[int, typing.Set[str]] = defaultdict(set)
+        self._size = 0
+        self._last_flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._flusher = BackgroundFlusher(
+            self.flush_if_due, flush_interval_seconds, name="identity-last-seen"
+        )
+
+    def record(self, environment_id: int, identifier: str) -> None:
+        self._flusher.ensure_started()
+        with self._lock:
+            identifiers = self._identifiers[environment_id]
+            if identifier not in identifiers:
+                identifiers.add(identifier)
+                self._size += 1
+            should_flush = (
+                self._size >= self.max_size
+                or time.monotonic() - self._last_flushed_at
+                >= self.flush_interval_seconds
+            )
+
+        if should_flush:
+            self.flush()
+
+    def flush_if_due(self) -> None:
+        with self._lock:
+            is_due = (
+                time.monotonic() - self._last_flushed_at >= self.flush_interval_seconds
+            )
+        if is_due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            identifiers_by_environment = self._identifiers
+            num_identities = self._size
+            self._identifiers = defaultdict(set)
+            self._size = 0
+            self._last_flushed_at = time.monotonic()
+
+        if not identifiers_by_environment:
+            return
+
+        from environments.identities.tasks import update_identities_last_seen
+
+        logger.debug("Flushing last seen for %d identities.", num_identities)
+        last_seen = timezone.now().isoformat()
+        update_identities_last_seen.delay_many(
+            kwargs_list=[
+                {
+                    "environment_id": environment_id,
+                    "identifiers": sorted(identifiers),
+                    "last_seen": last_seen,
+                }
+                for environment_id, identifiers in sorted(
+                    identifiers_by_environment.items()
+                )
+            ]
+        )
+
+
+identity_last_seen_buffer = IdentityLastSeenBuffer(
+    flush_interval_seconds=settings.IDENTITY_LAST_SEEN_FLUSH_INTERVAL_SECONDS,
+    max_size=settings.IDENTITY_LAST_SEEN_MAX_BUFFER_SIZE,
+)
+
+
+def record_identity_last_seen(view_func: typing.Callable) -> typing.Callable:
+    """
+    Decorator for SDK views which identify the identity using the `identifier`
+    query parameter. The identity is recorded as seen before the view is called so
+    that it is also recorded for responses served from the cache, and so this must
+    be applied outside of any cache decorators.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        identifier = request.GET.get("identifier")
+        if identifier:
+            identity_last_seen_buffer.record(request.environment.id, identifier)
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+@atexit.register
+def _flush_identity_last_seen_buffer_on_exit():
+    # tasks run in a separate thread would be killed during interpreter shutdown
+    # so we only flush if the task can be persisted for the task processor
+    if settings.TASK_RUN_METHOD == TaskRunMethod.TASK_PROCESSOR:
+        identity_last_seen_buffer.flush()
@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from environments.identities.tasks import delete_stale_identities
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete identities with no overrides that have been inactive for longer "
+        "than IDENTITY_RETENTION_DAYS."
+    )
+
+    def handle(self, *args, **options):
+        delete_stale_identities.delay()
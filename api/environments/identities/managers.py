@@ -1,6 +1,32 @@
-from django.db.models import Manager
+from datetime import datetime
+
+from django.db.models import Exists, Manager, OuterRef, Q, QuerySet
 
 
 class IdentityManager(Manager):
     def get_by_natural_key(self, identifier, environment_api_key):
         return self.get(identifier=identifier, environment__api_key=environment_api_key)
+
+    def filter_stale(self, environment_id: int, inactive_since: datetime) -> QuerySet:
+        """
+        Get the identities in the given environment that have no identity overrides
+        and no activity (i.e. creation, being identified or new traits) since
+        `inactive_since`.
+
+        Filtering by environment means that the query can make use of the
+        environment / created_date index.
+        """
+        from environments.identities.traits.models import Trait
+        from features.models import FeatureState
+
+        return self.filter(
+            ~Exists(FeatureState.objects.filter(identity_id=OuterRef("pk"))),
+            ~Exists(
+                Trait.objects.filter(
+                    identity_id=OuterRef("pk"), created_date__gte=inactive_since
+                )
+            ),
+            Q(last_seen__isnull=True) | Q(last_seen__lt=inactive_since),
+            environment_id=environment_id,
+            created_date__lt=inactive_since,
+        )
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.18 on 2026-10-19 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("identities", "0002_alter_identity_index_together"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="identity",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Approximate time this identity was last identified via the SDK.",
+                null=True,
+            ),
+        ),
+    ]
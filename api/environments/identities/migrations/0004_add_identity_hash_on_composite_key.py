@@ -0,0 +1,20 @@
+# Generated by Django 3.2.18 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("identities", "0003_add_identity_last_seen"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="identity",
+            name="hash_on_composite_key",
+            field=models.BooleanField(
+                default=False,
+                help_text="If true, the identity was created using lazy identity persistence and so always uses its composite key for multivariate and percentage split evaluation.",
+            ),
+        ),
+    ]
@@ -16,9 +16,22 @@ from segments.models import Segment
 class Identity(models.Model):
     identifier = models.CharField(max_length=2000)
     created_date = models.DateTimeField("DateCreated", auto_now_add=True)
+    last_seen = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Approximate time this identity was last identified via the SDK.",
+    )
     environment = models.ForeignKey(
         Environment, related_name="identities", on_delete=models.CASCADE
     )
+    hash_on_composite_key = models.BooleanField(
+        default=False,
+        help_text=(
+            "If true, the identity was created using lazy identity persistence and"
+            " so always uses its composite key for multivariate and percentage split"
+            " evaluation."
+        ),
+    )
 
     dynamo_wrapper = DynamoIdentityWrapper()
     objects = IdentityManager()
@@ -42,8 +55,22 @@ class Identity(models.Model):
     def composite_key(self):
         return f"{self.environment.api_key}_{self.identifier}"
 
+    @property
+    def is_transient(self) -> bool:
+        """
+        Transient identities are built (but not stored) for environments using
+        lazy identity persistence and so have no id to evaluate against.
+        """
+        return self.id is None
+
     def get_hash_key(self, use_mv_v2_evaluation: bool = False) -> str:
-        return self.composite_key if use_mv_v2_evaluation else str(self.id)
+        # identities created using lazy identity persistence have no id until
+        # they are stored, so they always hash on the composite key so that their
+        # evaluation doesn't change once they are stored. Other identities keep
+        # hashing on their id, regardless of the environment's current setting.
+        if use_mv_v2_evaluation or self.hash_on_composite_key:
+            return self.composite_key
+        return str(self.id)
 
     def get_all_feature_states(self, traits: typing.List[Trait] = None):
         """
@@ -62,7 +89,6 @@ class Identity(models.Model):
 
         # define sub queries
         belongs_to_environment_query = Q(environment=self.environment)
-        overridden_for_identity_query = Q(identity=self)
         overridden_for_segment_query = Q(
             feature_segment__segment__in=segments,
             feature_segment__environment=self.environment,
@@ -72,15 +98,21 @@ class Identity(models.Model):
             live_from__lte=timezone.now(), version__isnull=False
         )
 
+        overrides_query = overridden_for_segment_query | environment_default_query
+        if not self.is_transient:
+            # transient identities can't have any identity overrides, for others we
+            # only need to look for overrides for features that have any
+            feature_ids_with_identity_overrides = (
+                self.environment.get_feature_ids_with_identity_overrides()
+            )
+            if feature_ids_with_identity_overrides:
+                overrides_query |= Q(
+                    identity=self, feature_id__in=feature_ids_with_identity_overrides
+                )
+
         # define the full query
         full_query = (
-            only_live_versions_query
-            & belongs_to_environment_query
-            & (
-                overridden_for_identity_query
-                | overridden_for_segment_query
-                | environment_default_query
-            )
+            only_live_versions_query & belongs_to_environment_query & overrides_query
         )
 
         select_related_args = [
@@ -145,6 +177,33 @@ class Identity(models.Model):
 
         return matching_segments
 
+    @classmethod
+    def get_or_build(
+        cls, identifier: str, environment: Environment, queryset: models.QuerySet = None
+    ) -> typing.Tuple["Identity", bool]:
+        """
+        Equivalent of `get_or_create` that respects the environment's
+        `lazy_identity_persistence` setting, returning an unsaved (transient)
+        identity rather than creating one if it doesn't exist yet.
+
+        :return: tuple of (identity, whether the identity is new)
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        if not environment.lazy_identity_persistence:
+            return queryset.get_or_create(
+                identifier=identifier, environment=environment
+            )
+
+        identity = queryset.filter(
+            identifier=identifier, environment=environment
+        ).first()
+        if identity:
+            return identity, False
+        transient_identity = cls(
+            identifier=identifier, environment=environment, hash_on_composite_key=True
+        )
+        return transient_identity, True
+
     def get_all_user_traits(self):
         # this is pointless, we should probably replace all uses with the below code
         return self.identity_traits.all()
@@ -30,8 +30,8 @@ class IdentitySerializerFull(serializers.ModelSerializer):
 class IdentitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Identity
-        fields = ("id", "identifier", "environment")
-        read_only_fields = ("id", "environment")
+        fields = ("id", "identifier", "environment", "last_seen")
+        read_only_fields = ("id", "environment", "last_seen")
 
     def save(self, **kwargs):
         environment = kwargs.get("environment")
@@ -107,9 +107,9 @@ class IdentityAllFeatureStatesSerializer(serializers.Serializer):
         self, instance: typing.Union[FeatureState, FeatureStateModel]
     ) -> typing.Union[str, int, bool]:
         identity = self.context["identity"]
-        environment_api_key = self.context["environment_api_key"]
-
-        environment = Environment.get_from_cache(environment_api_key)
+        environment = self.context.get("environment") or Environment.get_from_cache(
+            self.context["environment_api_key"]
+        )
         hash_key = identity.get_hash_key(environment.use_mv_v2_evaluation)
 
         if isinstance(instance, FeatureState):
@@ -118,7 +118,11 @@ class IdentityAllFeatureStatesSerializer(serializers.Serializer):
         return instance.get_value(hash_key)
 
     def get_overridden_by(self, instance) -> typing.Optional[str]:
-        if getattr(instance, "feature_segment_id", None) is not None:
+        if getattr(
+            instance, "feature_segment_id", None
+        ) is not None or instance.feature.name in self.context.get(
+            "segment_overrides", {}
+        ):
             return "SEGMENT"
         elif getattr(
             instance, "identity_id", None
@@ -134,4 +138,7 @@ class IdentityAllFeatureStatesSerializer(serializers.Serializer):
             return IdentityAllFeatureStatesSegmentSerializer(
                 instance=instance.feature_segment.segment
             ).data
+        segment = self.context.get("segment_overrides", {}).get(instance.feature.name)
+        if segment:
+            return IdentityAllFeatureStatesSegmentSerializer(instance=segment).data
         return None
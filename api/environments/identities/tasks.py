@@ -0,0 +1,60 @@
+import logging
+import typing
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from environments.identities.models import Identity
+from environments.models import Environment
+from task_processor.decorators import register_task_handler
+
+logger = logging.getLogger(__name__)
+
+
+@register_task_handler()
+def delete_stale_identities():
+    if not settings.IDENTITY_RETENTION_DAYS:
+        logger.debug("Identity retention not configured, not deleting identities.")
+        return
+
+    inactive_since = timezone.now() - timedelta(days=settings.IDENTITY_RETENTION_DAYS)
+    batch_size = settings.IDENTITY_RETENTION_BATCH_SIZE
+    remaining_batches = settings.IDENTITY_RETENTION_MAX_BATCHES
+    num_deleted = 0
+
+    for environment_id in Environment.objects.values_list("id", flat=True):
+        while remaining_batches > 0:
+            identity_ids = list(
+                Identity.objects.filter_stale(environment_id, inactive_since)
+                .order_by("created_date")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not identity_ids:
+                break
+
+            Identity.objects.filter(id__in=identity_ids).delete()
+            num_deleted += len(identity_ids)
+            remaining_batches -= 1
+
+            if len(identity_ids) < batch_size:
+                break
+
+    logger.info("Deleted %d identities inactive since %s.", num_deleted, inactive_since)
+
+
+@register_task_handler()
+def update_identities_last_seen(
+    environment_id: int, identifiers: typing.List[str], last_seen: str
+):
+    last_seen = parse_datetime(last_seen)
+    batch_size = settings.IDENTITY_LAST_SEEN_MAX_BUFFER_SIZE
+
+    # note that identifiers of identities which haven't been stored (when using
+    # lazy identity persistence) won't match any identities
+    for start in range(0, len(identifiers), batch_size):
+        end = start + batch_size
+        Identity.objects.filter(
+            environment_id=environment_id, identifier__in=identifiers[start:end]
+        ).update(last_seen=last_seen)
@@ -712,9 +712,9 @@ class SDKIdentitiesTestCase(APITestCase):
         mock_send_identity_update_message.assert_not_called()
 
     @override_settings(EDGE_API_URL="http://localhost")
-    @mock.patch("environments.identities.views.forward_identity_request")
-    def test_post_identities_calls_forward_identity_request_with_correct_arguments(
-        self, mocked_forward_identity_request
+    @mock.patch("environments.identities.views.enqueue_identity_request")
+    def test_post_identities_calls_enqueue_identity_request_with_correct_arguments(
+        self, mocked_enqueue_identity_request
     ):
         # Given
         url = reverse("api-v1:sdk-identities")
@@ -731,18 +731,17 @@ class SDKIdentitiesTestCase(APITestCase):
         self.client.post(url, data=json.dumps(data), content_type="application/json")
 
         # Then
-        args, kwargs = mocked_forward_identity_request.delay.call_args_list[0]
-        assert args == ()
-        assert kwargs["args"][0] == "POST"
-        assert kwargs["args"][1].get("X-Environment-Key") == self.environment.api_key
-        assert kwargs["args"][2] == self.environment.project.id
+        args, kwargs = mocked_enqueue_identity_request.call_args_list[0]
+        assert args[0] == "POST"
+        assert args[1].get("X-Environment-Key") == self.environment.api_key
+        assert args[2] == self.environment.project.id
 
-        assert kwargs["kwargs"]["request_data"] == data
+        assert kwargs["request_data"] == data
 
     @override_settings(EDGE_API_URL="http://localhost")
-    @mock.patch("environments.identities.views.forward_identity_request")
-    def test_get_identities_calls_forward_identity_request_with_correct_arguments(
-        self, mocked_forward_identity_request
+    @mock.patch("environments.identities.views.enqueue_identity_request")
+    def test_get_identities_calls_enqueue_identity_request_with_correct_arguments(
+        self, mocked_enqueue_identity_request
     ):
         # Given
         base_url = reverse("api-v1:sdk-identities")
@@ -752,15 +751,12 @@ class SDKIdentitiesTestCase(APITestCase):
         self.client.get(url)
 
         # Then
-        args, kwargs = mocked_forward_identity_request.delay.call_args_list[0]
-        assert args == ()
-        assert kwargs["args"][0] == "GET"
-        assert kwargs["args"][1].get("X-Environment-Key") == self.environment.api_key
-        assert kwargs["args"][2] == self.environment.project.id
-
-        assert kwargs["kwargs"]["query_params"] == {
-            "identifier": self.identity.identifier
-        }
+        args, kwargs = mocked_enqueue_identity_request.call_args_list[0]
+        assert args[0] == "GET"
+        assert args[1].get("X-Environment-Key") == self.environment.api_key
+        assert args[2] == self.environment.project.id
+
+        assert kwargs["query_params"] == {"identifier": self.identity.identifier}
 
     def test_post_identities_with_traits_fails_if_client_cannot_set_traits(self):
         # Given
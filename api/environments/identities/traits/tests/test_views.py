@@ -475,9 +475,9 @@ class SDKTraitsTest(APITestCase):
         )
 
     @override_settings(EDGE_API_URL="http://localhost")
-    @mock.patch("environments.identities.traits.views.forward_trait_request")
-    def test_post_trait_calls_forward_trait_request_with_correct_arguments(
-        self, mocked_forward_trait_request
+    @mock.patch("environments.identities.traits.views.enqueue_trait_request")
+    def test_post_trait_calls_enqueue_trait_request_with_correct_arguments(
+        self, mocked_enqueue_trait_request
     ):
         # Given
         url = reverse("api-v1:sdk-traits-list")
@@ -487,17 +487,16 @@ class SDKTraitsTest(APITestCase):
         self.client.post(url, data=data, content_type=self.JSON)
 
         # Then
-        args, kwargs = mocked_forward_trait_request.delay.call_args_list[0]
-        assert args == ()
-        assert kwargs["args"][0] == "POST"
-        assert kwargs["args"][1].get("X-Environment-Key") == self.environment.api_key
-        assert kwargs["args"][2] == self.environment.project.id
-        assert kwargs["args"][3] == json.loads(data)
+        args, kwargs = mocked_enqueue_trait_request.call_args_list[0]
+        assert args[0] == "POST"
+        assert args[1].get("X-Environment-Key") == self.environment.api_key
+        assert args[2] == self.environment.project.id
+        assert args[3] == json.loads(data)
 
     @override_settings(EDGE_API_URL="http://localhost")
-    @mock.patch("environments.identities.traits.views.forward_trait_request")
-    def test_increment_value_calls_forward_trait_request_with_correct_arguments(
-        self, mocked_forward_trait_request
+    @mock.patch("environments.identities.traits.views.enqueue_trait_request")
+    def test_increment_value_calls_enqueue_trait_request_with_correct_arguments(
+        self, mocked_enqueue_trait_request
     ):
         # Given
         url = reverse("api-v1:sdk-traits-increment-value")
@@ -511,21 +510,20 @@ class SDKTraitsTest(APITestCase):
         self.client.post(url, data=data)
 
         # Then
-        args, kwargs = mocked_forward_trait_request.delay.call_args_list[0]
-        assert args == ()
-        assert kwargs["args"][0] == "POST"
-        assert kwargs["args"][1].get("X-Environment-Key") == self.environment.api_key
-        assert kwargs["args"][2] == self.environment.project.id
+        args, kwargs = mocked_enqueue_trait_request.call_args_list[0]
+        assert args[0] == "POST"
+        assert args[1].get("X-Environment-Key") == self.environment.api_key
+        assert args[2] == self.environment.project.id
 
         # and the structure of payload was correct
-        assert kwargs["args"][3]["identity"]["identifier"] == data["identifier"]
-        assert kwargs["args"][3]["trait_key"] == data["trait_key"]
-        assert kwargs["args"][3]["trait_value"]
+        assert args[3]["identity"]["identifier"] == data["identifier"]
+        assert args[3]["trait_key"] == data["trait_key"]
+        assert args[3]["trait_value"]
 
     @override_settings(EDGE_API_URL="http://localhost")
-    @mock.patch("environments.identities.traits.views.forward_trait_requests")
-    def test_bulk_create_traits_calls_forward_trait_request_with_correct_arguments(
-        self, mocked_forward_trait_requests
+    @mock.patch("environments.identities.traits.views.enqueue_trait_requests")
+    def test_bulk_create_traits_calls_enqueue_trait_request_with_correct_arguments(
+        self, mocked_enqueue_trait_requests
     ):
         # Given
         url = reverse("api-v1:sdk-traits-bulk-create")
@@ -550,12 +548,11 @@ class SDKTraitsTest(APITestCase):
         # Then
 
         # Then
-        args, kwargs = mocked_forward_trait_requests.delay.call_args_list[0]
-        assert args == ()
-        assert kwargs["args"][0] == "PUT"
-        assert kwargs["args"][1].get("X-Environment-Key") == self.environment.api_key
-        assert kwargs["args"][2] == self.environment.project.id
-        assert kwargs["args"][3] == request_data
+        args, kwargs = mocked_enqueue_trait_requests.call_args_list[0]
+        assert args[0] == "PUT"
+        assert args[1].get("X-Environment-Key") == self.environment.api_key
+        assert args[2] == self.environment.project.id
+        assert args[3] == request_data
 
     def test_create_trait_returns_403_if_client_cannot_set_traits(self):
         # Given
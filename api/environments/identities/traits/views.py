@@ -10,8 +10,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from edge_api.identities.edge_request_forwarder import (
-    forward_trait_request,
-    forward_trait_requests,
+    enqueue_trait_request,
+    enqueue_trait_requests,
 )
 from environments.authentication import EnvironmentKeyAuthentication
 from environments.identities.models import Identity
@@ -223,13 +223,11 @@ class SDKTraits(mixins.CreateModelMixin, viewsets.GenericViewSet):
         response = super(SDKTraits, self).create(request, *args, **kwargs)
         response.status_code = status.HTTP_200_OK
         if settings.EDGE_API_URL and request.environment.project.enable_dynamo_db:
-            forward_trait_request.delay(
-                args=(
-                    request.method,
-                    dict(request.headers),
-                    request.environment.project.id,
-                    request.data,
-                )
+            enqueue_trait_request(
+                request.method,
+                request.headers,
+                request.environment.project.id,
+                request.data,
             )
 
         return response
@@ -248,13 +246,11 @@ class SDKTraits(mixins.CreateModelMixin, viewsets.GenericViewSet):
             # Convert the payload to the structure expected by /traits
             payload = serializer.data.copy()
             payload.update({"identity": {"identifier": payload.pop("identifier")}})
-            forward_trait_request.delay(
-                args=(
-                    request.method,
-                    dict(request.headers),
-                    request.environment.project.id,
-                    payload,
-                )
+            enqueue_trait_request(
+                request.method,
+                request.headers,
+                request.environment.project.id,
+                payload,
             )
 
         return Response(serializer.data, status=200)
@@ -289,13 +285,11 @@ class SDKTraits(mixins.CreateModelMixin, viewsets.GenericViewSet):
             serializer.save()
 
             if settings.EDGE_API_URL and request.environment.project.enable_dynamo_db:
-                forward_trait_requests.delay(
-                    args=(
-                        request.method,
-                        dict(request.headers),
-                        request.environment.project.id,
-                        request.data,
-                    )
+                enqueue_trait_requests(
+                    request.method,
+                    request.headers,
+                    request.environment.project.id,
+                    request.data,
                 )
 
             send_identity_update_messages(
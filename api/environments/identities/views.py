@@ -9,7 +9,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from app.pagination import CustomPagination
-from edge_api.identities.edge_request_forwarder import forward_identity_request
+from edge_api.identities.edge_request_forwarder import enqueue_identity_request
+from environments.identities.last_seen import (
+    identity_last_seen_buffer,
+    record_identity_last_seen,
+)
 from environments.identities.models import Identity
 from environments.identities.serializers import (
     IdentitySerializer,
@@ -28,10 +32,7 @@ from environments.sdk.serializers import (
     IdentitySerializerWithTraitsAndSegments,
 )
 from features.serializers import FeatureStateSerializerFull
-from integrations.integration import (
-    IDENTITY_INTEGRATIONS,
-    identify_integrations,
-)
+from integrations.integration import identify_integrations
 from sse.decorators import generate_identity_update_message
 from util.views import SDKAPIView
 
@@ -153,6 +154,7 @@ class SDKIdentities(SDKAPIView):
         query_serializer=SDKIdentitiesQuerySerializer(),
         operation_id="identify_user",
     )
+    @method_decorator(record_identity_last_seen)
     @method_decorator(
         cache_page(
             timeout=settings.GET_IDENTITIES_ENDPOINT_CACHE_SECONDS,
@@ -166,26 +168,20 @@ class SDKIdentities(SDKAPIView):
                 {"detail": "Missing identifier"}
             )  # TODO: add 400 status - will this break the clients?
 
-        identity, _ = (
-            Identity.objects.select_related(
-                "environment",
-                "environment__project",
-                *[
-                    f"environment__{integration['relation_name']}"
-                    for integration in IDENTITY_INTEGRATIONS
-                ],
-            )
-            .prefetch_related("identity_traits")
-            .get_or_create(identifier=identifier, environment=request.environment)
+        identity, _ = Identity.get_or_build(
+            identifier=identifier,
+            environment=request.environment,
+            queryset=Identity.objects.select_related(
+                "environment", "environment__project"
+            ).prefetch_related("identity_traits"),
         )
+
         if settings.EDGE_API_URL and request.environment.project.enable_dynamo_db:
-            forward_identity_request.delay(
-                args=(
-                    request.method,
-                    dict(request.headers),
-                    request.environment.project.id,
-                ),
-                kwargs={"query_params": request.GET.dict()},
+            enqueue_identity_request(
+                request.method,
+                request.headers,
+                request.environment.project.id,
+                query_params=request.GET.dict(),
             )
 
         feature_name = request.query_params.get("feature")
@@ -217,14 +213,16 @@ class SDKIdentities(SDKAPIView):
         serializer.is_valid(raise_exception=True)
         instance = serializer.save()
 
+        identity_last_seen_buffer.record(
+            request.environment.id, instance["identity"].identifier
+        )
+
         if settings.EDGE_API_URL and request.environment.project.enable_dynamo_db:
-            forward_identity_request.delay(
-                args=(
-                    request.method,
-                    dict(request.headers),
-                    request.environment.project.id,
-                ),
-                kwargs={"request_data": request.data},
+            enqueue_identity_request(
+                request.method,
+                request.headers,
+                request.environment.project.id,
+                request_data=request.data,
             )
 
         # we need to serialize the response again to ensure that the
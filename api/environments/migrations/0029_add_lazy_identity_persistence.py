@@ -0,0 +1,28 @@
+# Generated by Django 3.2.18 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("environments", "0028_add_use_mv_v2_evaluation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="environment",
+            name="lazy_identity_persistence",
+            field=models.BooleanField(
+                default=False,
+                help_text="If true, identities requested via the SDK are evaluated transiently and only stored once they have persisted traits or an identity override.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicalenvironment",
+            name="lazy_identity_persistence",
+            field=models.BooleanField(
+                default=False,
+                help_text="If true, identities requested via the SDK are evaluated transiently and only stored once they have persisted traits or an identity override.",
+            ),
+        ),
+    ]
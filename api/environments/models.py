@@ -50,6 +50,7 @@ logger = logging.getLogger(__name__)
 environment_cache = caches[settings.ENVIRONMENT_CACHE_NAME]
 environment_document_cache = caches[settings.ENVIRONMENT_DOCUMENT_CACHE_LOCATION]
 environment_segments_cache = caches[settings.ENVIRONMENT_SEGMENTS_CACHE_NAME]
+identity_overrides_cache = caches[settings.IDENTITY_OVERRIDES_CACHE_NAME]
 
 # Intialize the dynamo environment wrapper globaly
 environment_wrapper = DynamoEnvironmentWrapper()
@@ -112,6 +113,13 @@ class Environment(
             " local and server side mode)"
         ),
     )
+    lazy_identity_persistence = models.BooleanField(
+        default=False,
+        help_text=(
+            "If true, identities requested via the SDK are evaluated transiently and"
+            " only stored once they have persisted traits or an identity override."
+        ),
+    )
 
     objects = EnvironmentManager()
 
@@ -184,13 +192,11 @@ class Environment(
 
             environment = environment_cache.get(api_key)
             if not environment:
+                # note that the identity integrations are retrieved using
+                # integrations.integration.get_integration_manifest
                 select_related_args = (
                     "project",
                     "project__organisation",
-                    "mixpanel_config",
-                    "segment_config",
-                    "amplitude_config",
-                    "heap_config",
                     "dynatrace_config",
                 )
                 environment = (
@@ -281,6 +287,32 @@ class Environment(
             environment_segments_cache.set(self.id, segments)
         return segments
 
+    def get_feature_ids_with_identity_overrides(self) -> typing.FrozenSet[int]:
+        """
+        Get the ids of the features which have identity overrides in the environment.
+
+        The ids are cached for CACHE_IDENTITY_OVERRIDES_SECONDS (if set), and the
+        cache is cleared whenever a feature gains its first, or loses its last,
+        identity override (see features.models.IdentityOverrideCount).
+        """
+        if settings.CACHE_IDENTITY_OVERRIDES_SECONDS <= 0:
+            return self._get_feature_ids_with_identity_overrides_from_db()
+
+        feature_ids = identity_overrides_cache.get(str(self.id))
+        if feature_ids is None:
+            feature_ids = self._get_feature_ids_with_identity_overrides_from_db()
+            identity_overrides_cache.set(
+                str(self.id),
+                feature_ids,
+                timeout=settings.CACHE_IDENTITY_OVERRIDES_SECONDS,
+            )
+        return feature_ids
+
+    def _get_feature_ids_with_identity_overrides_from_db(self) -> typing.FrozenSet[int]:
+        return frozenset(
+            self.identity_override_counts.values_list("feature_id", flat=True)
+        )
+
     @classmethod
     def get_environment_document(cls, api_key: str) -> dict:
         if settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS > 0:
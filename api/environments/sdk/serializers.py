@@ -125,13 +125,20 @@ class IdentifyWithTraitsSerializer(serializers.Serializer):
         (optionally store traits if flag set on org)
         """
         environment = self.context["environment"]
-        identity, created = Identity.objects.get_or_create(
-            identifier=self.validated_data["identifier"], environment=environment
-        )
-
         trait_data_items = self.validated_data.get("traits", [])
+        persist_trait_data = environment.project.organisation.persist_trait_data
+
+        if persist_trait_data and trait_data_items:
+            # we're going to store traits so the identity must be persisted too
+            identity, created = Identity.objects.get_or_create(
+                identifier=self.validated_data["identifier"], environment=environment
+            )
+        else:
+            identity, created = Identity.get_or_build(
+                identifier=self.validated_data["identifier"], environment=environment
+            )
 
-        if not created and environment.project.organisation.persist_trait_data:
+        if not created and persist_trait_data:
             # if this is an update and we're persisting traits, then we need to
             # partially update any traits and return the full list
             trait_models = identity.update_traits(trait_data_items)
@@ -139,7 +146,7 @@ class IdentifyWithTraitsSerializer(serializers.Serializer):
             # generate traits for the identity and store them if configured to do so
             trait_models = identity.generate_traits(
                 trait_data_items,
-                persist=environment.project.organisation.persist_trait_data,
+                persist=persist_trait_data,
             )
 
         all_feature_states = identity.get_all_feature_states(traits=trait_models)
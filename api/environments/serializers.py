@@ -44,6 +44,7 @@ class EnvironmentSerializerLight(serializers.ModelSerializer):
             "banner_colour",
             "hide_disabled_flags",
             "use_mv_v2_evaluation",
+            "lazy_identity_persistence",
         )
 
 
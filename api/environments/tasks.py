@@ -1,9 +1,12 @@
 from environments.dynamodb import DynamoEnvironmentWrapper
 from environments.models import Environment
 from task_processor.decorators import register_task_handler
+from task_processor.models import TaskPriority
 
 
-@register_task_handler()
+@register_task_handler(
+    priority=TaskPriority.HIGH, coalesce_key=lambda environment_id: str(environment_id)
+)
 def rebuild_environment_document(environment_id: int):
     wrapper = DynamoEnvironmentWrapper()
     if wrapper.is_enabled:
@@ -0,0 +1,70 @@
+# Generated by Django 3.2.18 on 2026-10-19 09:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_identity_override_counts(apps, schema_editor):
+    FeatureState = apps.get_model("features", "FeatureState")
+    IdentityOverrideCount = apps.get_model("features", "IdentityOverrideCount")
+
+    counts = (
+        FeatureState.objects.filter(identity__isnull=False, deleted_at__isnull=True)
+        .values("environment_id", "feature_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    IdentityOverrideCount.objects.bulk_create(
+        [IdentityOverrideCount(**count) for count in counts.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("environments", "0029_add_lazy_identity_persistence"),
+        ("features", "0055_add_feature_segment_audit_log_for_delete"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdentityOverrideCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "environment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="identity_override_counts",
+                        to="environments.environment",
+                    ),
+                ),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="identity_override_counts",
+                        to="features.feature",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("environment", "feature")},
+            },
+        ),
+        migrations.RunPython(
+            populate_identity_override_counts,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
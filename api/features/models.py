@@ -16,7 +16,9 @@ from django.core.exceptions import (
     ObjectDoesNotExist,
     ValidationError,
 )
-from django.db import models
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
 from django.db.models import Max, Q, QuerySet
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -77,6 +79,8 @@ from . import audit_helpers
 
 logger = logging.getLogger(__name__)
 
+identity_overrides_cache = caches[settings.IDENTITY_OVERRIDES_CACHE_NAME]
+
 if typing.TYPE_CHECKING:
     from environments.identities.models import Identity
     from environments.models import Environment
@@ -463,15 +467,25 @@ class FeatureState(
     @property
     def previous_feature_state_value(self):
         try:
-            history_instance = self.feature_state_value.history.first()
-            return (
-                history_instance
-                and getattr(history_instance, "prev_record", None)
-                and history_instance.prev_record.instance.value
+            # the latest history record holds the current value, so the previous
+            # value is held by the record before it
+            previous_history_instance = next(
+                iter(self.feature_state_value.history.all()[1:2]), None
             )
         except ObjectDoesNotExist:
             return None
 
+        # build the value from the history record directly, rather than using
+        # history_instance.instance which would query the excluded (uuid) field
+        return previous_history_instance and (
+            FeatureStateValue(
+                type=previous_history_instance.type,
+                boolean_value=previous_history_instance.boolean_value,
+                integer_value=previous_history_instance.integer_value,
+                string_value=previous_history_instance.string_value,
+            ).value
+        )
+
     @property
     def type(self) -> str:
         if self.identity_id and self.feature_segment_id is None:
@@ -901,3 +915,55 @@ class FeatureStateValue(
 
     def _get_environment(self) -> typing.Optional["Environment"]:
         return self.feature_state.environment
+
+
+class IdentityOverrideCount(models.Model):
+    """
+    Denormalised index of the features in an environment that have identity
+    overrides, kept up to date by signals on FeatureState. This allows us to skip
+    looking for identity overrides for features (or environments) that don't
+    have any. Rows only exist for features with at least one identity override.
+    """
+
+    environment = models.ForeignKey(
+        "environments.Environment",
+        related_name="identity_override_counts",
+        on_delete=models.CASCADE,
+    )
+    feature = models.ForeignKey(
+        Feature, related_name="identity_override_counts", on_delete=models.CASCADE
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("environment", "feature")
+
+    @classmethod
+    def recalculate(cls, environment_id: int, feature_id: int) -> None:
+        count = FeatureState.objects.filter(
+            environment_id=environment_id,
+            feature_id=feature_id,
+            identity__isnull=False,
+        ).count()
+
+        if count:
+            _, features_changed = cls.objects.update_or_create(
+                environment_id=environment_id,
+                feature_id=feature_id,
+                defaults={"count": count},
+            )
+        else:
+            # delete, rather than zero, the count so that we don't recreate rows
+            # for features and environments that are being cascade deleted
+            num_deleted, _ = cls.objects.filter(
+                environment_id=environment_id, feature_id=feature_id
+            ).delete()
+            features_changed = bool(num_deleted)
+
+        if features_changed:
+            # the features with identity overrides may be cached (see
+            # Environment.get_feature_ids_with_identity_overrides), we clear them
+            # once committed so that they can't be cached again before then
+            transaction.on_commit(
+                lambda: identity_overrides_cache.delete(str(environment_id))
+            )
@@ -1,10 +1,10 @@
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 # noinspection PyUnresolvedReferences
-from .models import FeatureState
+from .models import FeatureState, IdentityOverrideCount
 from .tasks import trigger_feature_state_change_webhooks
 
 logger = logging.getLogger(__name__)
@@ -13,3 +13,10 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=FeatureState)
 def trigger_feature_state_change_webhooks_signal(instance, **kwargs):
     trigger_feature_state_change_webhooks(instance)
+
+
+@receiver(post_save, sender=FeatureState)
+@receiver(post_delete, sender=FeatureState)
+def update_identity_override_count(instance, **kwargs):
+    if instance.identity_id:
+        IdentityOverrideCount.recalculate(instance.environment_id, instance.feature_id)
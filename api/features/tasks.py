@@ -1,4 +1,4 @@
-from threading import Thread
+import typing
 
 from environments.models import Webhook
 from features.models import FeatureState
@@ -17,7 +17,13 @@ def trigger_feature_state_change_webhooks(
 ):
     assert event_type in [WebhookEventType.FLAG_UPDATED, WebhookEventType.FLAG_DELETED]
 
-    history_instance = instance.history.first()
+    feature_state = _get_feature_state_with_related_objects(instance)
+
+    # the latest history record is for this change, and the one before it (if
+    # any) holds the previous state
+    history_instance, previous_history_instance = (
+        list(feature_state.history.select_related("history_user")[:2]) + [None, None]
+    )[:2]
     timestamp = (
         history_instance.history_date.strftime(WEBHOOK_DATETIME_FORMAT)
         if history_instance and history_instance.history_date
@@ -32,52 +38,74 @@ def trigger_feature_state_change_webhooks(
     new_state = (
         None
         if event_type == WebhookEventType.FLAG_DELETED
-        else _get_feature_state_webhook_data(instance)
+        else _get_feature_state_webhook_data(
+            feature_state,
+            enabled=feature_state.enabled,
+            value=feature_state.get_feature_state_value(),
+        )
     )
     data = {"new_state": new_state, "changed_by": changed_by, "timestamp": timestamp}
-    previous_state = _get_previous_state(history_instance, event_type)
+    previous_state = _get_previous_state(
+        feature_state, previous_history_instance, event_type
+    )
     if previous_state:
         data.update(previous_state=previous_state)
-    Thread(
-        target=call_environment_webhooks,
-        args=(instance.environment, data, event_type),
-    ).start()
 
-    Thread(
-        target=call_organisation_webhooks,
-        args=(
-            instance.environment.project.organisation,
-            data,
-            event_type,
-        ),
-    ).start()
+    call_environment_webhooks(feature_state.environment, data, event_type)
+    call_organisation_webhooks(
+        feature_state.environment.project.organisation, data, event_type
+    )
+
+
+def _get_feature_state_with_related_objects(instance: FeatureState) -> FeatureState:
+    """
+    Fetch all the objects needed to build the webhook data in a single query.
+    """
+    return (
+        FeatureState.objects.select_related(
+            "feature__project",
+            "environment__project__organisation",
+            "feature_state_value",
+            "identity",
+            "feature_segment__segment",
+        )
+        .filter(id=instance.id)
+        .first()
+    ) or instance
 
 
 def _get_previous_state(
-    history_instance: HistoricalFeatureState, event_type: WebhookEventType
-) -> dict:
+    feature_state: FeatureState,
+    previous_history_instance: typing.Optional[HistoricalFeatureState],
+    event_type: WebhookEventType,
+) -> typing.Optional[dict]:
     if event_type == WebhookEventType.FLAG_DELETED:
-        return _get_feature_state_webhook_data(history_instance.instance)
-    if history_instance and history_instance.prev_record:
         return _get_feature_state_webhook_data(
-            history_instance.prev_record.instance, previous=True
+            feature_state,
+            enabled=feature_state.enabled,
+            value=feature_state.get_feature_state_value(),
+        )
+    if previous_history_instance:
+        # only the enabled state and value of a feature state can change
+        return _get_feature_state_webhook_data(
+            feature_state,
+            enabled=previous_history_instance.enabled,
+            value=feature_state.previous_feature_state_value,
         )
     return None
 
 
-def _get_feature_state_webhook_data(feature_state, previous=False):
+def _get_feature_state_webhook_data(
+    feature_state: FeatureState,
+    enabled: bool,
+    value: typing.Union[str, int, bool, type(None)],
+) -> dict:
     # TODO: fix circular imports and use serializers instead.
-    feature_state_value = (
-        feature_state.get_feature_state_value()
-        if not previous
-        else feature_state.previous_feature_state_value
-    )
-
     return Webhook.generate_webhook_feature_state_data(
         feature_state.feature,
         environment=feature_state.environment,
-        enabled=feature_state.enabled,
-        value=feature_state_value,
+        enabled=enabled,
+        value=value,
         identity_id=feature_state.identity_id,
         identity_identifier=getattr(feature_state.identity, "identifier", None),
         feature_segment=feature_state.feature_segment,
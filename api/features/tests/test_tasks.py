@@ -1,18 +1,22 @@
+import json
 from unittest import mock
 
 import pytest
 
-from environments.models import Environment
+from environments.models import Environment, Webhook
 from features.models import Feature, FeatureState
 from features.tasks import trigger_feature_state_change_webhooks
-from organisations.models import Organisation
+from organisations.models import Organisation, OrganisationWebhook
 from projects.models import Project
 from webhooks.webhooks import WebhookEventType
 
 
 @pytest.mark.django_db
-@mock.patch("features.tasks.Thread")
-def test_trigger_feature_state_change_webhooks(MockThread):
+@mock.patch("features.tasks.call_organisation_webhooks")
+@mock.patch("features.tasks.call_environment_webhooks")
+def test_trigger_feature_state_change_webhooks(
+    mock_call_environment_webhooks, mock_call_organisation_webhooks
+):
     # Given
     initial_value = "initial"
     new_value = "new"
@@ -30,34 +34,40 @@ def test_trigger_feature_state_change_webhooks(MockThread):
     feature_state.feature_state_value.save()
     feature_state.save()
 
-    MockThread.reset_mock()  # reset mock as it will have been called when setting up the data
+    # reset mocks as they will have been called when setting up the data
+    mock_call_environment_webhooks.reset_mock()
+    mock_call_organisation_webhooks.reset_mock()
 
     # When
     trigger_feature_state_change_webhooks(feature_state)
 
     # Then
-    call_list = MockThread.call_args_list
+    environment_webhook_call_args = mock_call_environment_webhooks.call_args[0]
+    organisation_webhook_call_args = mock_call_organisation_webhooks.call_args[0]
 
-    environment_webhook_call_args = call_list[0]
-    organisation_webhook_call_args = call_list[1]
+    assert environment_webhook_call_args[0] == feature_state.environment
+    assert organisation_webhook_call_args[0] == organisation
 
     # verify that the data for both calls is the same
-    assert (
-        environment_webhook_call_args[1]["args"][1]
-        == organisation_webhook_call_args[1]["args"][1]
-    )
+    assert environment_webhook_call_args[1] == organisation_webhook_call_args[1]
 
-    data = environment_webhook_call_args[1]["args"][1]
-    event_type = environment_webhook_call_args[1]["args"][2]
+    data = environment_webhook_call_args[1]
+    event_type = environment_webhook_call_args[2]
     assert data["new_state"]["feature_state_value"] == new_value
     assert data["previous_state"]["feature_state_value"] == initial_value
     assert event_type == WebhookEventType.FLAG_UPDATED
 
 
 @pytest.mark.django_db
-@mock.patch("features.tasks.Thread")
+@mock.patch("features.tasks.call_organisation_webhooks")
+@mock.patch("features.tasks.call_environment_webhooks")
 def test_trigger_feature_state_change_webhooks_for_deleted_flag(
-    MockThread, organisation, project, environment, feature
+    mock_call_environment_webhooks,
+    mock_call_organisation_webhooks,
+    organisation,
+    project,
+    environment,
+    feature,
 ):
     # Given
     new_value = "new"
@@ -68,23 +78,62 @@ def test_trigger_feature_state_change_webhooks_for_deleted_flag(
     feature_state.feature_state_value.save()
     feature_state.save()
 
-    MockThread.reset_mock()  # reset mock as it will have been called when setting up the data
+    # reset mocks as they will have been called when setting up the data
+    mock_call_environment_webhooks.reset_mock()
+    mock_call_organisation_webhooks.reset_mock()
     trigger_feature_state_change_webhooks(feature_state, WebhookEventType.FLAG_DELETED)
 
     # Then
-    call_list = MockThread.call_args_list
+    environment_webhook_call_args = mock_call_environment_webhooks.call_args[0]
+    organisation_webhook_call_args = mock_call_organisation_webhooks.call_args[0]
 
-    environment_webhook_call_args = call_list[0]
-    organisation_webhook_call_args = call_list[1]
+    assert environment_webhook_call_args[0] == feature_state.environment
+    assert organisation_webhook_call_args[0] == organisation
 
     # verify that the data for both calls is the same
-    assert (
-        environment_webhook_call_args[1]["args"][1]
-        == organisation_webhook_call_args[1]["args"][1]
-    )
+    assert environment_webhook_call_args[1] == organisation_webhook_call_args[1]
 
-    data = environment_webhook_call_args[1]["args"][1]
-    event_type = environment_webhook_call_args[1]["args"][2]
+    data = environment_webhook_call_args[1]
+    event_type = environment_webhook_call_args[2]
     assert data["new_state"] is None
     assert data["previous_state"]["feature_state_value"] == new_value
     assert event_type == WebhookEventType.FLAG_DELETED
+
+
+def test_trigger_feature_state_change_webhooks_makes_fixed_number_of_queries(
+    organisation, environment, feature, mocker, django_assert_num_queries
+):
+    # Given
+    Webhook.objects.create(url="https://example.com/1", environment=environment)
+    Webhook.objects.create(url="https://example.com/2", environment=environment)
+    OrganisationWebhook.objects.create(
+        url="https://example.com/3", organisation=organisation, name="webhook"
+    )
+    mock_webhook_delivery_buffer = mocker.patch(
+        "webhooks.webhooks.webhook_delivery_buffer"
+    )
+
+    feature_state = FeatureState.objects.get(feature=feature, environment=environment)
+    feature_state.enabled = not feature_state.enabled
+    feature_state.save()
+    mock_webhook_delivery_buffer.reset_mock()
+
+    feature_state = FeatureState.objects.get(id=feature_state.id)
+
+    # When
+    # 1. the feature state (and related objects)
+    # 2. the latest 2 history records of the feature state
+    # 3. the previous feature state value
+    # 4. the environment webhooks
+    # 5. the organisation webhooks
+    with django_assert_num_queries(5):
+        trigger_feature_state_change_webhooks(feature_state)
+
+    # Then
+    add_many_calls = mock_webhook_delivery_buffer.add_many.call_args_list
+    assert sum(len(call[0][1]) for call in add_many_calls) == 3
+    event = add_many_calls[0][0][2]
+    assert all(call[0][2] == event for call in add_many_calls)
+    data = json.loads(event)["data"]
+    assert data["new_state"]["enabled"] is feature_state.enabled
+    assert data["previous_state"]["enabled"] is not feature_state.enabled
@@ -7,7 +7,8 @@ from core.constants import FLAGSMITH_UPDATED_AT_HEADER
 from core.permissions import HasMasterAPIKey
 from django.conf import settings
 from django.core.cache import caches
-from django.db.models import Count, Q, QuerySet
+from django.db.models import Count, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from drf_yasg2 import openapi
@@ -34,7 +35,7 @@ from environments.permissions.permissions import (
 from projects.models import Project
 from webhooks.webhooks import WebhookEventType
 
-from .models import Feature, FeatureState
+from .models import Feature, FeatureState, IdentityOverrideCount
 from .permissions import (
     EnvironmentFeatureStatePermissions,
     FeaturePermissions,
@@ -136,12 +137,13 @@ class FeatureViewSet(viewsets.ModelViewSet):
             )
             if not project.enable_dynamo_db:
                 queryset = queryset.annotate(
-                    num_identity_overrides=Count(
-                        "feature_states",
-                        Q(
-                            feature_states__identity__isnull=False,
-                            feature_states__environment_id=environment_id,
+                    num_identity_overrides=Coalesce(
+                        Subquery(
+                            IdentityOverrideCount.objects.filter(
+                                feature=OuterRef("pk"), environment_id=environment_id
+                            ).values("count")
                         ),
+                        0,
                     ),
                 )
 
@@ -2,12 +2,11 @@ import json
 import logging
 import typing
 
-import requests
-
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
 from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from util.http import http_dispatcher
 
 from .models import AmplitudeConfiguration
 
@@ -21,12 +20,20 @@ class AmplitudeWrapper(AbstractBaseIdentityIntegrationWrapper):
         self.api_key = config.api_key
         self.url = f"{AMPLITUDE_API_URL}/identify"
 
+    @property
+    def batch_key(self) -> str:
+        return self.api_key
+
     def _identify_user(self, user_data: dict) -> None:
-        payload = {"api_key": self.api_key, "identification": json.dumps([user_data])}
+        self.identify_users([user_data])
+
+    def identify_users(self, users_data: typing.List[dict]) -> None:
+        payload = {"api_key": self.api_key, "identification": json.dumps(users_data)}
 
-        response = requests.post(self.url, data=payload)
+        response = http_dispatcher.post(self.url, data=payload)
         logger.debug(
-            "Sent event to Amplitude. Response code was: %s" % response.status_code
+            "Sent %d users to Amplitude. Response code was: %s"
+            % (len(users_data), response.status_code)
         )
 
     def generate_user_data(
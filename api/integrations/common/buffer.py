@@ -0,0 +1,139 @@
+import atexit
+import logging
+import threading
+import typing
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from util.flusher import BackgroundFlusher
+from util.util import postpone_executor
+
+if typing.TYPE_CHECKING:
+    from integrations.common.wrapper import (
+        AbstractBaseIdentityIntegrationWrapper,
+    )
+
+logger = logging.getLogger(__name__)
+
+BufferKey = typing.Tuple[type, typing.Hashable]
+
+
+class IdentityIntegrationBuffer:
+    """
+    Buffers the user data generated for each identity integration destination
+    (i.e. integration type and batch key, e.g. api key) so that the users
+    identified within a short window are sent to the integration in batches,
+    rather than with one request per identify.
+
+    Batches are flushed once they reach the integration's max batch size, or
+    else by a single background thread which flushes all the buffered batches
+    every `window_seconds`, and are sent using the shared postpone executor.
+    Once `max_buffered_users` users are waiting to be flushed, any further users
+    are dropped.
+    """
+
+    def __init__(
+        self, window_seconds: float, max_batch_size: int, max_buffered_users: int
+    ):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.max_buffered_users = max_buffered_users
+
+        self._user_data: typing.Dict[BufferKey, typing.List[dict]] = defaultdict(list)
+        self._wrappers: typing.Dict[
+            BufferKey, "AbstractBaseIdentityIntegrationWrapper"
+        ] = {}
+        self._buffered_users = 0
+        self._metrics = Counter()
+        self._lock = threading.Lock()
+        self._flusher = BackgroundFlusher(
+            self.flush_all, window_seconds, name="identity-integration-buffer"
+        )
+
+    @property
+    def metrics(self) -> typing.Dict[str, int]:
+        with self._lock:
+            metrics = {
+                key: self._metrics[key]
+                for key in ("buffered", "dropped", "flushed_batches", "flushed_users")
+            }
+            metrics["pending"] = self._buffered_users
+        return metrics
+
+    def add(
+        self, wrapper: "AbstractBaseIdentityIntegrationWrapper", user_data: dict
+    ) -> None:
+        key = (type(wrapper), wrapper.batch_key)
+        max_batch_size = min(
+            self.max_batch_size, wrapper.max_batch_size or self.max_batch_size
+        )
+
+        with self._lock:
+            if self._buffered_users >= self.max_buffered_users:
+                self._metrics["dropped"] += 1
+                logger.warning(
+                    "Identity integration buffer is full, dropping user data for %s.",
+                    type(wrapper).__name__,
+                )
+                return
+
+            self._user_data[key].append(user_data)
+            self._wrappers[key] = wrapper
+            self._buffered_users += 1
+            self._metrics["buffered"] += 1
+
+            should_flush = (
+                not self.window_seconds or len(self._user_data[key]) >= max_batch_size
+            )
+
+        if should_flush:
+            self.flush(key)
+        else:
+            self._flusher.ensure_started()
+
+    def flush(self, key: BufferKey, synchronous: bool = False) -> None:
+        """
+        Send the buffered users for the given destination, using the postpone
+        executor or, if `synchronous` is True, in the calling thread.
+        """
+        with self._lock:
+            user_data = self._user_data.pop(key, [])
+            wrapper = self._wrappers.pop(key, None)
+            self._buffered_users -= len(user_data)
+            if user_data:
+                self._metrics["flushed_batches"] += 1
+                self._metrics["flushed_users"] += len(user_data)
+
+        if not user_data:
+            return
+
+        if not synchronous:
+            postpone_executor.submit(wrapper.identify_users, user_data)
+            return
+
+        try:
+            wrapper.identify_users(user_data)
+        except Exception:
+            logger.exception("Error identifying users for %s.", type(wrapper).__name__)
+
+    def flush_all(self, synchronous: bool = False) -> None:
+        with self._lock:
+            keys = list(self._user_data)
+
+        for key in keys:
+            self.flush(key, synchronous=synchronous)
+
+
+identity_integration_buffer = IdentityIntegrationBuffer(
+    window_seconds=settings.IDENTITY_INTEGRATION_BATCH_WINDOW_SECONDS,
+    max_batch_size=settings.IDENTITY_INTEGRATION_MAX_BATCH_SIZE,
+    max_buffered_users=settings.IDENTITY_INTEGRATION_MAX_BUFFERED_USERS,
+)
+
+
+@atexit.register
+def _flush_identity_integration_buffer_on_exit():
+    # the batches are sent synchronously since (thread pool) executors don't
+    # accept any new work once the interpreter has started shutting down
+    identity_integration_buffer.flush_all(synchronous=True)
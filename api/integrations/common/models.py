@@ -1,7 +1,9 @@
 import logging
 
 from core.models import AbstractBaseExportableModel
-from django.db import models
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
 from django_lifecycle import (
     AFTER_DELETE,
     AFTER_SAVE,
@@ -14,6 +16,8 @@ from environments.models import Environment
 
 logger = logging.getLogger(__name__)
 
+integration_manifest_cache = caches[settings.INTEGRATION_MANIFEST_CACHE_NAME]
+
 
 class IntegrationsModel(AbstractBaseExportableModel):
     base_url = models.URLField(blank=False, null=True)
@@ -42,3 +46,17 @@ class EnvironmentIntegrationModel(LifecycleModelMixin, IntegrationsModel):
     @hook(AFTER_UPDATE)
     def clear_environment_cache(self):
         self.environment.clear_environment_cache()
+
+    @hook(AFTER_SAVE)
+    @hook(AFTER_DELETE)
+    def clear_integration_manifest_cache(self):
+        if hasattr(self, "environment_id"):
+            delete_integration_manifest(self.environment_id)
+
+
+def delete_integration_manifest(environment_id: int) -> None:
+    # the manifest is cleared once committed so that it can't be cached again
+    # (by another process) before then, see get_integration_manifest
+    transaction.on_commit(
+        lambda: integration_manifest_cache.delete(str(environment_id))
+    )
@@ -1,6 +1,7 @@
 import typing
 from abc import ABC, abstractmethod, abstractstaticmethod
 
+from integrations.common.buffer import identity_integration_buffer
 from util.util import postpone
 
 if typing.TYPE_CHECKING:
@@ -24,13 +25,33 @@ class AbstractBaseEventIntegrationWrapper(ABC):
 
 
 class AbstractBaseIdentityIntegrationWrapper(ABC):
+    # The maximum number of users that the integration accepts in a single
+    # request, or None if only limited by IDENTITY_INTEGRATION_MAX_BATCH_SIZE.
+    max_batch_size: typing.Optional[int] = None
+
+    @property
+    @abstractmethod
+    def batch_key(self) -> typing.Hashable:
+        """
+        Identifies the destination (e.g. the api key) of the user data so that
+        only users sent to the same destination are batched together.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def _identify_user(self, user_data: dict) -> None:
         raise NotImplementedError()
 
-    @postpone
+    def identify_users(self, users_data: typing.List[dict]) -> None:
+        """
+        Send a batch of users to the integration. Integrations that support a
+        batch api should override this to send the users in a single request.
+        """
+        for user_data in users_data:
+            self._identify_user(user_data)
+
     def identify_user_async(self, data: dict) -> None:
-        self._identify_user(data)
+        identity_integration_buffer.add(self, data)
 
     @abstractmethod
     def generate_user_data(
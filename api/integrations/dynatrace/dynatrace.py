@@ -1,9 +1,8 @@
 import json
 import logging
 
-import requests
-
 from integrations.common.wrapper import AbstractBaseEventIntegrationWrapper
+from util.http import http_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +18,7 @@ class DynatraceWrapper(AbstractBaseEventIntegrationWrapper):
 
     def _track_event(self, event: dict) -> None:
         event["entitySelector"] = self.entity_selector
-        response = requests.post(
+        response = http_dispatcher.post(
             self.url, headers=self._headers(), data=json.dumps(event)
         )
         logger.debug(
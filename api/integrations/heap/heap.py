@@ -1,12 +1,11 @@
 import logging
 import typing
 
-import requests
-
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
 from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from util.http import http_dispatcher
 
 from .models import HeapConfiguration
 
@@ -16,14 +15,35 @@ HEAP_API_URL = "https://heapanalytics.com"
 
 
 class HeapWrapper(AbstractBaseIdentityIntegrationWrapper):
+    # https://developers.heap.io/reference/bulk-track
+    max_batch_size = 1000
+
     def __init__(self, config: HeapConfiguration):
         self.api_key = config.api_key
         self.url = f"{HEAP_API_URL}/api/track"
 
+    @property
+    def batch_key(self) -> str:
+        return self.api_key
+
     def _identify_user(self, user_data: dict) -> None:
-        response = requests.post(self.url, json=user_data)
+        response = http_dispatcher.post(self.url, json=user_data)
         logger.debug("Sent event to Heap. Response code was: %s" % response.status_code)
 
+    def identify_users(self, users_data: typing.List[dict]) -> None:
+        payload = {
+            "app_id": self.api_key,
+            "events": [
+                {key: value for key, value in user_data.items() if key != "app_id"}
+                for user_data in users_data
+            ],
+        }
+        response = http_dispatcher.post(self.url, json=payload)
+        logger.debug(
+            "Sent %d events to Heap. Response code was: %s"
+            % (len(users_data), response.status_code)
+        )
+
     def generate_user_data(
         self,
         identity: Identity,
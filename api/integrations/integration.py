@@ -1,3 +1,9 @@
+import typing
+
+from django.conf import settings
+from django.core.cache import caches
+
+from environments.models import Environment
 from integrations.amplitude.amplitude import AmplitudeWrapper
 from integrations.heap.heap import HeapWrapper
 from integrations.mixpanel.mixpanel import MixpanelWrapper
@@ -15,9 +21,44 @@ IDENTITY_INTEGRATIONS = [
 ]
 
 
+integration_manifest_cache = caches[settings.INTEGRATION_MANIFEST_CACHE_NAME]
+
+
+def get_integration_manifest(environment_id: int) -> typing.Dict[str, typing.Any]:
+    """
+    Get the identity integrations configured for the environment, as a mapping
+    of relation name (e.g. amplitude_config) to configuration.
+
+    The manifest is cached, and cleared whenever an integration configuration
+    is saved or deleted, so that dispatching to the integrations doesn't need
+    to query each of the integration relations for every identify.
+    """
+    manifest = integration_manifest_cache.get(str(environment_id))
+    if manifest is None:
+        manifest = _build_integration_manifest(environment_id)
+        integration_manifest_cache.set(str(environment_id), manifest)
+    return manifest
+
+
+def _build_integration_manifest(environment_id: int) -> typing.Dict[str, typing.Any]:
+    relation_names = [
+        integration["relation_name"] for integration in IDENTITY_INTEGRATIONS
+    ]
+    environment = Environment.objects.select_related(*relation_names).get(
+        id=environment_id
+    )
+    manifest = {}
+    for relation_name in relation_names:
+        config = getattr(environment, relation_name, None)
+        if config:
+            manifest[relation_name] = config
+    return manifest
+
+
 def identify_integrations(identity, all_feature_states, trait_models=None):
+    manifest = get_integration_manifest(identity.environment_id)
     for integration in IDENTITY_INTEGRATIONS:
-        config = getattr(identity.environment, integration.get("relation_name"), None)
+        config = manifest.get(integration.get("relation_name"))
         if config:
             wrapper = integration.get("wrapper")
             wrapper_instance = wrapper(config)
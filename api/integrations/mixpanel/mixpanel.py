@@ -1,12 +1,12 @@
 import logging
 import typing
-
-import requests
+from itertools import chain
 
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
 from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from util.http import http_dispatcher
 
 from .models import MixpanelConfiguration
 
@@ -16,6 +16,9 @@ MIXPANEL_API_URL = "https://api.mixpanel.com"
 
 
 class MixpanelWrapper(AbstractBaseIdentityIntegrationWrapper):
+    # https://developer.mixpanel.com/reference/profile-batch-update
+    max_batch_size = 2000
+
     def __init__(self, config: MixpanelConfiguration):
         self.api_key = config.api_key
         self.url = f"{MIXPANEL_API_URL}/engage#profile-set"
@@ -26,8 +29,12 @@ class MixpanelWrapper(AbstractBaseIdentityIntegrationWrapper):
             "X-Mixpanel-Integration-ID": "flagsmith",
         }
 
-    def _identify_user(self, user_data: dict) -> None:
-        response = requests.post(self.url, headers=self.headers, json=user_data)
+    @property
+    def batch_key(self) -> str:
+        return self.api_key
+
+    def _identify_user(self, user_data: typing.List[dict]) -> None:
+        response = http_dispatcher.post(self.url, headers=self.headers, json=user_data)
         logger.debug(
             "Sent event to Mixpanel. Response code was: %s" % response.status_code
         )
@@ -35,6 +42,10 @@ class MixpanelWrapper(AbstractBaseIdentityIntegrationWrapper):
             "Sent event to Mixpanel. Response content was: %s" % response.content
         )
 
+    def identify_users(self, users_data: typing.List[typing.List[dict]]) -> None:
+        # the user data for each identity is already a list of profile updates
+        self._identify_user(list(chain.from_iterable(users_data)))
+
     def generate_user_data(
         self,
         identity: Identity,
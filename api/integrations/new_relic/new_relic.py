@@ -1,9 +1,8 @@
 import json
 import logging
 
-import requests
-
 from integrations.common.wrapper import AbstractBaseEventIntegrationWrapper
+from util.http import http_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +17,7 @@ class NewRelicWrapper(AbstractBaseEventIntegrationWrapper):
         self.url = f"{self.base_url}{EVENTS_API_URI}{self.app_id}/deployments.json"
 
     def _track_event(self, event: dict) -> None:
-        response = requests.post(
+        response = http_dispatcher.post(
             self.url, headers=self._headers(), data=json.dumps(event)
         )
         logger.debug(
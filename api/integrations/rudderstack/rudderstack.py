@@ -17,6 +17,13 @@ class RudderstackWrapper(AbstractBaseIdentityIntegrationWrapper):
     def __init__(self, config: RudderstackConfiguration):
         rudder_analytics.write_key = config.api_key
         rudder_analytics.data_plane_url = config.base_url
+        self._batch_key = (config.api_key, config.base_url)
+
+    @property
+    def batch_key(self) -> typing.Tuple[str, str]:
+        # note that the rudderstack client queues the users and sends them in
+        # batches itself, so we just identify each user in the batch
+        return self._batch_key
 
     def _identify_user(self, user_data: dict) -> None:
         rudder_analytics.identify(**user_data)
@@ -2,6 +2,7 @@ import logging
 import typing
 
 from analytics.client import Client as SegmentClient
+from analytics.request import post as segment_post
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
@@ -16,11 +17,31 @@ class SegmentWrapper(AbstractBaseIdentityIntegrationWrapper):
     def __init__(self, config: SegmentConfiguration):
         api_key = config.api_key
         self.analytics = SegmentClient(write_key=api_key, sync_mode=True)
+        # only used to build the messages for a batch, which are then sent using
+        # the segment batch api
+        self._message_builder = SegmentClient(
+            write_key=api_key, sync_mode=True, send=False
+        )
+
+    @property
+    def batch_key(self) -> str:
+        return self.analytics.write_key
 
     def _identify_user(self, data: dict) -> None:
         self.analytics.identify(**data)
         logger.debug("Sent event to Segment.")
 
+    def identify_users(self, users_data: typing.List[dict]) -> None:
+        batch = [self._message_builder.identify(**data)[1] for data in users_data]
+        segment_post(
+            self.analytics.write_key,
+            self.analytics.host,
+            gzip=self.analytics.gzip,
+            timeout=self.analytics.timeout,
+            batch=batch,
+        )
+        logger.debug("Sent %d events to Segment." % len(batch))
+
     def generate_user_data(
         self,
         identity: Identity,
@@ -7,10 +7,11 @@ from django_lifecycle import (
 )
 
 from environments.models import Environment
+from integrations.common.models import delete_integration_manifest
 from webhooks.models import AbstractBaseWebhookModel
 
 
-class WebhookConfiguration(AbstractBaseWebhookModel, LifecycleModelMixin):
+class WebhookConfiguration(LifecycleModelMixin, AbstractBaseWebhookModel):
     environment = models.OneToOneField(
         Environment, related_name="webhook_config", on_delete=models.CASCADE
     )
@@ -19,3 +20,8 @@ class WebhookConfiguration(AbstractBaseWebhookModel, LifecycleModelMixin):
     @hook(AFTER_DELETE)
     def write_environment_to_dynamodb(self):
         Environment.write_environments_to_dynamodb(environment_id=self.environment_id)
+
+    @hook(AFTER_SAVE)
+    @hook(AFTER_DELETE)
+    def clear_integration_manifest_cache(self):
+        delete_integration_manifest(self.environment_id)
@@ -20,6 +20,12 @@ class WebhookWrapper(AbstractBaseIdentityIntegrationWrapper):
     def __init__(self, config: WebhookConfiguration):
         self.config = config
 
+    @property
+    def batch_key(self) -> typing.Tuple[str, str]:
+        # the webhook payload only contains a single identity so each user in the
+        # batch is still sent in a separate request
+        return self.config.url, self.config.secret
+
     def _identify_user(self, data: typing.Mapping) -> None:
         response = call_integration_webhook(self.config, data)
         logger.debug(
@@ -10,3 +10,5 @@ class OrganisationsConfig(AppConfig):
     def ready(self):
         # noinspection PyUnresolvedReferences
         import organisations.signals  # noqa
+
+        from . import tasks  # noqa
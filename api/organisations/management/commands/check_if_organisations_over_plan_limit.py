@@ -1,4 +1,5 @@
 from django.core.management import BaseCommand
+from django.db import transaction
 
 from organisations.models import Organisation
 from organisations.tasks import send_org_over_limit_alert
@@ -6,8 +7,15 @@ from organisations.tasks import send_org_over_limit_alert
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
-        for org in Organisation.objects.all():
-            if org.over_plan_seats_limit() and not org.alerted_over_plan_limit:
-                send_org_over_limit_alert.delay(args=(org.id,))
-                org.alerted_over_plan_limit = True
-                org.save()
+        # the organisations are only marked as alerted if the alerts are enqueued
+        with transaction.atomic():
+            alerted_organisation_ids = []
+            for org in Organisation.objects.all():
+                if org.over_plan_seats_limit() and not org.alerted_over_plan_limit:
+                    alerted_organisation_ids.append(org.id)
+                    org.alerted_over_plan_limit = True
+                    org.save()
+
+            send_org_over_limit_alert.delay_many(
+                args_list=[(org_id,) for org_id in alerted_organisation_ids]
+            )
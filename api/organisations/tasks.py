@@ -1,9 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
+
 from organisations import subscription_info_cache
+from organisations.chargebee.cache import ChargebeeCache
 from organisations.models import Organisation
 from organisations.subscriptions.subscription_service import (
     get_subscription_metadata,
 )
-from task_processor.decorators import register_task_handler
+from task_processor.decorators import (
+    register_recurring_task,
+    register_task_handler,
+)
 from users.models import FFAdminUser
 
 ALERT_EMAIL_MESSAGE = (
@@ -29,6 +37,17 @@ def send_org_over_limit_alert(organisation_id):
     )
 
 
+@register_recurring_task(run_every=timedelta(hours=12))
 @register_task_handler()
 def update_organisation_subscription_information_caches():
     subscription_info_cache.update_caches()
+
+
+@register_recurring_task(run_every=timedelta(hours=6))
+def refresh_chargebee_cache():
+    # refresh the cached chargebee plans and addons before they expire, so that
+    # they don't need to be fetched while handling requests
+    if not settings.CHARGEBEE_API_KEY:
+        return
+
+    ChargebeeCache().refresh()
@@ -0,0 +1,43 @@
+import pytest
+from django.core.management import call_command
+
+from organisations.models import Organisation
+
+COMMAND = "check_if_organisations_over_plan_limit"
+
+
+def test_check_if_organisations_over_plan_limit_alerts_organisations(
+    organisation, mocker
+):
+    # Given
+    mocker.patch.object(Organisation, "over_plan_seats_limit", return_value=True)
+    mocked_task = mocker.patch(
+        f"organisations.management.commands.{COMMAND}.send_org_over_limit_alert"
+    )
+
+    # When
+    call_command(COMMAND)
+
+    # Then
+    mocked_task.delay_many.assert_called_once_with(args_list=[(organisation.id,)])
+    organisation.refresh_from_db()
+    assert organisation.alerted_over_plan_limit is True
+
+
+def test_check_if_organisations_over_plan_limit_does_not_alert_if_enqueue_fails(
+    organisation, mocker
+):
+    # Given
+    mocker.patch.object(Organisation, "over_plan_seats_limit", return_value=True)
+    mocked_task = mocker.patch(
+        f"organisations.management.commands.{COMMAND}.send_org_over_limit_alert"
+    )
+    mocked_task.delay_many.side_effect = Exception("Failed to enqueue")
+
+    # When
+    with pytest.raises(Exception):
+        call_command(COMMAND)
+
+    # Then
+    organisation.refresh_from_db()
+    assert organisation.alerted_over_plan_limit is False
@@ -9,6 +9,7 @@ from organisations.subscriptions.xero.metadata import XeroSubscriptionMetadata
 from organisations.tasks import (
     ALERT_EMAIL_MESSAGE,
     ALERT_EMAIL_SUBJECT,
+    refresh_chargebee_cache,
     send_org_over_limit_alert,
 )
 
@@ -63,3 +64,29 @@ def test_send_org_over_limit_alert_for_organisation_with_subscription(
         subscription.plan,
     )
     assert kwargs["subject"] == ALERT_EMAIL_SUBJECT
+
+
+def test_refresh_chargebee_cache(settings, mocker):
+    # Given
+    settings.CHARGEBEE_API_KEY = "api-key"
+    mocked_chargebee_cache = mocker.patch("organisations.tasks.ChargebeeCache")
+
+    # When
+    refresh_chargebee_cache()
+
+    # Then
+    mocked_chargebee_cache.return_value.refresh.assert_called_once_with()
+
+
+def test_refresh_chargebee_cache_does_nothing_if_chargebee_not_configured(
+    settings, mocker
+):
+    # Given
+    settings.CHARGEBEE_API_KEY = None
+    mocked_chargebee_cache = mocker.patch("organisations.tasks.ChargebeeCache")
+
+    # When
+    refresh_chargebee_cache()
+
+    # Then
+    mocked_chargebee_cache.assert_not_called()
@@ -1,7 +1,10 @@
 from task_processor.decorators import register_task_handler
+from task_processor.models import TaskPriority
 
 
-@register_task_handler()
+@register_task_handler(
+    priority=TaskPriority.HIGH, coalesce_key=lambda project_id: str(project_id)
+)
 def write_environments_to_dynamodb(project_id: int):
     from environments.models import Environment
 
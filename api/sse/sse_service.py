@@ -5,6 +5,8 @@ from django.conf import settings
 
 from . import tasks
 
+IDENTITY_UPDATE_MESSAGES_BATCH_SIZE = 100
+
 
 def _sse_enabled(get_project_from_first_arg=lambda obj: obj.project):
     """
@@ -42,7 +44,7 @@ def send_environment_update_message_for_project(project):
 @_sse_enabled()
 def send_environment_update_message_for_environment(environment):
     tasks.send_environment_update_message.delay(
-        args=(environment.api_key, environment.updated_at.isoformat())
+        args=(environment.api_key, environment.updated_at)
     )
 
 
@@ -53,4 +55,9 @@ def send_identity_update_message(environment, identifier: str):
 
 @_sse_enabled()
 def send_identity_update_messages(environment, identifiers: List[str]):
-    tasks.send_identity_update_messages.delay(args=(environment.api_key, identifiers))
+    # split large updates into several tasks, so that they can be sent in parallel
+    tasks.send_identity_update_messages.fan_out(
+        identifiers,
+        batch_size=IDENTITY_UPDATE_MESSAGES_BATCH_SIZE,
+        args=(environment.api_key,),
+    )
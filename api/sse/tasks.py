@@ -1,31 +1,36 @@
-from typing import List
+from datetime import datetime
+from typing import List, Union
 
-import requests
 from django.conf import settings
 
 from projects.models import Project
 from task_processor.decorators import register_task_handler
+from task_processor.models import TaskPriority
+from util.http import http_dispatcher
 
 from .exceptions import SSEAuthTokenNotSet
 
 
-@register_task_handler()
+@register_task_handler(coalesce_key=lambda project_id: str(project_id))
 def send_environment_update_message_for_project(
     project_id: int,
 ):
     project = Project.objects.get(id=project_id)
 
     for environment in project.environments.all():
-        send_environment_update_message(
-            environment.api_key, environment.updated_at.isoformat()
-        )
+        send_environment_update_message(environment.api_key, environment.updated_at)
 
 
 @register_task_handler()
-def send_environment_update_message(environment_key: str, updated_at):
+def send_environment_update_message(
+    environment_key: str, updated_at: Union[datetime, str]
+):
     url = f"{settings.SSE_SERVER_BASE_URL}/sse/environments/{environment_key}/queue-change"
+    # tasks created before datetimes could be serialized receive a string
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
     payload = {"updated_at": updated_at}
-    response = requests.post(url, headers=get_auth_header(), json=payload)
+    response = http_dispatcher.post(url, headers=get_auth_header(), json=payload)
     response.raise_for_status()
 
 
@@ -34,11 +39,11 @@ def send_identity_update_message(environment_key: str, identifier: str):
     url = f"{settings.SSE_SERVER_BASE_URL}/sse/environments/{environment_key}/identities/queue-change"
     payload = {"identifier": identifier}
 
-    response = requests.post(url, headers=get_auth_header(), json=payload)
+    response = http_dispatcher.post(url, headers=get_auth_header(), json=payload)
     response.raise_for_status()
 
 
-@register_task_handler()
+@register_task_handler(priority=TaskPriority.LOW)
 def send_identity_update_messages(environment_key: str, identifiers: List[str]):
     for identifier in identifiers:
         send_identity_update_message(environment_key, identifier)
@@ -1,7 +1,14 @@
 from django.contrib import admin
 from django.db.models import Count, Q
 
-from task_processor.models import Task, TaskResult, TaskRun
+from task_processor.models import (
+    RecurringTask,
+    RecurringTaskRun,
+    Task,
+    TaskResult,
+    TaskRun,
+    TaskRunSummary,
+)
 
 
 class TaskRunInline(admin.StackedInline):
@@ -19,6 +26,8 @@ class TaskAdmin(admin.ModelAdmin):
         "scheduled_for",
         "num_failures",
         "completed",
+        "locked_until",
+        "locked_by",
     )
     readonly_fields = ("args", "kwargs")
 
@@ -35,3 +44,36 @@ class TaskAdmin(admin.ModelAdmin):
 
     def completed(self, instance: Task) -> bool:
         return instance.successful_task_runs == 1
+
+
+class RecurringTaskRunInline(admin.StackedInline):
+    model = RecurringTaskRun
+    extra = 0
+    show_change_link = False
+
+
+@admin.register(RecurringTask)
+class RecurringTaskAdmin(admin.ModelAdmin):
+    inlines = (RecurringTaskRunInline,)
+    list_display = (
+        "uuid",
+        "task_identifier",
+        "run_every",
+        "next_run_at",
+        "locked_until",
+        "locked_by",
+    )
+    readonly_fields = ("args", "kwargs")
+
+
+@admin.register(TaskRunSummary)
+class TaskRunSummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "task_identifier",
+        "date",
+        "result",
+        "num_runs",
+        "total_duration",
+    )
+    list_filter = ("result",)
+    search_fields = ("task_identifier",)
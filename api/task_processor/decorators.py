@@ -1,27 +1,46 @@
 import logging
 import typing
-from datetime import datetime
+from datetime import datetime, timedelta
 from inspect import getmodule
+from itertools import islice
 from threading import Thread
 
 from django.conf import settings
 from django.utils import timezone
 
-from task_processor.models import Task
-from task_processor.task_registry import register_task
+from task_processor.models import DEFAULT_TASK_QUEUE, Task, TaskPriority
+from task_processor.notifications import notify_task_created
+from task_processor.task_registry import (
+    RecurringTaskConfig,
+    register_recurring_task_config,
+    register_task,
+)
 from task_processor.task_run_method import TaskRunMethod
 
 logger = logging.getLogger(__name__)
 
+BULK_CREATE_BATCH_SIZE = 1000
 
-def register_task_handler(task_name: str = None):
-    def decorator(f: typing.Callable):
-        nonlocal task_name
 
-        task_name = task_name or f.__name__
-        task_module = getmodule(f).__name__.rsplit(".")[-1]
-        task_identifier = f"{task_module}.{task_name}"
+def register_task_handler(
+    task_name: str = None,
+    queue: str = DEFAULT_TASK_QUEUE,
+    priority: TaskPriority = TaskPriority.NORMAL,
+    coalesce_key: typing.Callable[..., str] = None,
+):
+    """
+    Register the decorated function as a task which can be run by the task
+    processor using `delay`.
+
+    If `coalesce_key` is given, it is called with the task's args and kwargs and,
+    when using the task processor, delaying the task is a no-op while a task with
+    the same key is waiting to be run (other than to bring its schedule forward,
+    if needed). Only use this for tasks which read the state they act on when
+    they are run, so that a single run covers all the requests.
+    """
 
+    def decorator(f: typing.Callable):
+        task_identifier = _get_task_identifier(f, task_name)
         register_task(task_identifier, f)
 
         def delay(
@@ -47,24 +66,315 @@ def register_task_handler(task_name: str = None):
                 logger.debug("Running task '%s' in separate thread", task_identifier)
                 run_in_thread(args=args, kwargs=kwargs)
             else:
-                logger.debug("Creating task for function '%s'...", task_identifier)
-                task = Task.schedule_task(
-                    schedule_for=delay_until or timezone.now(),
-                    task_identifier=task_identifier,
-                    args=args,
-                    kwargs=kwargs,
+                return _create_task(
+                    task_identifier,
+                    args,
+                    kwargs,
+                    delay_until=delay_until,
+                    queue=queue,
+                    priority=priority,
+                    coalesce_key=coalesce_key,
                 )
-                task.save()
-                return task
+
+        def delay_many(
+            *,
+            args_list: typing.Iterable[typing.Tuple] = None,
+            kwargs_list: typing.Iterable[typing.Dict] = None,
+            delay_until: datetime = None,
+        ) -> typing.List[Task]:
+            """
+            Run the task once for each of the given args (and / or kwargs). When
+            using the task processor, the tasks are created in bulk, using a single
+            query per batch of (at most) BULK_CREATE_BATCH_SIZE tasks, and the
+            created tasks are returned.
+            """
+            return _delay_many(
+                f,
+                task_identifier,
+                _get_calls(args_list, kwargs_list),
+                delay_until=delay_until,
+                queue=queue,
+                priority=priority,
+                coalesce_key=coalesce_key,
+            )
+
+        def fan_out(
+            items: typing.Iterable,
+            *,
+            batch_size: int,
+            args: typing.Tuple = (),
+            kwargs: typing.Dict = None,
+            delay_until: datetime = None,
+        ) -> typing.List[Task]:
+            """
+            Split the items into batches of (at most) `batch_size` items and run
+            the task for each batch (using `delay_many`), passing the batch as the
+            last positional argument, i.e. `f(*args, batch, **kwargs)`.
+            """
+            return _delay_many(
+                f,
+                task_identifier,
+                _get_fan_out_calls(items, batch_size, args, kwargs),
+                delay_until=delay_until,
+                queue=queue,
+                priority=priority,
+                coalesce_key=coalesce_key,
+            )
 
         def run_in_thread(*, args: typing.Tuple = (), kwargs: typing.Dict = None):
             logger.info("Running function %s in unmanaged thread.", f.__name__)
             Thread(target=f, args=args, kwargs=kwargs, daemon=True).start()
 
         f.delay = delay
+        f.delay_many = delay_many
+        f.fan_out = fan_out
         f.run_in_thread = run_in_thread
         f.task_identifier = task_identifier
+        f.queue = queue
+        f.priority = priority
+
+        return f
+
+    return decorator
+
 
+def register_recurring_task(
+    run_every: timedelta,
+    task_name: str = None,
+    args: typing.Tuple = (),
+    kwargs: typing.Dict[str, typing.Any] = None,
+):
+    """
+    Register the decorated function to be run (with the given args and kwargs)
+    every `run_every` by the task processor. However many task processor
+    instances are running, each run is only executed by one of them.
+    """
+
+    def decorator(f: typing.Callable):
+        task_identifier = _get_task_identifier(f, task_name)
+        register_task(task_identifier, f)
+        register_recurring_task_config(
+            task_identifier,
+            RecurringTaskConfig(run_every=run_every, args=args, kwargs=kwargs or {}),
+        )
+
+        f.task_identifier = task_identifier
         return f
 
     return decorator
+
+
+def _delay_many(
+    f: typing.Callable,
+    task_identifier: str,
+    calls: typing.List[typing.Tuple[typing.Tuple, typing.Dict]],
+    delay_until: typing.Optional[datetime],
+    queue: str,
+    priority: TaskPriority,
+    coalesce_key: typing.Optional[typing.Callable[..., str]],
+) -> typing.List[Task]:
+    if not calls:
+        return []
+
+    logger.debug(
+        "Request to run task '%s' asynchronously %d times.",
+        task_identifier,
+        len(calls),
+    )
+
+    if settings.TASK_RUN_METHOD != TaskRunMethod.TASK_PROCESSOR:
+        _run_calls_without_task_processor(f, calls, delay_until)
+        return []
+
+    tasks = _create_tasks(
+        task_identifier,
+        calls,
+        delay_until=delay_until,
+        queue=queue,
+        priority=priority,
+        coalesce_key=coalesce_key,
+    )
+    if tasks and not delay_until:
+        notify_task_created()
+    return tasks
+
+
+def _get_coalesce_key(
+    task_identifier: str,
+    coalesce_key: typing.Optional[typing.Callable[..., str]],
+    args: typing.Tuple,
+    kwargs: typing.Dict,
+) -> typing.Optional[str]:
+    if not coalesce_key:
+        return None
+    return f"{task_identifier}:{coalesce_key(*args, **kwargs)}"
+
+
+def _get_calls(
+    args_list: typing.Optional[typing.Iterable[typing.Tuple]],
+    kwargs_list: typing.Optional[typing.Iterable[typing.Dict]],
+) -> typing.List[typing.Tuple[typing.Tuple, typing.Dict]]:
+    args_list = list(args_list) if args_list is not None else None
+    kwargs_list = list(kwargs_list) if kwargs_list is not None else None
+
+    if args_list is None and kwargs_list is None:
+        return []
+    if args_list is None:
+        args_list = [()] * len(kwargs_list)
+    if kwargs_list is None:
+        kwargs_list = [{}] * len(args_list)
+
+    if len(args_list) != len(kwargs_list):
+        raise ValueError("args_list and kwargs_list must be the same length.")
+
+    return [(tuple(args), kwargs or {}) for args, kwargs in zip(args_list, kwargs_list)]
+
+
+def _create_task(
+    task_identifier: str,
+    args: typing.Tuple,
+    kwargs: typing.Dict,
+    delay_until: typing.Optional[datetime],
+    queue: str,
+    priority: TaskPriority,
+    coalesce_key: typing.Optional[typing.Callable[..., str]],
+) -> Task:
+    schedule_for = delay_until or timezone.now()
+    task_coalesce_key = _get_coalesce_key(task_identifier, coalesce_key, args, kwargs)
+
+    task = task_coalesce_key and _get_coalesced_task(task_coalesce_key, schedule_for)
+    if task:
+        logger.debug(
+            "Coalesced task for function '%s' with pending task %s.",
+            task_identifier,
+            task.uuid,
+        )
+        return task
+
+    logger.debug("Creating task for function '%s'...", task_identifier)
+    task = Task.schedule_task(
+        schedule_for=schedule_for,
+        task_identifier=task_identifier,
+        args=args,
+        kwargs=kwargs,
+        queue=queue,
+        priority=priority,
+        coalesce_key=task_coalesce_key,
+    )
+    task.save()
+    if not delay_until:
+        notify_task_created()
+    return task
+
+
+def _create_tasks(
+    task_identifier: str,
+    calls: typing.List[typing.Tuple[typing.Tuple, typing.Dict]],
+    delay_until: typing.Optional[datetime],
+    queue: str,
+    priority: TaskPriority,
+    coalesce_key: typing.Optional[typing.Callable[..., str]],
+) -> typing.List[Task]:
+    task_coalesce_keys = [
+        _get_coalesce_key(task_identifier, coalesce_key, args, kwargs)
+        for args, kwargs in calls
+    ]
+    # tasks are not created for keys which already have a pending task, nor for
+    # duplicate keys
+    skipped_coalesce_keys = (
+        Task.get_pending_coalesce_keys(task_coalesce_keys) if coalesce_key else set()
+    )
+
+    tasks = []
+    for (args, kwargs), task_coalesce_key in zip(calls, task_coalesce_keys):
+        if task_coalesce_key in skipped_coalesce_keys:
+            continue
+        if task_coalesce_key:
+            skipped_coalesce_keys.add(task_coalesce_key)
+
+        tasks.append(
+            Task.schedule_task(
+                schedule_for=delay_until or timezone.now(),
+                task_identifier=task_identifier,
+                args=args,
+                kwargs=kwargs,
+                queue=queue,
+                priority=priority,
+                coalesce_key=task_coalesce_key,
+            )
+        )
+
+    logger.debug("Creating %d tasks for function '%s'...", len(tasks), task_identifier)
+    return Task.objects.bulk_create(tasks, batch_size=BULK_CREATE_BATCH_SIZE)
+
+
+def _get_fan_out_calls(
+    items: typing.Iterable,
+    batch_size: int,
+    args: typing.Tuple,
+    kwargs: typing.Optional[typing.Dict],
+) -> typing.List[typing.Tuple[typing.Tuple, typing.Dict]]:
+    return [((*args, batch), kwargs or {}) for batch in _get_batches(items, batch_size)]
+
+
+def _get_batches(
+    items: typing.Iterable, batch_size: int
+) -> typing.Generator[typing.List, None, None]:
+    iterator = iter(items)
+    batch = list(islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, batch_size))
+
+
+def _run_calls_without_task_processor(
+    f: typing.Callable,
+    calls: typing.List[typing.Tuple[typing.Tuple, typing.Dict]],
+    delay_until: typing.Optional[datetime],
+) -> None:
+    if delay_until:
+        logger.warning(
+            "Cannot schedule tasks to run in the future without task processor."
+        )
+        return
+
+    if settings.TASK_RUN_METHOD == TaskRunMethod.SYNCHRONOUSLY:
+        logger.debug("Running function %s synchronously", f.__name__)
+        for args, kwargs in calls:
+            f(*args, **kwargs)
+    else:
+        logger.debug("Running function %s in separate thread", f.__name__)
+        Thread(target=_run_calls, args=(f, calls), daemon=True).start()
+
+
+def _run_calls(
+    f: typing.Callable, calls: typing.List[typing.Tuple[typing.Tuple, typing.Dict]]
+) -> None:
+    for args, kwargs in calls:
+        try:
+            f(*args, **kwargs)
+        except Exception:
+            logger.exception("Error running %s in unmanaged thread.", f.__name__)
+
+
+def _get_task_identifier(f: typing.Callable, task_name: str = None) -> str:
+    task_name = task_name or f.__name__
+    task_module = getmodule(f).__name__.rsplit(".")[-1]
+    return f"{task_module}.{task_name}"
+
+
+def _get_coalesced_task(
+    coalesce_key: str, schedule_for: datetime
+) -> typing.Optional[Task]:
+    pending_task = Task.get_pending_coalesced_task(coalesce_key)
+    if not pending_task or pending_task.scheduled_for <= schedule_for:
+        return pending_task
+
+    # bring the pending task forward, unless it has been claimed in the meantime
+    # (in which case a new task is needed)
+    if Task.objects.filter(id=pending_task.id, locked_until__isnull=True).update(
+        scheduled_for=schedule_for
+    ):
+        pending_task.scheduled_for = schedule_for
+        notify_task_created()
+        return pending_task
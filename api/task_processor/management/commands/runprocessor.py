@@ -1,16 +1,29 @@
 import logging
+import multiprocessing
+import queue
 import signal
 import time
 import typing
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 from datetime import timedelta
 
 from django.core.management import BaseCommand
+from django.db import connections
 from django.utils import timezone
 
-from task_processor.task_registry import registered_tasks
+from task_processor.metrics import (
+    ProcessMetrics,
+    get_process_metrics,
+    start_metrics_server,
+)
+from task_processor.processor import initialise_recurring_tasks
+from task_processor.task_registry import (
+    registered_recurring_tasks,
+    registered_tasks,
+)
 from task_processor.thread_monitoring import (
     clear_unhealthy_threads,
+    write_unhealthy_thread_names,
     write_unhealthy_threads,
 )
 from task_processor.threads import TaskRunner
@@ -28,71 +41,256 @@ class Command(BaseCommand):
         self._threads: typing.List[TaskRunner] = []
         self._monitor_threads = True
 
+        # only used when running the task runners in (forked) worker processes
+        self._processes: typing.Dict[int, multiprocessing.Process] = {}
+        self._process_health: typing.Dict[
+            int, typing.Tuple[float, typing.List[str]]
+        ] = {}
+        self._health_queue: typing.Optional[multiprocessing.Queue] = None
+
+        # the latest metrics reported by each (worker) process, by process name
+        self._process_metrics: typing.Dict[str, ProcessMetrics] = {}
+        self._metrics_server = None
+
     def add_arguments(self, parser: ArgumentParser):
         parser.add_argument(
             "--numthreads",
             type=int,
-            help="Number of worker threads to run.",
+            help="Number of worker threads to run (in each worker process).",
             default=5,
         )
+        parser.add_argument(
+            "--numprocesses",
+            type=int,
+            help="Number of worker processes to run, each running `--numthreads` "
+            "worker threads. Worker processes which die or stop responding are "
+            "restarted. By default, the worker threads are run in this process.",
+            default=0,
+        )
         parser.add_argument(
             "--sleepintervalms",
             type=int,
-            help="Number of millis each worker waits before checking for new tasks",
+            help="Maximum number of millis each worker waits before checking for new "
+            "tasks. Note that, on postgres, workers are notified of new tasks.",
             default=2000,
         )
+        parser.add_argument(
+            "--minsleepintervalms",
+            type=int,
+            help="Number of millis each worker initially waits before checking for "
+            "new tasks when polling (i.e. when the database does not support "
+            "notifications).",
+            default=100,
+        )
         parser.add_argument(
             "--graceperiodms",
             type=int,
             help="Number of millis before running task is considered 'stuck'.",
             default=3000,
         )
+        parser.add_argument(
+            "--queue",
+            dest="queues",
+            action="append",
+            type=_parse_queue,
+            help="Queue to process tasks from, optionally with a weight, e.g. "
+            "`--queue default:3 --queue bulk:1` to pop tasks from the default queue "
+            "3 times as often as from the bulk queue. By default, tasks are "
+            "processed from all queues.",
+            metavar="QUEUE[:WEIGHT]",
+        )
         parser.add_argument(
             "--queuepopsize",
             type=int,
             help="Number of tasks each worker will pop from the queue on each cycle.",
             default=10,
         )
+        parser.add_argument(
+            "--metricsport",
+            type=int,
+            help="Port to serve the task processor metrics on, in the prometheus "
+            "text format. By default, metrics are not served.",
+            default=None,
+        )
 
     def handle(self, *args, **options):
-        num_threads = options["numthreads"]
+        num_processes = options["numprocesses"]
         sleep_interval_ms = options["sleepintervalms"]
         grace_period_ms = options["graceperiodms"]
-        queue_pop_size = options["queuepopsize"]
 
-        self._threads.extend(
-            [
-                TaskRunner(
-                    sleep_interval_millis=sleep_interval_ms,
-                    queue_pop_size=queue_pop_size,
-                )
-                for _ in range(num_threads)
-            ]
-        )
+        self._num_threads = options["numthreads"]
+        self._task_runner_kwargs = {
+            "sleep_interval_millis": sleep_interval_ms,
+            "min_sleep_interval_millis": options["minsleepintervalms"],
+            "queue_pop_size": options["queuepopsize"],
+            "queue_weights": dict(options["queues"] or []),
+        }
+        self._ms_before_unhealthy = grace_period_ms + sleep_interval_ms
 
         logger.info(
             "Processor starting. Registered tasks are: %s",
             list(registered_tasks.keys()),
         )
+        if registered_recurring_tasks:
+            logger.info(
+                "Registered recurring tasks are: %s", list(registered_recurring_tasks)
+            )
+            initialise_recurring_tasks()
+        if self._task_runner_kwargs["queue_weights"]:
+            logger.info(
+                "Processing tasks from queues: %s",
+                self._task_runner_kwargs["queue_weights"],
+            )
+
+        if options["metricsport"]:
+            self._metrics_server = start_metrics_server(
+                options["metricsport"], lambda: dict(self._process_metrics)
+            )
+
+        clear_unhealthy_threads()
+        if num_processes:
+            self._run_processes(num_processes)
+        else:
+            self._run_threads(report_health=self._write_unhealthy_threads)
+
+    def _run_threads(
+        self, report_health: typing.Callable[[typing.List[TaskRunner]], None]
+    ) -> None:
+        self._threads.extend(
+            [TaskRunner(**self._task_runner_kwargs) for _ in range(self._num_threads)]
+        )
 
         for thread in self._threads:
             thread.start()
 
-        clear_unhealthy_threads()
         while self._monitor_threads:
             time.sleep(1)
-            unhealthy_threads = self._get_unhealthy_threads(
-                ms_before_unhealthy=grace_period_ms + sleep_interval_ms
+            report_health(
+                self._get_unhealthy_threads(
+                    ms_before_unhealthy=self._ms_before_unhealthy
+                )
             )
-            if unhealthy_threads:
-                write_unhealthy_threads(unhealthy_threads)
 
         [t.join() for t in self._threads]
 
+    def _write_unhealthy_threads(
+        self, unhealthy_threads: typing.List[TaskRunner]
+    ) -> None:
+        if unhealthy_threads:
+            write_unhealthy_threads(unhealthy_threads)
+        self._process_metrics = {
+            multiprocessing.current_process().name: get_process_metrics(self._threads)
+        }
+
+    def _run_processes(self, num_processes: int) -> None:
+        context = multiprocessing.get_context("fork")
+        self._health_queue = context.Queue()
+
+        for process_number in range(num_processes):
+            self._start_process(process_number)
+
+        while self._monitor_threads:
+            time.sleep(1)
+            unhealthy_thread_names = self._supervise_processes()
+            if unhealthy_thread_names:
+                write_unhealthy_thread_names(unhealthy_thread_names)
+
+        [p.join() for p in self._processes.values()]
+
+    def _start_process(self, process_number: int) -> None:
+        # database connections must not be shared with the forked process
+        connections.close_all()
+
+        process = multiprocessing.get_context("fork").Process(
+            target=self._run_process,
+            args=(process_number,),
+            name=f"TaskProcessor-{process_number}",
+        )
+        process.start()
+        self._processes[process_number] = process
+        self._process_health[process_number] = (time.monotonic(), [])
+
+    def _run_process(self, process_number: int) -> None:
+        # this runs in the forked worker process, which reports the health of
+        # its threads, and its metrics, to the parent process (once a second)
+        self._processes = {}
+        if self._metrics_server:
+            # the metrics are served by the parent process
+            self._metrics_server.socket.close()
+        process_name = multiprocessing.current_process().name
+
+        def report_health(unhealthy_threads: typing.List[TaskRunner]) -> None:
+            self._health_queue.put(
+                (
+                    process_number,
+                    [f"{process_name}:{t.name}" for t in unhealthy_threads],
+                    get_process_metrics(self._threads),
+                )
+            )
+
+        self._run_threads(report_health=report_health)
+
+    def _supervise_processes(self) -> typing.List[str]:
+        """
+        Restart any worker processes which have died, kill any which have stopped
+        reporting their health, and return the names of the unhealthy processes
+        and threads.
+        """
+        while True:
+            try:
+                (
+                    process_number,
+                    unhealthy_thread_names,
+                    process_metrics,
+                ) = self._health_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._process_metrics[
+                self._processes[process_number].name
+            ] = process_metrics
+            self._process_health[process_number] = (
+                time.monotonic(),
+                unhealthy_thread_names,
+            )
+
+        unhealthy_names = []
+        healthy_threshold = time.monotonic() - self._ms_before_unhealthy / 1000
+
+        for process_number, process in list(self._processes.items()):
+            if not self._monitor_threads:
+                # don't restart processes which are being stopped
+                break
+
+            last_reported_at, unhealthy_thread_names = self._process_health[
+                process_number
+            ]
+            if not process.is_alive():
+                logger.warning(
+                    "Task processor process %s exited with code %s, restarting.",
+                    process.name,
+                    process.exitcode,
+                )
+                unhealthy_names.append(process.name)
+                self._start_process(process_number)
+            elif last_reported_at < healthy_threshold:
+                # the process is restarted once it has exited
+                logger.warning(
+                    "Task processor process %s is not responding, killing.",
+                    process.name,
+                )
+                unhealthy_names.append(process.name)
+                process.kill()
+            else:
+                unhealthy_names.extend(unhealthy_thread_names)
+
+        return unhealthy_names
+
     def _exit_gracefully(self, *args):
         self._monitor_threads = False
         for t in self._threads:
             t.stop()
+        for p in self._processes.values():
+            p.terminate()
 
     def _get_unhealthy_threads(
         self, ms_before_unhealthy: int
@@ -108,3 +306,17 @@ class Command(BaseCommand):
             ):
                 unhealthy_threads.append(thread)
         return unhealthy_threads
+
+
+def _parse_queue(value: str) -> typing.Tuple[str, int]:
+    queue, _, weight = value.partition(":")
+    try:
+        weight = int(weight or 1)
+    except ValueError:
+        weight = 0
+    if not queue or weight < 1:
+        raise ArgumentTypeError(
+            f"'{value}' is not a valid queue, expected QUEUE[:WEIGHT] where WEIGHT "
+            "is a positive integer."
+        )
+    return queue, weight
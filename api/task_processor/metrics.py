@@ -0,0 +1,280 @@
+import logging
+import threading
+import typing
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.db import connection
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from task_processor.models import AbstractTaskRun, Task
+
+logger = logging.getLogger(__name__)
+
+# upper bounds (in seconds) of the task run duration histogram buckets
+TASK_RUN_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass
+class TaskRunStats:
+    # the number of runs by result
+    num_runs: typing.Dict[str, int] = field(default_factory=dict)
+    # the total duration of the (finished) runs
+    duration_seconds: float = 0.0
+    # the number of finished runs in each duration bucket (i.e. not cumulative),
+    # with an extra bucket for the runs longer than the largest bucket
+    bucket_counts: typing.List[int] = field(
+        default_factory=lambda: [0] * (len(TASK_RUN_DURATION_BUCKETS) + 1)
+    )
+
+
+@dataclass
+class ProcessMetrics:
+    # the stats of the tasks run by the process, by task identifier
+    task_run_stats: typing.Dict[str, TaskRunStats]
+    # the (unix) time at which each task runner last checked for tasks
+    thread_last_polls: typing.Dict[str, float]
+    # the number of webhook deliveries made by the process, by result
+    webhook_deliveries: typing.Dict[str, int] = field(default_factory=dict)
+
+
+class TaskProcessorMetrics:
+    """
+    Counts the tasks run by the task runners of the current process, by task
+    identifier and result, and how long they took to finish. The counters are
+    kept in memory, so they are reset when the process restarts.
+    """
+
+    def __init__(self):
+        self._task_run_stats: typing.Dict[str, TaskRunStats] = {}
+        self._lock = threading.Lock()
+
+    def record_task_runs(self, task_runs: typing.Iterable[AbstractTaskRun]) -> None:
+        with self._lock:
+            for task_run in task_runs:
+                stats = self._task_run_stats.setdefault(
+                    task_run.task.task_identifier, TaskRunStats()
+                )
+                stats.num_runs[task_run.result] = (
+                    stats.num_runs.get(task_run.result, 0) + 1
+                )
+                if not task_run.finished_at:
+                    continue
+
+                duration_seconds = (
+                    task_run.finished_at - task_run.started_at
+                ).total_seconds()
+                stats.duration_seconds += duration_seconds
+                stats.bucket_counts[
+                    bisect_left(TASK_RUN_DURATION_BUCKETS, duration_seconds)
+                ] += 1
+
+    def get_task_run_stats(self) -> typing.Dict[str, TaskRunStats]:
+        with self._lock:
+            return {
+                task_identifier: TaskRunStats(
+                    num_runs=dict(stats.num_runs),
+                    duration_seconds=stats.duration_seconds,
+                    bucket_counts=list(stats.bucket_counts),
+                )
+                for task_identifier, stats in self._task_run_stats.items()
+            }
+
+
+task_processor_metrics = TaskProcessorMetrics()
+
+
+def get_process_metrics(threads: typing.Iterable[threading.Thread]) -> ProcessMetrics:
+    # webhooks are delivered by the call_webhook task, so the delivery metrics are
+    # kept by the task processor processes
+    from webhooks.webhooks import get_webhook_delivery_metrics
+
+    return ProcessMetrics(
+        task_run_stats=task_processor_metrics.get_task_run_stats(),
+        thread_last_polls={
+            thread.name: thread.last_checked_for_tasks.timestamp()
+            for thread in threads
+            if getattr(thread, "last_checked_for_tasks", None)
+        },
+        webhook_deliveries=get_webhook_delivery_metrics(),
+    )
+
+
+def render_metrics(process_metrics: typing.Dict[str, ProcessMetrics]) -> str:
+    """
+    Render the task processor metrics in the prometheus text format, given the
+    metrics of each task processor process (by process name). The metrics of the
+    task queue are read from the database.
+    """
+    lines = [
+        *_render_task_queue_metrics(),
+        *_render_task_run_metrics(process_metrics),
+        *_render_thread_metrics(process_metrics),
+        *_render_webhook_delivery_metrics(process_metrics),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(
+    port: int,
+    get_metrics: typing.Callable[[], typing.Dict[str, ProcessMetrics]],
+) -> ThreadingHTTPServer:
+    """
+    Serve the task processor metrics (see `render_metrics`) on the given port, in
+    a background thread.
+    """
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+
+            try:
+                body = render_metrics(get_metrics()).encode()
+            except Exception:
+                logger.exception("Error rendering task processor metrics.")
+                self.send_error(500)
+                return
+            finally:
+                # each request is handled in a new thread, with its own connection
+                connection.close()
+
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    server = ThreadingHTTPServer(("", port), MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="TaskProcessorMetrics", daemon=True
+    ).start()
+    logger.info("Serving task processor metrics on port %d.", port)
+    return server
+
+
+def _render_task_queue_metrics() -> typing.List[str]:
+    now = timezone.now()
+    pending_tasks = (
+        Task.objects.filter(completed=False, num_failures__lt=3, scheduled_for__lte=now)
+        .values("task_identifier")
+        .annotate(count=Count("id"), oldest_scheduled_for=Min("scheduled_for"))
+        .order_by("task_identifier")
+    )
+    failed_tasks = Task.objects.filter(completed=False, num_failures__gte=3).count()
+
+    lines = [
+        "# HELP task_processor_pending_tasks Number of tasks which are due to run.",
+        "# TYPE task_processor_pending_tasks gauge",
+    ]
+    age_lines = [
+        "# HELP task_processor_oldest_pending_task_age_seconds Number of seconds "
+        "since the oldest pending task was due to run.",
+        "# TYPE task_processor_oldest_pending_task_age_seconds gauge",
+    ]
+    for pending in pending_tasks:
+        labels = _format_labels(task_identifier=pending["task_identifier"])
+        age_seconds = (now - pending["oldest_scheduled_for"]).total_seconds()
+        lines.append(f"task_processor_pending_tasks{labels} {pending['count']}")
+        age_lines.append(
+            f"task_processor_oldest_pending_task_age_seconds{labels} {age_seconds}"
+        )
+
+    return [
+        *lines,
+        *age_lines,
+        "# HELP task_processor_failed_tasks Number of tasks which have failed too "
+        "many times to be retried.",
+        "# TYPE task_processor_failed_tasks gauge",
+        f"task_processor_failed_tasks {failed_tasks}",
+    ]
+
+
+def _render_task_run_metrics(
+    process_metrics: typing.Dict[str, ProcessMetrics]
+) -> typing.List[str]:
+    runs_name = "task_processor_task_runs_total"
+    duration_name = "task_processor_task_run_duration_seconds"
+    runs_lines = [
+        f"# HELP {runs_name} Number of task runs, by task identifier and result.",
+        f"# TYPE {runs_name} counter",
+    ]
+    duration_lines = [
+        f"# HELP {duration_name} Duration of the finished task runs.",
+        f"# TYPE {duration_name} histogram",
+    ]
+    for process_name, metrics in sorted(process_metrics.items()):
+        for task_identifier, stats in sorted(metrics.task_run_stats.items()):
+            labels = {"process": process_name, "task_identifier": task_identifier}
+            for result, num_runs in sorted(stats.num_runs.items()):
+                result_labels = _format_labels(**labels, result=result)
+                runs_lines.append(f"{runs_name}{result_labels} {num_runs}")
+            duration_lines.extend(_render_histogram(duration_name, labels, stats))
+    return [*runs_lines, *duration_lines]
+
+
+def _render_histogram(
+    name: str, labels: typing.Dict[str, str], stats: TaskRunStats
+) -> typing.List[str]:
+    lines = []
+    cumulative_count = 0
+    for le, bucket_count in zip(
+        (*TASK_RUN_DURATION_BUCKETS, "+Inf"), stats.bucket_counts
+    ):
+        cumulative_count += bucket_count
+        lines.append(
+            f"{name}_bucket{_format_labels(**labels, le=le)} {cumulative_count}"
+        )
+    lines.append(f"{name}_sum{_format_labels(**labels)} {stats.duration_seconds}")
+    lines.append(f"{name}_count{_format_labels(**labels)} {cumulative_count}")
+    return lines
+
+
+def _render_thread_metrics(
+    process_metrics: typing.Dict[str, ProcessMetrics]
+) -> typing.List[str]:
+    name = "task_processor_thread_last_poll_timestamp_seconds"
+    lines = [
+        f"# HELP {name} Time at which each task runner last checked for tasks.",
+        f"# TYPE {name} gauge",
+    ]
+    for process_name, metrics in sorted(process_metrics.items()):
+        for thread_name, last_poll in sorted(metrics.thread_last_polls.items()):
+            labels = _format_labels(process=process_name, thread=thread_name)
+            lines.append(f"{name}{labels} {last_poll}")
+    return lines
+
+
+def _render_webhook_delivery_metrics(
+    process_metrics: typing.Dict[str, ProcessMetrics]
+) -> typing.List[str]:
+    name = "task_processor_webhook_deliveries_total"
+    lines = [
+        f"# HELP {name} Number of webhook deliveries, by result.",
+        f"# TYPE {name} counter",
+    ]
+    for process_name, metrics in sorted(process_metrics.items()):
+        for result, num_deliveries in sorted(metrics.webhook_deliveries.items()):
+            labels = _format_labels(process=process_name, result=result)
+            lines.append(f"{name}{labels} {num_deliveries}")
+    return lines
+
+
+def _format_labels(**labels: typing.Any) -> str:
+    formatted_labels = ",".join(
+        f'{key}="{_escape_label_value(str(value))}"' for key, value in labels.items()
+    )
+    return f"{{{formatted_labels}}}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
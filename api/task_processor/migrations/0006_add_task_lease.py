@@ -0,0 +1,23 @@
+# Generated by Django 3.2.18 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_processor', '0005_update_conditional_index_conditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_processor", "0006_add_task_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="priority",
+            field=models.SmallIntegerField(
+                choices=[
+                    (0, "Lowest"),
+                    (25, "Low"),
+                    (50, "Normal"),
+                    (75, "High"),
+                    (100, "Highest"),
+                ],
+                default=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="queue",
+            field=models.CharField(default="default", max_length=100),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+from core.migration_helpers import PostgresOnlyRunSQL
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("task_processor", "0007_add_task_queue_and_priority"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="task",
+                    name="incomplete_tasks_idx",
+                ),
+                migrations.AddIndex(
+                    model_name="task",
+                    index=models.Index(
+                        condition=models.Q(
+                            ("completed", False), ("num_failures__lt", 3)
+                        ),
+                        fields=["-priority", "scheduled_for"],
+                        name="incomplete_tasks_priority_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="task",
+                    index=models.Index(
+                        condition=models.Q(
+                            ("completed", False), ("num_failures__lt", 3)
+                        ),
+                        fields=["queue", "-priority", "scheduled_for"],
+                        name="incomplete_tasks_queue_idx",
+                    ),
+                ),
+            ],
+            database_operations=[
+                PostgresOnlyRunSQL(
+                    'CREATE INDEX CONCURRENTLY "incomplete_tasks_priority_idx" ON "task_processor_task" ("priority" DESC, "scheduled_for") WHERE (NOT "completed" and "num_failures" < 3);',
+                    reverse_sql='DROP INDEX CONCURRENTLY "incomplete_tasks_priority_idx";',
+                ),
+                PostgresOnlyRunSQL(
+                    'CREATE INDEX CONCURRENTLY "incomplete_tasks_queue_idx" ON "task_processor_task" ("queue", "priority" DESC, "scheduled_for") WHERE (NOT "completed" and "num_failures" < 3);',
+                    reverse_sql='DROP INDEX CONCURRENTLY "incomplete_tasks_queue_idx";',
+                ),
+                PostgresOnlyRunSQL(
+                    'DROP INDEX CONCURRENTLY "incomplete_tasks_idx";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY "incomplete_tasks_idx" ON "task_processor_task" ("scheduled_for") WHERE (NOT "completed" and "num_failures" < 3);',
+                ),
+            ],
+        )
+    ]
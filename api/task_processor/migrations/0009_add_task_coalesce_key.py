@@ -0,0 +1,18 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_processor", "0008_recreate_task_indexes_with_queue_and_priority"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="coalesce_key",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
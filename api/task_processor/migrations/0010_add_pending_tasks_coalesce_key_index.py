@@ -0,0 +1,40 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:41
+
+from django.db import migrations, models
+
+from core.migration_helpers import PostgresOnlyRunSQL
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("task_processor", "0009_add_task_coalesce_key"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="task",
+                    index=models.Index(
+                        condition=models.Q(
+                            ("coalesce_key__isnull", False),
+                            ("completed", False),
+                            ("locked_until__isnull", True),
+                            ("num_failures", 0),
+                        ),
+                        fields=["coalesce_key"],
+                        name="pending_tasks_coalesce_key_idx",
+                    ),
+                ),
+            ],
+            database_operations=[
+                PostgresOnlyRunSQL(
+                    'CREATE INDEX CONCURRENTLY "pending_tasks_coalesce_key_idx" ON "task_processor_task" ("coalesce_key") WHERE ("coalesce_key" IS NOT NULL AND NOT "completed" AND "locked_until" IS NULL AND "num_failures" = 0);',
+                    reverse_sql='DROP INDEX CONCURRENTLY "pending_tasks_coalesce_key_idx";',
+                ),
+            ],
+        )
+    ]
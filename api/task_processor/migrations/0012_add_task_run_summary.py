@@ -0,0 +1,48 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:55
+
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_processor", "0011_add_recurring_tasks"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskRunSummary",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_identifier", models.CharField(max_length=200)),
+                ("date", models.DateField()),
+                (
+                    "result",
+                    models.CharField(
+                        blank=True,
+                        choices=[("SUCCESS", "Success"), ("FAILURE", "Failure")],
+                        max_length=50,
+                        null=True,
+                    ),
+                ),
+                ("num_runs", models.PositiveIntegerField(default=0)),
+                (
+                    "total_duration",
+                    models.DurationField(default=datetime.timedelta),
+                ),
+            ],
+            options={
+                "unique_together": {("task_identifier", "date", "result")},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:55
+
+from django.db import migrations, models
+
+from core.migration_helpers import PostgresOnlyRunSQL
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("task_processor", "0012_add_task_run_summary"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="task",
+                    index=models.Index(
+                        condition=models.Q(
+                            ("completed", True),
+                            ("num_failures__gte", 3),
+                            _connector="OR",
+                        ),
+                        fields=["scheduled_for"],
+                        name="finished_tasks_idx",
+                    ),
+                ),
+            ],
+            database_operations=[
+                PostgresOnlyRunSQL(
+                    'CREATE INDEX CONCURRENTLY "finished_tasks_idx" ON "task_processor_task" ("scheduled_for") WHERE ("completed" OR "num_failures" >= 3);',
+                    reverse_sql='DROP INDEX CONCURRENTLY "finished_tasks_idx";',
+                ),
+            ],
+        )
+    ]
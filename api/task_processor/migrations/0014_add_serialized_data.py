@@ -0,0 +1,22 @@
+# Generated by Django 3.2.18 on 2026-10-19 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task_processor", "0013_add_finished_tasks_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recurringtask",
+            name="serialized_data",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="serialized_data",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
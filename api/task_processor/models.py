@@ -1,37 +1,131 @@
 import json
 import typing
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.db import models
 from django.utils import timezone
 
 from task_processor.exceptions import TaskProcessingError
+from task_processor.serialization import deserialize, serialize
 from task_processor.task_registry import registered_tasks
 
+DEFAULT_TASK_QUEUE = "default"
 
-class Task(models.Model):
+
+class TaskPriority(models.IntegerChoices):
+    LOWEST = 0
+    LOW = 25
+    NORMAL = 50
+    HIGH = 75
+    HIGHEST = 100
+
+
+class AbstractBaseTask(models.Model):
     uuid = models.UUIDField(unique=True, default=uuid.uuid4)
     created_at = models.DateTimeField(auto_now_add=True)
-    scheduled_for = models.DateTimeField(blank=True, null=True, default=timezone.now)
 
     task_identifier = models.CharField(max_length=200)
+    # the args and kwargs, serialized using task_processor.serialization
+    serialized_data = models.BinaryField(blank=True, null=True)
+    # the args and kwargs of tasks created before serialized_data was added,
+    # serialized to json text
     serialized_args = models.TextField(blank=True, null=True)
     serialized_kwargs = models.TextField(blank=True, null=True)
 
+    # lease taken by the worker running the task
+    locked_until = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=255, blank=True, null=True)
+
+    class Meta:
+        abstract = True
+
+    def run(self):
+        args, kwargs = self._get_call_arguments()
+        return self.callable(*args, **kwargs)
+
+    @property
+    def callable(self) -> typing.Callable:
+        try:
+            return registered_tasks[self.task_identifier]
+        except KeyError as e:
+            raise TaskProcessingError(
+                "No task registered with identifier '%s'. Ensure your task is "
+                "decorated with @register_task_handler.",
+                self.task_identifier,
+            ) from e
+
+    @property
+    def args(self) -> typing.List[typing.Any]:
+        return self._get_call_arguments()[0]
+
+    @property
+    def kwargs(self) -> typing.Dict[str, typing.Any]:
+        return self._get_call_arguments()[1]
+
+    @staticmethod
+    def serialize_call_arguments(
+        args: typing.Tuple[typing.Any] = None,
+        kwargs: typing.Dict[str, typing.Any] = None,
+    ) -> bytes:
+        return serialize((args or (), kwargs or {}))
+
+    def _get_call_arguments(
+        self,
+    ) -> typing.Tuple[typing.List[typing.Any], typing.Dict[str, typing.Any]]:
+        if self.serialized_data is not None:
+            args, kwargs = deserialize(self.serialized_data)
+            return args, kwargs
+
+        args = json.loads(self.serialized_args) if self.serialized_args else []
+        kwargs = json.loads(self.serialized_kwargs) if self.serialized_kwargs else {}
+        return args, kwargs
+
+
+class Task(AbstractBaseTask):
+    scheduled_for = models.DateTimeField(blank=True, null=True, default=timezone.now)
+
+    queue = models.CharField(max_length=100, default=DEFAULT_TASK_QUEUE)
+    priority = models.SmallIntegerField(
+        choices=TaskPriority.choices, default=TaskPriority.NORMAL
+    )
+
     # denormalise failures and completion so that we can use select_for_update
     num_failures = models.IntegerField(default=0)
     completed = models.BooleanField(default=False)
 
+    # tasks with the same coalesce key are only enqueued once while pending
+    coalesce_key = models.CharField(max_length=255, blank=True, null=True)
+
     class Meta:
         # We have customised the migration in 0004 to only apply this change to postgres databases
         # TODO: work out how to index the taskprocessor_task table for Oracle and MySQL
         indexes = [
             models.Index(
-                name="incomplete_tasks_idx",
-                fields=["scheduled_for"],
+                name="incomplete_tasks_priority_idx",
+                fields=["-priority", "scheduled_for"],
                 condition=models.Q(completed=False, num_failures__lt=3),
-            )
+            ),
+            models.Index(
+                name="incomplete_tasks_queue_idx",
+                fields=["queue", "-priority", "scheduled_for"],
+                condition=models.Q(completed=False, num_failures__lt=3),
+            ),
+            models.Index(
+                name="finished_tasks_idx",
+                fields=["scheduled_for"],
+                condition=models.Q(completed=True) | models.Q(num_failures__gte=3),
+            ),
+            models.Index(
+                name="pending_tasks_coalesce_key_idx",
+                fields=["coalesce_key"],
+                condition=models.Q(
+                    coalesce_key__isnull=False,
+                    completed=False,
+                    num_failures=0,
+                    locked_until__isnull=True,
+                ),
+            ),
         ]
 
     @classmethod
@@ -41,11 +135,16 @@ class Task(models.Model):
         *,
         args: typing.Tuple[typing.Any] = None,
         kwargs: typing.Dict[str, typing.Any] = None,
+        queue: str = DEFAULT_TASK_QUEUE,
+        priority: int = TaskPriority.NORMAL,
+        coalesce_key: str = None,
     ) -> "Task":
         return Task(
             task_identifier=task_identifier,
-            serialized_args=cls._serialize_data(args or tuple()),
-            serialized_kwargs=cls._serialize_data(kwargs or dict()),
+            serialized_data=cls.serialize_call_arguments(args, kwargs),
+            queue=queue,
+            priority=priority,
+            coalesce_key=coalesce_key,
         )
 
     @classmethod
@@ -56,45 +155,66 @@ class Task(models.Model):
         *,
         args: typing.Tuple[typing.Any] = None,
         kwargs: typing.Dict[str, typing.Any] = None,
+        queue: str = DEFAULT_TASK_QUEUE,
+        priority: int = TaskPriority.NORMAL,
+        coalesce_key: str = None,
     ) -> "Task":
-        task = cls.create(task_identifier=task_identifier, args=args, kwargs=kwargs)
+        task = cls.create(
+            task_identifier=task_identifier,
+            args=args,
+            kwargs=kwargs,
+            queue=queue,
+            priority=priority,
+            coalesce_key=coalesce_key,
+        )
         task.scheduled_for = schedule_for
         return task
 
-    def run(self):
-        return self.callable(*self.args, **self.kwargs)
+    @classmethod
+    def get_pending_coalesced_task(cls, coalesce_key: str) -> typing.Optional["Task"]:
+        """
+        Get the task with the given coalesce key which has not been started yet
+        (i.e. it has not been claimed by a task processor worker, nor failed).
+        """
+        return (
+            cls.objects.filter(
+                coalesce_key=coalesce_key,
+                completed=False,
+                num_failures=0,
+                locked_until__isnull=True,
+            )
+            .order_by("scheduled_for")
+            .first()
+        )
 
-    @property
-    def callable(self) -> typing.Callable:
-        try:
-            return registered_tasks[self.task_identifier]
-        except KeyError as e:
-            raise TaskProcessingError(
-                "No task registered with identifier '%s'. Ensure your task is "
-                "decorated with @register_task_handler.",
-                self.task_identifier,
-            ) from e
+    @classmethod
+    def get_pending_coalesce_keys(
+        cls, coalesce_keys: typing.Iterable[str]
+    ) -> typing.Set[str]:
+        """
+        Get which of the given coalesce keys have a task which has not been
+        started yet (see `get_pending_coalesced_task`).
+        """
+        return set(
+            cls.objects.filter(
+                coalesce_key__in=coalesce_keys,
+                completed=False,
+                num_failures=0,
+                locked_until__isnull=True,
+            ).values_list("coalesce_key", flat=True)
+        )
 
-    @property
-    def args(self) -> typing.List[typing.Any]:
-        if self.serialized_args:
-            return self._deserialize_data(self.serialized_args)
-        return []
 
-    @property
-    def kwargs(self) -> typing.Dict[str, typing.Any]:
-        if self.serialized_kwargs:
-            return self._deserialize_data(self.serialized_kwargs)
-        return {}
-
-    @staticmethod
-    def _serialize_data(data: typing.Any):
-        # TODO: add datetime support if needed
-        return json.dumps(data)
+class RecurringTask(AbstractBaseTask):
+    """
+    A task which is run every `run_every`, by a single task processor worker.
+    Recurring tasks are registered using @register_recurring_task, and are
+    created (or updated) when the task processor starts.
+    """
 
-    @staticmethod
-    def _deserialize_data(data: typing.Any):
-        return json.loads(data)
+    task_identifier = models.CharField(max_length=200, unique=True)
+    run_every = models.DurationField()
+    next_run_at = models.DateTimeField(default=timezone.now, db_index=True)
 
 
 class TaskResult(models.Choices):
@@ -102,8 +222,7 @@ class TaskResult(models.Choices):
     FAILURE = "FAILURE"
 
 
-class TaskRun(models.Model):
-    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="task_runs")
+class AbstractTaskRun(models.Model):
     started_at = models.DateTimeField()
     finished_at = models.DateTimeField(blank=True, null=True)
     result = models.CharField(
@@ -111,6 +230,39 @@ class TaskRun(models.Model):
     )
     error_details = models.TextField(blank=True, null=True)
 
+    class Meta:
+        abstract = True
+
+
+class TaskRun(AbstractTaskRun):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="task_runs")
+
+
+class RecurringTaskRun(AbstractTaskRun):
+    task = models.ForeignKey(
+        RecurringTask, on_delete=models.CASCADE, related_name="task_runs"
+    )
+
+
+class TaskRunSummary(models.Model):
+    """
+    The number (and total duration) of the runs of each task, per day and result.
+    Task runs are summarised when they are deleted, so that the history of the
+    task runs remains available.
+    """
+
+    task_identifier = models.CharField(max_length=200)
+    date = models.DateField()
+    result = models.CharField(
+        max_length=50, choices=TaskResult.choices, blank=True, null=True
+    )
+    num_runs = models.PositiveIntegerField(default=0)
+    # the total duration of the (finished) runs
+    total_duration = models.DurationField(default=timedelta)
+
+    class Meta:
+        unique_together = ("task_identifier", "date", "result")
+
 
 class HealthCheckModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,67 @@
+import logging
+import select
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+TASK_CREATED_CHANNEL = "task_processor_task_created"
+
+
+def is_notification_supported() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def notify_task_created() -> None:
+    """
+    Wake up the task runners waiting for new tasks. Note that, since NOTIFY is
+    transactional, the notification is only sent once the transaction that
+    created the task (if any) is committed.
+    """
+    if not is_notification_supported():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"NOTIFY {TASK_CREATED_CHANNEL}")
+
+
+class TaskCreatedListener:
+    """
+    Listens for the notifications sent by `notify_task_created` on the (postgres)
+    database connection of the current thread.
+    """
+
+    def __init__(self):
+        self._listening_connection = None
+
+    def wait(self, timeout_seconds: float) -> bool:
+        """
+        Block until a task is created, or the timeout expires. Returns True if a
+        task was created.
+        """
+        pg_connection = self._listen()
+
+        # notifications received while the connection was in use (e.g. while
+        # running tasks) have already been buffered
+        if self._consume_notifications(pg_connection):
+            return True
+
+        readable, _, _ = select.select([pg_connection], [], [], timeout_seconds)
+        return bool(readable) and self._consume_notifications(pg_connection)
+
+    def _listen(self):
+        connection.ensure_connection()
+        if connection.connection is not self._listening_connection:
+            # either this is the first wait, or the connection has been replaced
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {TASK_CREATED_CHANNEL}")
+            self._listening_connection = connection.connection
+            logger.debug("Listening for notifications on %s.", TASK_CREATED_CHANNEL)
+        return connection.connection
+
+    @staticmethod
+    def _consume_notifications(pg_connection) -> bool:
+        pg_connection.poll()
+        notified = bool(pg_connection.notifies)
+        pg_connection.notifies.clear()
+        return notified
@@ -1,56 +1,132 @@
 import logging
+import os
+import socket
+import threading
 import traceback
 import typing
+from datetime import timedelta
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from task_processor.models import Task, TaskResult, TaskRun
+from task_processor.metrics import task_processor_metrics
+from task_processor.models import (
+    RecurringTask,
+    RecurringTaskRun,
+    Task,
+    TaskResult,
+    TaskRun,
+)
+from task_processor.task_registry import registered_recurring_tasks
 
 logger = logging.getLogger(__name__)
 
 
-@transaction.atomic
-def run_tasks(num_tasks: int = 1) -> typing.List[TaskRun]:
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_tasks(
+    num_tasks: int = 1,
+    worker_id: str = None,
+    queues: typing.Optional[typing.List[str]] = None,
+) -> typing.List[TaskRun]:
+    """
+    Claim (up to) `num_tasks` tasks (from the given queues, or all queues if none
+    are given) in priority order by taking a lease on them, run them, and record
+    the results.
+
+    The row locks are only held while claiming the tasks, so that the tasks are
+    run outside of the claiming transaction. If the worker dies while running
+    the tasks, the lease expires (after TASK_PROCESSOR_LEASE_SECONDS) and the
+    tasks can be claimed by another worker.
+    """
     if num_tasks < 1:
         raise ValueError("Number of tasks to process must be at least one")
 
-    tasks = (
+    worker_id = worker_id or get_worker_id()
+
+    tasks = _claim_tasks(num_tasks, worker_id, queues)
+    if not tasks:
+        logger.debug("No tasks to process.")
+        return []
+
+    task_runs = []
+    for task in tasks:
+        task_run = _run_task(task)
+        if task_run:
+            task_runs.append(task_run)
+
+    _release_tasks(tasks, task_runs, worker_id)
+    task_processor_metrics.record_task_runs(task_runs)
+    return task_runs
+
+
+@transaction.atomic
+def _claim_tasks(
+    num_tasks: int, worker_id: str, queues: typing.Optional[typing.List[str]]
+) -> typing.List[Task]:
+    now = timezone.now()
+    queryset = (
         Task.objects.select_for_update(skip_locked=True)
-        .filter(num_failures__lt=3, scheduled_for__lte=timezone.now(), completed=False)
-        .order_by("scheduled_for")[:num_tasks]
+        .filter(num_failures__lt=3, scheduled_for__lte=now, completed=False)
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
     )
-    if tasks:
-        executed_tasks = []
-        task_runs = []
+    if queues:
+        queryset = queryset.filter(queue__in=queues)
 
-        for task in tasks:
-            executed_task, task_run = _run_task(task)
-            executed_tasks.append(executed_task)
-            task_runs.append(task_run)
+    tasks = list(queryset.order_by("-priority", "scheduled_for")[:num_tasks])
+    if not tasks:
+        return []
 
-        if executed_tasks:
-            Task.objects.bulk_update(
-                executed_tasks, fields=["completed", "num_failures"]
+    locked_until = now + timedelta(seconds=settings.TASK_PROCESSOR_LEASE_SECONDS)
+    for task in tasks:
+        if task.locked_until:
+            logger.warning(
+                "Lease on task %s held by %s expired, reclaiming.",
+                task.uuid,
+                task.locked_by,
             )
+        task.locked_until = locked_until
+        task.locked_by = worker_id
+
+    Task.objects.bulk_update(tasks, fields=["locked_until", "locked_by"])
+    return tasks
 
-        if task_runs:
-            TaskRun.objects.bulk_create(task_runs)
 
-        return task_runs
+@transaction.atomic
+def _release_tasks(
+    tasks: typing.List[Task], task_runs: typing.List[TaskRun], worker_id: str
+) -> None:
+    for task in tasks:
+        # if our lease expired and the task has been claimed by another
+        # worker, we leave the task (and its lease) alone
+        if not Task.objects.filter(id=task.id, locked_by=worker_id).update(
+            completed=task.completed,
+            num_failures=task.num_failures,
+            locked_until=None,
+            locked_by=None,
+        ):
+            logger.warning(
+                "Lease on task %s was lost before the task was released.", task.uuid
+            )
 
-    logger.debug("No tasks to process.")
-    return []
+    if task_runs:
+        TaskRun.objects.bulk_create(task_runs)
 
 
-def _run_task(task: Task) -> typing.Optional[typing.Tuple[Task, TaskRun]]:
+def _run_task(task: Task) -> typing.Optional[TaskRun]:
     if task.task_runs.filter(result=TaskResult.SUCCESS).exists():
-        # This should never happen due to the use of select_for_update above, but it's
-        # best to guard against it rather than try and execute the task twice.
+        # This should never happen due to the lease taken when claiming the task,
+        # but it's best to guard against it rather than try and execute the task
+        # twice. The task is marked as completed so that it isn't claimed again.
         logger.warning(
             "Task has already been processed successfully, not processing again."
         )
-        return
+        task.completed = True
+        return None
 
     task_run = TaskRun(started_at=timezone.now(), task=task)
 
@@ -66,4 +142,115 @@ def _run_task(task: Task) -> typing.Optional[typing.Tuple[Task, TaskRun]]:
         task_run.result = TaskResult.FAILURE
         task_run.error_details = str(traceback.format_exc())
 
-    return task, task_run
+    return task_run
+
+
+def initialise_recurring_tasks() -> None:
+    """
+    Create (or update) the recurring tasks registered using
+    @register_recurring_task.
+    """
+    for task_identifier, config in registered_recurring_tasks.items():
+        RecurringTask.objects.update_or_create(
+            task_identifier=task_identifier,
+            defaults={
+                "run_every": config.run_every,
+                "serialized_data": RecurringTask.serialize_call_arguments(
+                    config.args, config.kwargs
+                ),
+                "serialized_args": None,
+                "serialized_kwargs": None,
+            },
+        )
+
+
+def run_recurring_tasks(
+    num_tasks: int = 1, worker_id: str = None
+) -> typing.List[RecurringTaskRun]:
+    """
+    Claim (up to) `num_tasks` recurring tasks which are due to be run, run them,
+    and schedule their next run.
+
+    Recurring tasks are leased in the same way as tasks, so each run is only
+    executed by one worker.
+    """
+    if num_tasks < 1:
+        raise ValueError("Number of tasks to process must be at least one")
+
+    worker_id = worker_id or get_worker_id()
+
+    tasks = _claim_recurring_tasks(num_tasks, worker_id)
+    if not tasks:
+        return []
+
+    task_runs = [_run_recurring_task(task) for task in tasks]
+
+    _release_recurring_tasks(tasks, task_runs, worker_id)
+    task_processor_metrics.record_task_runs(task_runs)
+    return task_runs
+
+
+@transaction.atomic
+def _claim_recurring_tasks(
+    num_tasks: int, worker_id: str
+) -> typing.List[RecurringTask]:
+    now = timezone.now()
+    tasks = list(
+        RecurringTask.objects.select_for_update(skip_locked=True)
+        .filter(
+            # only run the recurring tasks that are (still) registered
+            task_identifier__in=list(registered_recurring_tasks),
+            next_run_at__lte=now,
+        )
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+        .order_by("next_run_at")[:num_tasks]
+    )
+    if not tasks:
+        return []
+
+    locked_until = now + timedelta(seconds=settings.TASK_PROCESSOR_LEASE_SECONDS)
+    for task in tasks:
+        task.locked_until = locked_until
+        task.locked_by = worker_id
+
+    RecurringTask.objects.bulk_update(tasks, fields=["locked_until", "locked_by"])
+    return tasks
+
+
+@transaction.atomic
+def _release_recurring_tasks(
+    tasks: typing.List[RecurringTask],
+    task_runs: typing.List[RecurringTaskRun],
+    worker_id: str,
+) -> None:
+    now = timezone.now()
+    for task in tasks:
+        next_run_at = task.next_run_at + task.run_every
+        if next_run_at <= now:
+            # skip any runs that were missed (e.g. while no processor was running)
+            next_run_at = now + task.run_every
+
+        if not RecurringTask.objects.filter(id=task.id, locked_by=worker_id).update(
+            next_run_at=next_run_at, locked_until=None, locked_by=None
+        ):
+            logger.warning(
+                "Lease on recurring task %s was lost before the task was released.",
+                task.task_identifier,
+            )
+
+    RecurringTaskRun.objects.bulk_create(task_runs)
+
+
+def _run_recurring_task(task: RecurringTask) -> RecurringTaskRun:
+    task_run = RecurringTaskRun(started_at=timezone.now(), task=task)
+
+    try:
+        task.run()
+        task_run.result = TaskResult.SUCCESS
+        task_run.finished_at = timezone.now()
+    except Exception:
+        logger.exception("Error running recurring task %s.", task.task_identifier)
+        task_run.result = TaskResult.FAILURE
+        task_run.error_details = str(traceback.format_exc())
+
+    return task_run
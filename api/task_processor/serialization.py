@@ -0,0 +1,62 @@
+import typing
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+
+import orjson
+
+# Values which can't be represented in json are serialized as an object with
+# the name of their type under this key, and their string representation
+# under the value key, e.g. {"__task_processor_type__": "datetime", "value": "..."}
+TYPE_KEY = "__task_processor_type__"
+VALUE_KEY = "value"
+
+_SERIALIZE_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_TYPE_DECODERS: typing.Dict[str, typing.Callable[[str], typing.Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "decimal": Decimal,
+}
+
+
+def serialize(data: typing.Any) -> bytes:
+    """
+    Serialize the given data to (compact) json. As well as the types supported
+    by json, datetimes, dates and decimals are serialized so that they are
+    deserialized to the same type. UUIDs are serialized as strings, and any
+    other mappings (e.g. request headers) as objects.
+    """
+    return orjson.dumps(data, default=_encode, option=_SERIALIZE_OPTIONS)
+
+
+def deserialize(data: typing.Union[bytes, memoryview]) -> typing.Any:
+    data = bytes(data)
+    deserialized_data = orjson.loads(data)
+    if TYPE_KEY.encode() not in data:
+        # nothing to decode, which is (by far) the most common case
+        return deserialized_data
+    return _decode(deserialized_data)
+
+
+def _encode(value: typing.Any) -> typing.Any:
+    # note that datetime must be checked before date, since it's a subclass
+    if isinstance(value, datetime):
+        return {TYPE_KEY: "datetime", VALUE_KEY: value.isoformat()}
+    if isinstance(value, date):
+        return {TYPE_KEY: "date", VALUE_KEY: value.isoformat()}
+    if isinstance(value, Decimal):
+        return {TYPE_KEY: "decimal", VALUE_KEY: str(value)}
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+def _decode(value: typing.Any) -> typing.Any:
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if TYPE_KEY in value:
+            return _TYPE_DECODERS[value[TYPE_KEY]](value[VALUE_KEY])
+        return {key: _decode(item) for key, item in value.items()}
+    return value
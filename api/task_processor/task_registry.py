@@ -1,9 +1,20 @@
 import logging
 import typing
+from dataclasses import dataclass, field
+from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class RecurringTaskConfig:
+    run_every: timedelta
+    args: typing.Tuple = ()
+    kwargs: typing.Dict[str, typing.Any] = field(default_factory=dict)
+
+
 registered_tasks: typing.Dict[str, typing.Callable] = {}
+registered_recurring_tasks: typing.Dict[str, RecurringTaskConfig] = {}
 
 
 def register_task(task_identifier: str, callable_: typing.Callable):
@@ -21,3 +32,9 @@ def register_task(task_identifier: str, callable_: typing.Callable):
 
 def get_task(task_identifier: str) -> typing.Callable:
     return registered_tasks[task_identifier]
+
+
+def register_recurring_task_config(task_identifier: str, config: RecurringTaskConfig):
+    logger.debug("Registering recurring task '%s'", task_identifier)
+
+    registered_recurring_tasks[task_identifier] = config
@@ -1,7 +1,31 @@
 import logging
+from datetime import datetime, timedelta
 
-from task_processor.decorators import register_task_handler
-from task_processor.models import HealthCheckModel
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Q,
+    QuerySet,
+    Sum,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from task_processor.decorators import (
+    register_recurring_task,
+    register_task_handler,
+)
+from task_processor.models import (
+    HealthCheckModel,
+    RecurringTaskRun,
+    Task,
+    TaskRun,
+    TaskRunSummary,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -10,3 +34,88 @@ logger = logging.getLogger(__name__)
 def create_health_check_model(health_check_model_uuid: str):
     logger.info("Creating health check model.")
     HealthCheckModel.objects.create(uuid=health_check_model_uuid)
+
+
+@register_recurring_task(run_every=timedelta(hours=1))
+def clean_up_old_tasks():
+    if not settings.ENABLE_CLEAN_UP_OLD_TASKS:
+        return
+
+    delete_before = timezone.now() - timedelta(days=settings.TASK_DELETE_RETENTION_DAYS)
+
+    num_deleted_tasks = 0
+    while num_deleted := _delete_old_tasks(delete_before):
+        num_deleted_tasks += num_deleted
+
+    num_deleted_recurring_task_runs = 0
+    while num_deleted := _delete_old_recurring_task_runs(delete_before):
+        num_deleted_recurring_task_runs += num_deleted
+
+    logger.info(
+        "Deleted %d tasks and %d recurring task runs.",
+        num_deleted_tasks,
+        num_deleted_recurring_task_runs,
+    )
+
+
+@transaction.atomic
+def _delete_old_tasks(delete_before: datetime) -> int:
+    finished = Q(completed=True)
+    if settings.TASK_DELETE_INCLUDE_FAILED_TASKS:
+        finished |= Q(num_failures__gte=3)
+
+    task_ids = list(
+        Task.objects.select_for_update(skip_locked=True)
+        .filter(finished, scheduled_for__lt=delete_before)
+        .values_list("id", flat=True)[: settings.TASK_DELETE_BATCH_SIZE]
+    )
+    if not task_ids:
+        return 0
+
+    _summarise_task_runs(TaskRun.objects.filter(task_id__in=task_ids))
+    Task.objects.filter(id__in=task_ids).delete()
+    return len(task_ids)
+
+
+@transaction.atomic
+def _delete_old_recurring_task_runs(delete_before: datetime) -> int:
+    task_run_ids = list(
+        RecurringTaskRun.objects.select_for_update(skip_locked=True)
+        .filter(started_at__lt=delete_before)
+        .values_list("id", flat=True)[: settings.TASK_DELETE_BATCH_SIZE]
+    )
+    if not task_run_ids:
+        return 0
+
+    task_runs = RecurringTaskRun.objects.filter(id__in=task_run_ids)
+    _summarise_task_runs(task_runs)
+    task_runs.delete()
+    return len(task_run_ids)
+
+
+def _summarise_task_runs(task_runs: QuerySet) -> None:
+    summaries = (
+        task_runs.annotate(date=TruncDate("started_at"))
+        .values("task__task_identifier", "date", "result")
+        .annotate(
+            num_runs=Count("id"),
+            total_duration=Sum(
+                ExpressionWrapper(
+                    F("finished_at") - F("started_at"), output_field=DurationField()
+                )
+            ),
+        )
+        .order_by()
+    )
+
+    for summary in summaries:
+        task_run_summary, _ = TaskRunSummary.objects.get_or_create(
+            task_identifier=summary["task__task_identifier"],
+            date=summary["date"],
+            result=summary["result"],
+        )
+        TaskRunSummary.objects.filter(id=task_run_summary.id).update(
+            num_runs=F("num_runs") + summary["num_runs"],
+            total_duration=F("total_duration")
+            + (summary["total_duration"] or timedelta()),
+        )
@@ -12,8 +12,12 @@ def clear_unhealthy_threads():
 
 
 def write_unhealthy_threads(unhealthy_threads: typing.List[Thread]):
+    write_unhealthy_thread_names([t.name for t in unhealthy_threads])
+
+
+def write_unhealthy_thread_names(unhealthy_thread_names: typing.List[str]):
     with open(UNHEALTHY_THREADS_FILE_PATH, "w+") as f:
-        f.write(json.dumps([t.name for t in unhealthy_threads]))
+        f.write(json.dumps(unhealthy_thread_names))
 
 
 def get_unhealthy_thread_names() -> typing.List[str]:
@@ -1,31 +1,99 @@
+import random
 import time
+import typing
 from threading import Thread
 
 from django.utils import timezone
 
-from task_processor.processor import run_tasks
+from task_processor.notifications import (
+    TaskCreatedListener,
+    is_notification_supported,
+)
+from task_processor.processor import run_recurring_tasks, run_tasks
 
 
 class TaskRunner(Thread):
+    """
+    Runs the tasks in the queue. While there are tasks in the queue, the runner
+    keeps popping them. Once the queue is empty, the runner waits (for at most
+    `sleep_interval_millis`) to be notified that a task has been created or, if
+    notifications are not supported by the database, polls the queue, backing off
+    from `min_sleep_interval_millis` up to `sleep_interval_millis`.
+
+    If `queue_weights` are given, the runner only runs tasks from those queues,
+    choosing which queue to pop tasks from next at random, in proportion to the
+    weight of each queue (falling back to the other queues if it is empty).
+    Otherwise, tasks are popped from all queues.
+    """
+
     def __init__(
         self,
         *args,
         sleep_interval_millis: int = 2000,
+        min_sleep_interval_millis: int = 100,
         queue_pop_size: int = 1,
+        queue_weights: typing.Dict[str, int] = None,
         **kwargs,
     ):
         super(TaskRunner, self).__init__(*args, **kwargs)
         self.sleep_interval_millis = sleep_interval_millis
+        self.min_sleep_interval_millis = min(
+            min_sleep_interval_millis, sleep_interval_millis
+        )
         self.queue_pop_size = queue_pop_size
+        self.queue_weights = queue_weights or {}
         self.last_checked_for_tasks = None
 
         self._stopped = False
+        self._listener = None
+        self._current_sleep_interval_millis = self.min_sleep_interval_millis
 
     def run(self) -> None:
+        if is_notification_supported():
+            self._listener = TaskCreatedListener()
+
         while not self._stopped:
             self.last_checked_for_tasks = timezone.now()
-            run_tasks(self.queue_pop_size)
-            time.sleep(self.sleep_interval_millis / 1000)
+            if self._run_tasks():
+                self._current_sleep_interval_millis = self.min_sleep_interval_millis
+                continue
+            self._wait_for_tasks()
+
+    def _run_tasks(self) -> bool:
+        # recurring tasks are run by all runners, regardless of their queues
+        ran_recurring_tasks = bool(run_recurring_tasks(self.queue_pop_size))
+
+        return self._run_queued_tasks() or ran_recurring_tasks
+
+    def _run_queued_tasks(self) -> bool:
+        if not self.queue_weights:
+            return bool(run_tasks(self.queue_pop_size))
+
+        for queue in self._get_queue_order():
+            if run_tasks(self.queue_pop_size, queues=[queue]):
+                return True
+        return False
+
+    def _get_queue_order(self) -> typing.List[str]:
+        queue_weights = dict(self.queue_weights)
+        queue_order = []
+        while queue_weights:
+            (queue,) = random.choices(
+                list(queue_weights), weights=list(queue_weights.values())
+            )
+            queue_order.append(queue)
+            del queue_weights[queue]
+        return queue_order
 
     def stop(self):
         self._stopped = True
+
+    def _wait_for_tasks(self) -> None:
+        if self._listener:
+            self._listener.wait(self.sleep_interval_millis / 1000)
+            return
+
+        time.sleep(self._current_sleep_interval_millis / 1000)
+        self._current_sleep_interval_millis = min(
+            self._current_sleep_interval_millis * 2, self.sleep_interval_millis
+        )
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+# Benchmarks are slow (they create large fixtures) so they are only collected
+# when explicitly requested, e.g.
+#   RUN_BENCHMARKS=1 pytest tests/benchmarks -s
+collect_ignore_glob = [] if os.getenv("RUN_BENCHMARKS") else ["test_*.py"]
+
+
+@pytest.fixture()
+def benchmark_rows() -> int:
+    return int(os.getenv("BENCHMARK_ROWS", 1_000_000))
+
+
+@pytest.fixture()
+def benchmark_tasks() -> int:
+    return int(os.getenv("BENCHMARK_TASKS", 10_000))
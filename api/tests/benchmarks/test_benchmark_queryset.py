@@ -0,0 +1,48 @@
+import time
+
+from django.core.paginator import Paginator
+
+from environments.identities.models import Identity
+from util.queryset import iterator_with_prefetch
+
+
+def _offset_iterator_with_prefetch(queryset, chunk_size=2000):
+    # The previous implementation of `iterator_with_prefetch`, kept here to
+    # compare against
+    paginator = Paginator(queryset.order_by("pk"), chunk_size)
+    for index in range(paginator.num_pages):
+        yield from paginator.get_page(index + 1)
+
+
+def test_benchmark_iterator_with_prefetch(environment, benchmark_rows):
+    # Given
+    batch_size = 10000
+    for start in range(0, benchmark_rows, batch_size):
+        Identity.objects.bulk_create(
+            Identity(identifier=f"identity_{i}", environment=environment)
+            for i in range(start, min(start + batch_size, benchmark_rows))
+        )
+
+    queryset = Identity.objects.filter(environment=environment).prefetch_related(
+        "identity_traits"
+    )
+    iterators = {
+        "offset pagination": lambda: _offset_iterator_with_prefetch(queryset),
+        "keyset pagination": lambda: iterator_with_prefetch(queryset),
+        "server side cursor": lambda: iterator_with_prefetch(
+            queryset, server_side_cursor=True
+        ),
+    }
+
+    # When
+    results = {}
+    for name, get_iterator in iterators.items():
+        start_time = time.perf_counter()
+        count = sum(1 for _ in get_iterator())
+        results[name] = time.perf_counter() - start_time
+        assert count == benchmark_rows
+
+    # Then
+    print(f"\nIterating over {benchmark_rows} identities:")
+    for name, duration in results.items():
+        print(f"  {name}: {duration:.2f}s")
@@ -0,0 +1,107 @@
+import json
+import time
+
+from task_processor.decorators import register_task_handler
+from task_processor.models import Task
+from task_processor.processor import run_tasks
+from task_processor.serialization import deserialize, serialize
+
+
+@register_task_handler()
+def _forward_requests(project_id: int, forwarded_requests: list):
+    pass
+
+
+def _get_args() -> tuple:
+    # the args of a typical task, i.e. a batch of requests forwarded to the
+    # edge api (see edge_api.identities.edge_request_forwarder)
+    forwarded_request = {
+        "path": "identities/",
+        "request_method": "POST",
+        "headers": {
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate, br",
+            "User-Agent": "flagsmith-python-client/3.2.0",
+            "X-Environment-Key": "ser.abcdefghijklmnopqrstuv",
+            "X-Forwarded-For": "10.0.0.1, 10.0.0.2",
+            "X-Forwarded-Proto": "https",
+        },
+        "query_params": None,
+        "payload": {
+            "identifier": "some_identity",
+            "traits": [
+                {"trait_key": f"trait_{i}", "trait_value": i} for i in range(10)
+            ],
+        },
+    }
+    return (1, [forwarded_request] * 5)
+
+
+def _create_json_text_task(args: tuple) -> Task:
+    # tasks created before the args and kwargs were serialized to binary
+    return Task(
+        task_identifier=_forward_requests.task_identifier,
+        serialized_args=json.dumps(args),
+        serialized_kwargs=json.dumps({}),
+    )
+
+
+def _create_binary_task(args: tuple) -> Task:
+    return Task.create(_forward_requests.task_identifier, args=args)
+
+
+def test_benchmark_task_serialization(benchmark_tasks):
+    # Given
+    args = _get_args()
+    serializers = {
+        "json text": (json.dumps, json.loads),
+        "binary": (serialize, deserialize),
+    }
+
+    # When
+    results = {}
+    for name, (dumps, loads) in serializers.items():
+        start_time = time.perf_counter()
+        for _ in range(benchmark_tasks):
+            assert loads(dumps(args))
+        results[name] = time.perf_counter() - start_time
+
+    # Then
+    print(f"\nSerializing and deserializing the args of {benchmark_tasks} tasks:")
+    for name, duration in results.items():
+        print(f"  {name}: {duration:.2f}s")
+
+
+def test_benchmark_task_processor_throughput(db, benchmark_tasks):
+    # Given
+    args = _get_args()
+    task_factories = {
+        "json text": _create_json_text_task,
+        "binary": _create_binary_task,
+    }
+
+    # When
+    results = {}
+    for name, create_task in task_factories.items():
+        start_time = time.perf_counter()
+        Task.objects.bulk_create(
+            (create_task(args) for _ in range(benchmark_tasks)), batch_size=1000
+        )
+        enqueue_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        num_task_runs = 0
+        while task_runs := run_tasks(num_tasks=100):
+            num_task_runs += len(task_runs)
+        dequeue_duration = time.perf_counter() - start_time
+
+        assert num_task_runs == benchmark_tasks
+        results[name] = (enqueue_duration, dequeue_duration)
+
+    # Then
+    print(f"\nEnqueueing and running {benchmark_tasks} tasks:")
+    for name, (enqueue_duration, dequeue_duration) in results.items():
+        print(
+            f"  {name}: {benchmark_tasks / enqueue_duration:.0f} tasks/s enqueued, "
+            f"{benchmark_tasks / dequeue_duration:.0f} tasks/s run"
+        )
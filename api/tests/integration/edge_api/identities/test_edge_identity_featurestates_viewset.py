@@ -4,12 +4,15 @@ import typing
 import pytest
 from core.constants import BOOLEAN, INTEGER, STRING
 from django.urls import reverse
+from flag_engine.api.document_builders import build_environment_document
 from pytest_lazyfixture import lazy_fixture
 from rest_framework import status
 from rest_framework.exceptions import NotFound
 from rest_framework.test import APIClient
 from tests.integration.helpers import create_mv_option_with_api
 
+from environments.models import Environment
+
 
 def test_edge_identities_feature_states_list_does_not_call_sync_identity_document_features_if_not_needed(
     admin_client,
@@ -839,20 +842,23 @@ def test_get_all_feature_states_for_an_identity(
     default_feature_value,
     segment_override_type,
     segment_override_value,
+    mocker,
 ):
-    # Mock the get_segment_ids method so that it returns no segments for the first
-    # request (to get the environment default), then so that it returns one segment
-    # for the segment and identity override requests.
-    segment_ids_responses = [[], [segment], [segment]]
-
-    def get_segment_ids_side_effect(*args, **kwargs):
-        nonlocal segment_ids_responses
-        return segment_ids_responses.pop(0)
+    # Mock the environment document so that it is always built from the
+    # current state of the environment. Note that the segment (from the fixtures)
+    # matches all identities.
+    mocked_environment_wrapper = mocker.patch(
+        "edge_api.identities.edge_identity_service.DynamoEnvironmentWrapper"
+    )
+    mocked_environment_wrapper.return_value.get_item_from_cache.side_effect = (
+        lambda api_key, updated_at: build_environment_document(
+            Environment.objects.get(api_key=api_key)
+        )
+    )
 
     dynamo_wrapper_mock.get_item_from_uuid_or_404.return_value = (
         identity_document_without_fs
     )
-    dynamo_wrapper_mock.get_segment_ids.side_effect = get_segment_ids_side_effect
 
     # First, let's verify that, without any overrides, the endpoint gives us the
     # environment default feature state
@@ -1,5 +1,9 @@
+from concurrent.futures import Future
+
 import pytest
 
+from edge_api.identities.edge_request_forwarder import migration_status_cache
+
 
 @pytest.fixture()
 def forwarder_mocked_migrator(mocker):
@@ -11,13 +15,35 @@ def forwarder_mocked_migrator(mocker):
 
 
 @pytest.fixture()
-def forwarder_mocked_requests(mocker):
-    return mocker.patch(
-        "edge_api.identities.edge_request_forwarder.requests",
+def forwarder_mocked_dispatcher(mocker):
+    mocked_dispatcher = mocker.patch(
+        "edge_api.identities.edge_request_forwarder.http_dispatcher",
         autospec=True,
         spec_set=True,
     )
 
+    def submit(*args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(mocked_dispatcher.request(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit_call(fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    mocked_dispatcher.submit.side_effect = submit
+    mocked_dispatcher.submit_call.side_effect = submit_call
+    return mocked_dispatcher
+
+
+@pytest.fixture(autouse=True)
+def clear_migration_status_cache():
+    migration_status_cache.clear()
+
 
 @pytest.fixture()
 def forward_enable_settings(settings):
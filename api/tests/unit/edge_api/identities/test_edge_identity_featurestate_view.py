@@ -1,5 +1,12 @@
 from django.urls import reverse
+from flag_engine.api.document_builders import build_environment_document
+from flag_engine.identities.builders import build_identity_model
 from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from edge_api.identities.views import EdgeIdentityFeatureStateViewSet
+from environments.models import Environment
 
 
 def test_user_with_view_environment_permission_can_retrieve_all_feature_states_for_identity(
@@ -18,6 +25,12 @@ def test_user_with_view_environment_permission_can_retrieve_all_feature_states_f
     dynamo_wrapper_mock.get_item_from_uuid_or_404.return_value = (
         identity_document_without_fs
     )
+    mocked_environment_wrapper = mocker.patch(
+        "edge_api.identities.edge_identity_service.DynamoEnvironmentWrapper"
+    )
+    mocked_environment_wrapper.return_value.get_item_from_cache.return_value = (
+        build_environment_document(environment)
+    )
     user_environment_permission.permissions.add(view_environment_permission)
     url = reverse(
         "api-v1:environments:edge-identity-featurestates-all",
@@ -30,3 +43,36 @@ def test_user_with_view_environment_permission_can_retrieve_all_feature_states_f
     # Then
     assert response.status_code == status.HTTP_200_OK
     assert len(response.json()) == 1
+
+
+def test_get_all_feature_states_for_edge_identity_makes_no_queries(
+    environment,
+    feature,
+    identity_document_without_fs,
+    mocker,
+    django_assert_num_queries,
+):
+    # Given
+    mocked_environment_wrapper = mocker.patch(
+        "edge_api.identities.edge_identity_service.DynamoEnvironmentWrapper"
+    )
+    mocked_environment_wrapper.return_value.get_item_from_cache.return_value = (
+        build_environment_document(environment)
+    )
+
+    view = EdgeIdentityFeatureStateViewSet(action="all", format_kwarg=None)
+    view.request = Request(APIRequestFactory().get("/"))
+    view.identity = build_identity_model(identity_document_without_fs)
+
+    # the environment is cached by previous requests
+    Environment.get_from_cache(environment.api_key)
+
+    # When
+    with django_assert_num_queries(0):
+        response = view.all(view.request)
+
+    # Then
+    assert len(response.data) == 1
+    mocked_environment_wrapper.return_value.get_item_from_cache.assert_called_once_with(
+        environment.api_key, updated_at=environment.updated_at
+    )
@@ -1,53 +1,84 @@
+from flag_engine.api.document_builders import (
+    build_environment_document,
+    build_identity_document,
+)
+from flag_engine.identities.builders import build_identity_model
+
 from edge_api.identities.edge_identity_service import (
-    get_all_feature_states_for_edge_identity,
+    get_edge_identity_feature_states_from_environment_document,
+)
+from features.models import (
+    Feature,
+    FeatureSegment,
+    FeatureState,
+    FeatureStateValue,
 )
-from features.models import FeatureSegment, FeatureState, FeatureStateValue
-from segments.models import Segment
 
 
-def test_get_all_feature_states_for_edge_identity_uses_segment_priorities(
-    environment, project, segment, feature, mocker
+def test_get_edge_identity_feature_states_from_environment_document(
+    environment,
+    project,
+    segment,
+    feature,
+    identity,
+    django_assert_num_queries,
+    mocker,
 ):
     # Given
-    another_segment = Segment.objects.create(name="another_segment", project=project)
-
-    dynamo_wrapper_mock = mocker.patch(
-        "environments.identities.models.Identity.dynamo_wrapper",
+    another_feature = Feature.objects.create(name="another_feature", project=project)
+    identity_override_feature = Feature.objects.create(
+        name="identity_override_feature", project=project
     )
-    dynamo_wrapper_mock.get_segment_ids.return_value = [segment.id, another_segment.id]
 
-    feature_segment_p1 = FeatureSegment.objects.create(
+    feature_segment = FeatureSegment.objects.create(
         segment=segment, feature=feature, environment=environment, priority=1
     )
-    feature_segment_p2 = FeatureSegment.objects.create(
-        segment=another_segment, feature=feature, environment=environment, priority=2
+    segment_override = FeatureState.objects.create(
+        feature=feature, environment=environment, feature_segment=feature_segment
+    )
+    FeatureStateValue.objects.filter(feature_state=segment_override).update(
+        string_value="segment override"
     )
 
-    segment_override_p1 = FeatureState.objects.create(
-        feature=feature, environment=environment, feature_segment=feature_segment_p1
+    environment_document = build_environment_document(environment)
+    mocked_environment_wrapper = mocker.patch(
+        "edge_api.identities.edge_identity_service.DynamoEnvironmentWrapper"
     )
-    segment_override_p2 = FeatureState.objects.create(
-        feature=feature, environment=environment, feature_segment=feature_segment_p2
+    mocked_environment_wrapper.return_value.get_item_from_cache.return_value = (
+        environment_document
     )
-
-    FeatureStateValue.objects.filter(feature_state=segment_override_p1).update(
-        string_value="p1"
+    mocked_get_identity_segments = mocker.patch(
+        "edge_api.identities.edge_identity_service.get_identity_segments"
     )
-    FeatureStateValue.objects.filter(feature_state=segment_override_p2).update(
-        string_value="p2"
+    mocked_get_identity_segments.side_effect = lambda environment, _: list(
+        environment.project.segments
     )
 
-    identity_model = mocker.MagicMock(
-        environment_api_key=environment.api_key, identity_features=[]
+    identity_override = FeatureState.objects.create(
+        feature=identity_override_feature, environment=environment, identity=identity
     )
+    FeatureStateValue.objects.filter(feature_state=identity_override).update(
+        string_value="identity override"
+    )
+    identity_model = build_identity_model(build_identity_document(identity))
 
     # When
-    feature_states, _ = get_all_feature_states_for_edge_identity(identity_model)
+    with django_assert_num_queries(0):
+        result = get_edge_identity_feature_states_from_environment_document(
+            identity_model, environment_updated_at=environment.updated_at
+        )
 
     # Then
-    assert len(feature_states) == 1
-    assert feature_states[0] == segment_override_p1
-
-    dynamo_wrapper_mock.get_segment_ids.assert_called_once_with(
-        identity_model=identity_model
+    mocked_environment_wrapper.return_value.get_item_from_cache.assert_called_once_with(
+        environment.api_key, updated_at=environment.updated_at
     )
+    assert result.environment.api_key == environment.api_key
+    assert {fs.feature.name: fs.get_value() for fs in result.feature_states} == {
+        feature.name: "segment override",
+        another_feature.name: None,
+        identity_override_feature.name: "identity override",
+    }
+    assert result.segment_overrides == {
+        feature.name: result.environment.project.segments[0]
+    }
+    assert result.identity_feature_names == {identity_override_feature.name}
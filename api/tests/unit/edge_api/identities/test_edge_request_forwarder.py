@@ -1,10 +1,14 @@
 import json
 
 import pytest
+import requests
 from core.constants import FLAGSMITH_SIGNATURE_HEADER
 
 from edge_api.identities.edge_request_forwarder import (
+    EdgeRequestForwardingBuffer,
+    enqueue_trait_requests,
     forward_identity_request,
+    forward_requests,
     forward_trait_request,
     forward_trait_request_sync,
     forward_trait_requests,
@@ -15,7 +19,7 @@ from edge_api.identities.edge_request_forwarder import (
     "forwarder_function", [forward_identity_request, forward_trait_request_sync]
 )
 def test_forwarder_function_makes_no_request_if_migration_is_not_yet_done(
-    mocker, forwarder_mocked_requests, forwarder_mocked_migrator, forwarder_function
+    mocker, forwarder_mocked_dispatcher, forwarder_mocked_migrator, forwarder_function
 ):
     # Given
     project_id = 1
@@ -28,7 +32,7 @@ def test_forwarder_function_makes_no_request_if_migration_is_not_yet_done(
     # When
     forwarder_function("GET", {}, project_id, None)
     # Then
-    assert forwarder_mocked_requests.mock_calls == []
+    assert forwarder_mocked_dispatcher.mock_calls == []
 
     forwarder_mocked_migrator.assert_called_with(project_id)
 
@@ -37,7 +41,7 @@ def test_forward_identity_request_makes_correct_get_request(
     mocker,
     forward_enable_settings,
     forwarder_mocked_migrator,
-    forwarder_mocked_requests,
+    forwarder_mocked_dispatcher,
 ):
     # Given
     project_id = 1
@@ -55,8 +59,9 @@ def test_forward_identity_request_makes_correct_get_request(
     forward_identity_request("GET", headers, project_id, query_params)
 
     # Then
-    args, kwargs = forwarder_mocked_requests.get.call_args
-    assert args[0] == forward_enable_settings.EDGE_API_URL + "identities/"
+    _, kwargs = forwarder_mocked_dispatcher.request.call_args
+    assert kwargs["method"] == "GET"
+    assert kwargs["url"] == forward_enable_settings.EDGE_API_URL + "identities/"
     assert kwargs["params"] == query_params
     assert kwargs["headers"]["X-Environment-Key"] == api_key
     assert kwargs["headers"][FLAGSMITH_SIGNATURE_HEADER]
@@ -68,7 +73,7 @@ def test_forward_identity_request_makes_correct_post_request(
     mocker,
     forward_enable_settings,
     forwarder_mocked_migrator,
-    forwarder_mocked_requests,
+    forwarder_mocked_dispatcher,
 ):
     # Given
     project_id = 1
@@ -86,8 +91,9 @@ def test_forward_identity_request_makes_correct_post_request(
     forward_identity_request("POST", headers, project_id, request_data=request_data)
 
     # Then
-    args, kwargs = forwarder_mocked_requests.post.call_args
-    assert args[0] == forward_enable_settings.EDGE_API_URL + "identities/"
+    _, kwargs = forwarder_mocked_dispatcher.request.call_args
+    assert kwargs["method"] == "POST"
+    assert kwargs["url"] == forward_enable_settings.EDGE_API_URL + "identities/"
 
     assert kwargs["data"] == json.dumps(request_data)
     assert kwargs["headers"]["X-Environment-Key"] == api_key
@@ -100,7 +106,7 @@ def test_forward_trait_request_sync_makes_correct_post_request(
     mocker,
     forward_enable_settings,
     forwarder_mocked_migrator,
-    forwarder_mocked_requests,
+    forwarder_mocked_dispatcher,
 ):
     # Given
     project_id = 1
@@ -121,8 +127,9 @@ def test_forward_trait_request_sync_makes_correct_post_request(
     forward_trait_request_sync("POST", headers, project_id, payload=request_data)
 
     # Then
-    args, kwargs = forwarder_mocked_requests.post.call_args
-    assert args[0] == forward_enable_settings.EDGE_API_URL + "traits/"
+    _, kwargs = forwarder_mocked_dispatcher.request.call_args
+    assert kwargs["method"] == "POST"
+    assert kwargs["url"] == forward_enable_settings.EDGE_API_URL + "traits/"
 
     assert kwargs["data"] == json.dumps(request_data)
     assert kwargs["headers"]["X-Environment-Key"] == api_key
@@ -175,3 +182,295 @@ def test_forward_trait_requests_calls_sync_function_correctly(mocker):
             mocker.call(request_method, headers, project_id, payload[1]),
         ]
     )
+
+
+def test_should_forward_caches_projects_that_have_been_migrated(
+    mocker,
+    forward_enable_settings,
+    forwarder_mocked_migrator,
+    forwarder_mocked_dispatcher,
+):
+    # Given
+    project_id = 1
+    mocked_migration_done = mocker.PropertyMock(return_value=True)
+    type(
+        forwarder_mocked_migrator.return_value
+    ).is_migration_done = mocked_migration_done
+
+    # When
+    forward_trait_request_sync("POST", {}, project_id, {"trait_key": "key"})
+    forward_trait_request_sync("POST", {}, project_id, {"trait_key": "key"})
+
+    # Then
+    forwarder_mocked_migrator.assert_called_once_with(project_id)
+    assert forwarder_mocked_dispatcher.request.call_count == 2
+
+
+def test_should_forward_does_not_cache_projects_that_have_not_been_migrated(
+    mocker,
+    forwarder_mocked_migrator,
+    forwarder_mocked_dispatcher,
+):
+    # Given
+    project_id = 1
+    mocked_migration_done = mocker.PropertyMock(return_value=False)
+    type(
+        forwarder_mocked_migrator.return_value
+    ).is_migration_done = mocked_migration_done
+
+    # When
+    forward_trait_request_sync("POST", {}, project_id, {"trait_key": "key"})
+    forward_trait_request_sync("POST", {}, project_id, {"trait_key": "key"})
+
+    # Then
+    assert forwarder_mocked_migrator.call_count == 2
+    forwarder_mocked_dispatcher.request.assert_not_called()
+
+
+def test_forward_requests_sends_all_requests(
+    mocker,
+    forward_enable_settings,
+    forwarder_mocked_migrator,
+    forwarder_mocked_dispatcher,
+):
+    # Given
+    project_id = 1
+    mocked_migration_done = mocker.PropertyMock(return_value=True)
+    type(
+        forwarder_mocked_migrator.return_value
+    ).is_migration_done = mocked_migration_done
+
+    headers = {"X-Environment-Key": "test_api_key"}
+    query_params = {"identifier": "test_123"}
+    trait_data = {"identity": {"identifier": "test_123"}, "trait_key": "key"}
+    forwarder_mocked_dispatcher.request.side_effect = [
+        mocker.MagicMock(),
+        requests.ConnectionError(),
+        mocker.MagicMock(),
+    ]
+
+    # When
+    forward_requests(
+        project_id,
+        [
+            {
+                "path": "identities/",
+                "request_method": "GET",
+                "headers": headers,
+                "query_params": query_params,
+                "payload": None,
+            },
+            {
+                "path": "traits/",
+                "request_method": "POST",
+                "headers": headers,
+                "payload": trait_data,
+            },
+            {
+                "path": "traits/",
+                "request_method": "POST",
+                "headers": headers,
+                "payload": trait_data,
+            },
+        ],
+    )
+
+    # Then
+    forwarder_mocked_migrator.assert_called_once_with(project_id)
+
+    assert forwarder_mocked_dispatcher.request.call_count == 3
+    get_call, _, post_call = forwarder_mocked_dispatcher.request.call_args_list
+
+    _, kwargs = get_call
+    assert kwargs["method"] == "GET"
+    assert kwargs["url"] == forward_enable_settings.EDGE_API_URL + "identities/"
+    assert kwargs["params"] == query_params
+
+    _, kwargs = post_call
+    assert kwargs["method"] == "POST"
+    assert kwargs["url"] == forward_enable_settings.EDGE_API_URL + "traits/"
+    assert kwargs["data"] == json.dumps(trait_data)
+    assert kwargs["headers"][FLAGSMITH_SIGNATURE_HEADER]
+
+
+def test_forward_requests_does_nothing_if_migration_is_not_done(
+    mocker, forwarder_mocked_migrator, forwarder_mocked_dispatcher
+):
+    # Given
+    mocked_migration_done = mocker.PropertyMock(return_value=False)
+    type(
+        forwarder_mocked_migrator.return_value
+    ).is_migration_done = mocked_migration_done
+
+    # When
+    forward_requests(
+        1,
+        [
+            {
+                "path": "traits/",
+                "request_method": "POST",
+                "headers": {},
+                "payload": {"trait_key": "key"},
+            }
+        ],
+    )
+
+    # Then
+    assert forwarder_mocked_dispatcher.mock_calls == []
+
+
+def test_edge_request_forwarding_buffer_forwards_requests_per_project(mocker):
+    # Given
+    mocked_forward_requests = mocker.patch(
+        "edge_api.identities.edge_request_forwarder.forward_requests"
+    )
+    buffer = EdgeRequestForwardingBuffer(window_seconds=60, max_size=2)
+
+    # When
+    buffer.add(1, {"path": "traits/", "payload": {"trait_key": "a"}})
+    buffer.add(2, {"path": "traits/", "payload": {"trait_key": "b"}})
+
+    # Then
+    mocked_forward_requests.delay.assert_not_called()
+
+    # When
+    buffer.add(1, {"path": "traits/", "payload": {"trait_key": "c"}})
+
+    # Then
+    mocked_forward_requests.delay.assert_called_once_with(
+        args=(
+            1,
+            [
+                {"path": "traits/", "payload": {"trait_key": "a"}},
+                {"path": "traits/", "payload": {"trait_key": "c"}},
+            ],
+        )
+    )
+
+    # When
+    buffer.flush_all()
+
+    # Then
+    mocked_forward_requests.delay.assert_called_with(
+        args=(2, [{"path": "traits/", "payload": {"trait_key": "b"}}])
+    )
+
+
+def test_edge_request_forwarding_buffer_flushes_all_projects_in_background(mocker):
+    # Given
+    mocked_forward_requests = mocker.patch(
+        "edge_api.identities.edge_request_forwarder.forward_requests"
+    )
+    mocked_flusher = mocker.patch(
+        "edge_api.identities.edge_request_forwarder.BackgroundFlusher"
+    )
+    buffer = EdgeRequestForwardingBuffer(window_seconds=1, max_size=10)
+
+    # When
+    buffer.add(1, {"path": "traits/"})
+    buffer.add(1, {"path": "traits/"})
+    buffer.add(2, {"path": "traits/"})
+
+    # Then
+    mocked_flusher.assert_called_once_with(
+        buffer.flush_all, 1, name="edge-request-forwarding"
+    )
+    assert mocked_flusher.return_value.ensure_started.call_count == 3
+    mocked_forward_requests.delay.assert_not_called()
+
+    # When, the flusher runs
+    flush, *_ = mocked_flusher.call_args.args
+    flush()
+
+    # Then
+    mocked_forward_requests.delay.assert_has_calls(
+        [
+            mocker.call(args=(1, [{"path": "traits/"}, {"path": "traits/"}])),
+            mocker.call(args=(2, [{"path": "traits/"}])),
+        ]
+    )
+
+
+def test_forward_requests_sends_the_requests_for_each_identity_in_order(
+    mocker,
+    forward_enable_settings,
+    forwarder_mocked_migrator,
+    forwarder_mocked_dispatcher,
+):
+    # Given
+    type(
+        forwarder_mocked_migrator.return_value
+    ).is_migration_done = mocker.PropertyMock(return_value=True)
+    headers = {"X-Environment-Key": "test_api_key"}
+
+    def trait_request(identifier, trait_value):
+        return {
+            "path": "traits/",
+            "request_method": "POST",
+            "headers": headers,
+            "payload": {
+                "identity": {"identifier": identifier},
+                "trait_key": "key",
+                "trait_value": trait_value,
+            },
+        }
+
+    identity_request = {
+        "path": "identities/",
+        "request_method": "POST",
+        "headers": headers,
+        "payload": {"identifier": "user_1", "traits": []},
+    }
+
+    # When
+    forward_requests(
+        1,
+        [
+            trait_request("user_1", 1),
+            trait_request("user_2", 1),
+            identity_request,
+            trait_request("user_2", 2),
+        ],
+    )
+
+    # Then
+    # the requests for each identity are sent, in order, by a single call
+    assert [
+        [request["payload"] for request in call.args[1]]
+        for call in forwarder_mocked_dispatcher.submit_call.call_args_list
+    ] == [
+        [trait_request("user_1", 1)["payload"], identity_request["payload"]],
+        [trait_request("user_2", 1)["payload"], trait_request("user_2", 2)["payload"]],
+    ]
+    assert forwarder_mocked_dispatcher.request.call_count == 4
+
+
+def test_enqueue_trait_requests_adds_a_request_per_trait(mocker):
+    # Given
+    mocked_buffer = mocker.patch(
+        "edge_api.identities.edge_request_forwarder.edge_request_forwarding_buffer"
+    )
+    headers = {"X-Environment-Key": "test_api_key"}
+    payload = [
+        {"identity": {"identifier": "test_user_123"}},
+        {"identity": {"identifier": "test_user_456"}},
+    ]
+
+    # When
+    enqueue_trait_requests("PUT", headers, 1, payload)
+
+    # Then
+    mocked_buffer.add.assert_has_calls(
+        [
+            mocker.call(
+                1,
+                {
+                    "path": "traits/",
+                    "request_method": "PUT",
+                    "headers": headers,
+                    "payload": trait_data,
+                },
+            )
+            for trait_data in payload
+        ]
+    )
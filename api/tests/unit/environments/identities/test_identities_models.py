@@ -1,6 +1,9 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from environments.identities.models import Identity
+from environments.models import Environment
 from features.models import Feature, FeatureState
 
 
@@ -71,3 +74,176 @@ def test_get_hash_key_with_use_mv_v2_evaluation_disabled(identity):
 
     # Then
     assert hash_key == str(identity.id)
+
+
+def test_get_hash_key_does_not_change_once_lazily_persisted_identity_is_stored(
+    environment,
+):
+    # Given
+    environment.lazy_identity_persistence = True
+    environment.save()
+    identity, _ = Identity.get_or_build(identifier="transient", environment=environment)
+    transient_hash_key = identity.get_hash_key()
+
+    # When
+    identity.save()
+    stored_hash_key = identity.get_hash_key()
+
+    # Then
+    assert transient_hash_key == stored_hash_key
+    assert stored_hash_key == f"{environment.api_key}_{identity.identifier}"
+
+
+def test_get_hash_key_of_existing_identity_does_not_change_when_lazy_identity_persistence_enabled(
+    environment, identity, multivariate_feature
+):
+    # Given
+    feature_state = FeatureState.objects.get(
+        feature=multivariate_feature, environment=environment, identity__isnull=True
+    )
+    hash_key = identity.get_hash_key()
+    feature_state_value = feature_state.get_feature_state_value(identity=identity)
+
+    # When
+    environment.lazy_identity_persistence = True
+    environment.save()
+
+    # Then
+    identity = Identity.objects.get(id=identity.id)
+    assert identity.get_hash_key() == hash_key == str(identity.id)
+    assert feature_state.get_feature_state_value(identity=identity) == (
+        feature_state_value
+    )
+
+
+def test_get_hash_key_for_identity_without_environment():
+    # Given
+    identity = Identity(identifier="identity", id=1)
+
+    # When
+    hash_key = identity.get_hash_key()
+
+    # Then
+    assert hash_key == "1"
+
+
+def test_get_or_build_creates_identity_if_lazy_identity_persistence_disabled(
+    environment,
+):
+    # When
+    identity, created = Identity.get_or_build(
+        identifier="new_identity", environment=environment
+    )
+
+    # Then
+    assert created is True
+    assert identity.is_transient is False
+    assert Identity.objects.filter(identifier="new_identity").exists()
+
+
+def test_get_or_build_returns_transient_identity_if_lazy_identity_persistence_enabled(
+    environment,
+):
+    # Given
+    environment.lazy_identity_persistence = True
+    environment.save()
+
+    # When
+    identity, created = Identity.get_or_build(
+        identifier="new_identity", environment=environment
+    )
+
+    # Then
+    assert created is True
+    assert identity.is_transient is True
+    assert not Identity.objects.filter(identifier="new_identity").exists()
+
+
+def test_get_or_build_returns_existing_identity_if_lazy_identity_persistence_enabled(
+    environment, identity
+):
+    # Given
+    environment.lazy_identity_persistence = True
+    environment.save()
+
+    # When
+    existing_identity, created = Identity.get_or_build(
+        identifier=identity.identifier, environment=environment
+    )
+
+    # Then
+    assert created is False
+    assert existing_identity == identity
+
+
+def test_get_all_feature_states_for_transient_identity_ignores_identity_overrides(
+    environment, feature, identity_featurestate
+):
+    # Given
+    identity_featurestate.enabled = True
+    identity_featurestate.save()
+
+    transient_identity = Identity(identifier="transient", environment=environment)
+
+    # When
+    feature_states = transient_identity.get_all_feature_states()
+
+    # Then
+    assert len(feature_states) == 1
+    assert feature_states[0].identity_id is None
+    assert feature_states[0].enabled is False
+
+
+def test_get_all_feature_states_skips_identity_overrides_lookup_if_none_exist(
+    environment, feature
+):
+    # Given
+    identity = Identity.objects.create(identifier="identity", environment=environment)
+
+    # When
+    with CaptureQueriesContext(connection) as captured_queries:
+        identity.get_all_feature_states()
+
+    # Then
+    feature_state_queries = [
+        query["sql"]
+        for query in captured_queries
+        if 'FROM "features_featurestate"' in query["sql"]
+    ]
+    assert feature_state_queries
+    assert not any(
+        f'"features_featurestate"."identity_id" = {identity.id}' in sql
+        for sql in feature_state_queries
+    )
+
+
+def test_get_all_feature_states_returns_identity_override_created_after_caching(
+    environment, feature, settings, django_capture_on_commit_callbacks
+):
+    # Given
+    settings.CACHE_IDENTITY_OVERRIDES_SECONDS = 60
+
+    # the environment, and the features with identity overrides in it, are cached
+    cached_environment = Environment.get_from_cache(environment.api_key)
+    identity = Identity.objects.create(
+        identifier="identity", environment=cached_environment
+    )
+    identity.get_all_feature_states()
+
+    # When
+    # the first identity override is created for the feature
+    with django_capture_on_commit_callbacks(execute=True):
+        FeatureState.objects.create(
+            feature=feature, environment=environment, identity=identity, enabled=True
+        )
+
+    identity = Identity.objects.get(id=identity.id)
+    identity.environment = Environment.get_from_cache(environment.api_key)
+    feature_states = identity.get_all_feature_states()
+
+    # Then
+    # the (still cached) environment is unchanged, but the override is returned
+    assert identity.environment.updated_at == cached_environment.updated_at
+    (feature_state,) = [fs for fs in feature_states if fs.feature == feature]
+    assert feature_state.identity == identity
+    assert feature_state.enabled is True
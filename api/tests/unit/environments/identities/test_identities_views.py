@@ -1,7 +1,11 @@
+import json
+
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
+from environments.identities.models import Identity
 from environments.identities.views import IdentityViewSet
 from environments.permissions.constants import (
     MANAGE_IDENTITIES,
@@ -85,3 +89,130 @@ def test_identity_view_set_get_permissions():
         "partial_update": MANAGE_IDENTITIES,
         "destroy": MANAGE_IDENTITIES,
     }
+
+
+def test_get_sdk_identities_does_not_persist_identity_with_lazy_identity_persistence(
+    environment, feature, api_client
+):
+    # Given
+    environment.lazy_identity_persistence = True
+    environment.save()
+
+    identifier = "transient_identity"
+    url = "%s?identifier=%s" % (reverse("api-v1:sdk-identities"), identifier)
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    # When
+    response = api_client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+
+    response_json = response.json()
+    assert len(response_json["flags"]) == 1
+    assert response_json["flags"][0]["feature"]["id"] == feature.id
+    assert response_json["traits"] == []
+
+    assert not Identity.objects.filter(identifier=identifier).exists()
+
+
+def test_post_sdk_identities_does_not_persist_identity_if_traits_not_persisted(
+    environment, organisation, feature, api_client
+):
+    # Given
+    environment.lazy_identity_persistence = True
+    environment.save()
+
+    organisation.persist_trait_data = False
+    organisation.save()
+
+    identifier = "transient_identity"
+    data = {
+        "identifier": identifier,
+        "traits": [{"trait_key": "foo", "trait_value": "bar"}],
+    }
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities"),
+        data=json.dumps(data),
+        content_type="application/json",
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+
+    response_json = response.json()
+    assert len(response_json["flags"]) == 1
+    assert response_json["traits"] == [
+        {"id": None, "trait_key": "foo", "trait_value": "bar"}
+    ]
+
+    assert not Identity.objects.filter(identifier=identifier).exists()
+
+
+def test_post_sdk_identities_persists_identity_when_traits_are_persisted(
+    environment, feature, api_client
+):
+    # Given
+    environment.lazy_identity_persistence = True
+    environment.save()
+
+    identifier = "new_identity"
+    data = {
+        "identifier": identifier,
+        "traits": [{"trait_key": "foo", "trait_value": "bar"}],
+    }
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities"),
+        data=json.dumps(data),
+        content_type="application/json",
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+
+    identity = Identity.objects.get(identifier=identifier)
+    assert identity.identity_traits.count() == 1
+
+
+def test_sdk_identities_records_identity_last_seen(
+    environment, identity, api_client, mocker
+):
+    # Given
+    mock_buffer = mocker.patch(
+        "environments.identities.last_seen.identity_last_seen_buffer"
+    )
+    url = "%s?identifier=%s" % (reverse("api-v1:sdk-identities"), identity.identifier)
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    # When
+    response = api_client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    mock_buffer.record.assert_called_once_with(environment.id, identity.identifier)
+
+
+def test_list_identities_includes_last_seen(environment, identity, admin_client):
+    # Given
+    identity.last_seen = timezone.now()
+    identity.save()
+
+    url = reverse(
+        "api-v1:environments:environment-identities-list",
+        args=(environment.api_key,),
+    )
+
+    # When
+    response = admin_client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["last_seen"] == identity.last_seen.strftime(
+        "%Y-%m-%dT%H:%M:%S.%fZ"
+    )
@@ -0,0 +1,126 @@
+import threading
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.views.decorators.cache import cache_page
+
+from environments.identities.last_seen import (
+    IdentityLastSeenBuffer,
+    record_identity_last_seen,
+)
+
+
+def test_identity_last_seen_buffer_coalesces_identities_until_max_size(mocker):
+    # Given
+    mock_update_identities_last_seen = mocker.patch(
+        "environments.identities.tasks.update_identities_last_seen"
+    )
+    buffer = IdentityLastSeenBuffer(flush_interval_seconds=3600, max_size=3)
+
+    # When
+    buffer.record(1, "identity_1")
+    buffer.record(2, "identity_1")
+    buffer.record(1, "identity_1")
+
+    # Then
+    mock_update_identities_last_seen.delay_many.assert_not_called()
+
+    # When
+    buffer.record(1, "identity_2")
+
+    # Then
+    mock_update_identities_last_seen.delay_many.assert_called_once()
+    kwargs_list = mock_update_identities_last_seen.delay_many.call_args.kwargs[
+        "kwargs_list"
+    ]
+    assert [
+        (kwargs["environment_id"], kwargs["identifiers"]) for kwargs in kwargs_list
+    ] == [(1, ["identity_1", "identity_2"]), (2, ["identity_1"])]
+    assert len({kwargs["last_seen"] for kwargs in kwargs_list}) == 1
+
+
+def test_identity_last_seen_buffer_flushes_after_interval(mocker):
+    # Given
+    mock_update_identities_last_seen = mocker.patch(
+        "environments.identities.tasks.update_identities_last_seen"
+    )
+    buffer = IdentityLastSeenBuffer(flush_interval_seconds=0, max_size=100)
+
+    # When
+    buffer.record(1, "identity")
+
+    # Then
+    mock_update_identities_last_seen.delay_many.assert_called_once()
+    (kwargs,) = mock_update_identities_last_seen.delay_many.call_args.kwargs[
+        "kwargs_list"
+    ]
+    assert kwargs["environment_id"] == 1
+    assert kwargs["identifiers"] == ["identity"]
+
+
+def test_identity_last_seen_buffer_flush_does_nothing_if_empty(mocker):
+    # Given
+    mock_update_identities_last_seen = mocker.patch(
+        "environments.identities.tasks.update_identities_last_seen"
+    )
+    buffer = IdentityLastSeenBuffer(flush_interval_seconds=3600, max_size=100)
+
+    # When
+    buffer.flush()
+
+    # Then
+    mock_update_identities_last_seen.delay_many.assert_not_called()
+
+
+def test_identity_last_seen_buffer_flushes_in_background_when_idle(mocker):
+    # Given
+    mock_update_identities_last_seen = mocker.patch(
+        "environments.identities.tasks.update_identities_last_seen"
+    )
+    buffer = IdentityLastSeenBuffer(flush_interval_seconds=0.1, max_size=100)
+    flushed = threading.Event()
+    mock_update_identities_last_seen.delay_many.side_effect = (
+        lambda **kwargs: flushed.set()
+    )
+
+    # When
+    # the interval has not elapsed when recording, so nothing is flushed
+    buffer.record(1, "identity")
+    mock_update_identities_last_seen.delay_many.assert_not_called()
+
+    # Then
+    # but the identities are flushed without any further calls to record
+    assert flushed.wait(timeout=5)
+    (kwargs,) = mock_update_identities_last_seen.delay_many.call_args.kwargs[
+        "kwargs_list"
+    ]
+    assert kwargs["identifiers"] == ["identity"]
+
+
+def test_record_identity_last_seen_records_identity_for_cached_responses(
+    mocker, reset_cache
+):
+    # Given
+    mock_buffer = mocker.patch(
+        "environments.identities.last_seen.identity_last_seen_buffer"
+    )
+    view = mocker.MagicMock(return_value=HttpResponse("flags"))
+    cached_view = record_identity_last_seen(cache_page(60)(view))
+
+    request = RequestFactory().get("/api/v1/identities/?identifier=identity")
+    request.environment = mocker.MagicMock(id=1)
+
+    # When
+    first_response = cached_view(request)
+    second_response = cached_view(request)
+
+    # Then
+    # the second response is served from the cache, without calling the view
+    view.assert_called_once()
+    assert first_response.content == second_response.content == b"flags"
+
+    # but the identity is recorded as seen for both requests
+    assert mock_buffer.record.call_args_list == [
+        mocker.call(1, "identity"),
+        mocker.call(1, "identity"),
+    ]
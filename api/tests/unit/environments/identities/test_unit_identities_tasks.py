@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from environments.identities.models import Identity
+from environments.identities.tasks import (
+    delete_stale_identities,
+    update_identities_last_seen,
+)
+from environments.identities.traits.models import Trait
+from features.models import FeatureState
+
+
+def _create_identity(environment, identifier, created_date):
+    identity = Identity.objects.create(identifier=identifier, environment=environment)
+    Identity.objects.filter(id=identity.id).update(created_date=created_date)
+    return identity
+
+
+def test_delete_stale_identities(environment, feature, settings):
+    # Given
+    settings.IDENTITY_RETENTION_DAYS = 30
+    old_date = timezone.now() - timedelta(days=31)
+
+    stale_identity = _create_identity(environment, "stale", old_date)
+    recent_identity = _create_identity(environment, "recent", timezone.now())
+
+    identity_with_override = _create_identity(environment, "override", old_date)
+    FeatureState.objects.create(
+        feature=feature, environment=environment, identity=identity_with_override
+    )
+
+    recently_seen_identity = _create_identity(environment, "seen", old_date)
+    Identity.objects.filter(id=recently_seen_identity.id).update(
+        last_seen=timezone.now()
+    )
+
+    identity_with_new_trait = _create_identity(environment, "new_trait", old_date)
+    Trait.objects.create(
+        identity=identity_with_new_trait, trait_key="foo", string_value="bar"
+    )
+
+    # When
+    delete_stale_identities()
+
+    # Then
+    assert not Identity.objects.filter(id=stale_identity.id).exists()
+    assert (
+        Identity.objects.filter(
+            id__in=[
+                recent_identity.id,
+                identity_with_override.id,
+                identity_with_new_trait.id,
+            ]
+        ).count()
+        == 3
+    )
+
+
+def test_delete_stale_identities_respects_batch_limits(environment, settings):
+    # Given
+    settings.IDENTITY_RETENTION_DAYS = 30
+    settings.IDENTITY_RETENTION_BATCH_SIZE = 2
+    settings.IDENTITY_RETENTION_MAX_BATCHES = 2
+    old_date = timezone.now() - timedelta(days=31)
+
+    for i in range(5):
+        _create_identity(environment, f"identity_{i}", old_date)
+
+    # When
+    delete_stale_identities()
+
+    # Then
+    assert Identity.objects.filter(environment=environment).count() == 1
+
+
+def test_delete_stale_identities_does_nothing_if_retention_not_configured(
+    environment, settings
+):
+    # Given
+    settings.IDENTITY_RETENTION_DAYS = 0
+    identity = _create_identity(
+        environment, "identity", timezone.now() - timedelta(days=365)
+    )
+
+    # When
+    delete_stale_identities()
+
+    # Then
+    assert Identity.objects.filter(id=identity.id).exists()
+
+
+def test_update_identities_last_seen(environment, identity, settings):
+    # Given
+    settings.IDENTITY_LAST_SEEN_MAX_BUFFER_SIZE = 1
+    other_identity = Identity.objects.create(
+        identifier="other", environment=environment
+    )
+    unseen_identity = Identity.objects.create(
+        identifier="unseen", environment=environment
+    )
+    last_seen = timezone.now()
+
+    # When
+    update_identities_last_seen(
+        environment_id=environment.id,
+        identifiers=[identity.identifier, other_identity.identifier, "transient"],
+        last_seen=last_seen.isoformat(),
+    )
+
+    # Then
+    identity.refresh_from_db()
+    other_identity.refresh_from_db()
+    unseen_identity.refresh_from_db()
+
+    assert identity.last_seen == last_seen
+    assert other_identity.last_seen == last_seen
+    assert unseen_identity.last_seen is None
@@ -15,6 +15,6 @@ def test_environment_admin_rebuild_environments(environment, mocker):
         request=mocker.MagicMock(), queryset=Environment.objects.all()
     )
     # THEN
-    mocked_rebuild_environment_document.delay.assert_called_once_with(
-        args=(environment.id,)
+    mocked_rebuild_environment_document.delay_many.assert_called_once_with(
+        args_list=[(environment.id,)]
     )
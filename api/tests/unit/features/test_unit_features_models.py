@@ -3,8 +3,14 @@ from datetime import timedelta
 import pytest
 from django.utils import timezone
 
+from environments.identities.models import Identity
 from environments.models import Environment
-from features.models import Feature, FeatureSegment, FeatureState
+from features.models import (
+    Feature,
+    FeatureSegment,
+    FeatureState,
+    IdentityOverrideCount,
+)
 from features.workflows.core.models import ChangeRequest
 from segments.models import Segment
 
@@ -295,3 +301,49 @@ def test_feature_segment_update_priorities_when_changes(
             "master_api_key_id": mocked_request.master_api_key.id,
         }
     )
+
+
+def test_identity_override_count_is_maintained_for_identity_overrides(
+    feature, environment, identity
+):
+    # Given
+    other_identity = Identity.objects.create(
+        identifier="other", environment=environment
+    )
+
+    # When
+    identity_override = FeatureState.objects.create(
+        feature=feature, environment=environment, identity=identity
+    )
+    FeatureState.objects.create(
+        feature=feature, environment=environment, identity=other_identity
+    )
+
+    # Then
+    assert (
+        IdentityOverrideCount.objects.get(
+            feature=feature, environment=environment
+        ).count
+        == 2
+    )
+    assert environment.get_feature_ids_with_identity_overrides() == {feature.id}
+
+    # When
+    identity_override.delete()
+
+    # Then
+    assert (
+        IdentityOverrideCount.objects.get(
+            feature=feature, environment=environment
+        ).count
+        == 1
+    )
+
+    # When
+    other_identity.delete()
+
+    # Then
+    assert not IdentityOverrideCount.objects.filter(
+        feature=feature, environment=environment
+    ).exists()
+    assert not environment.get_feature_ids_with_identity_overrides()
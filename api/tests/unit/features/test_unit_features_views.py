@@ -772,3 +772,30 @@ def test_list_features_provides_segment_overrides_for_dynamo_enabled_project(
     assert response_json["count"] == 1
     assert response_json["results"][0]["num_segment_overrides"] == 1
     assert response_json["results"][0]["num_identity_overrides"] is None
+
+
+def test_list_features_returns_num_identity_overrides_for_environment(
+    project, environment, feature, identity, admin_client
+):
+    # Given
+    feature_without_overrides = Feature.objects.create(
+        name="feature_without_overrides", project=project
+    )
+    FeatureState.objects.create(
+        feature=feature, environment=environment, identity=identity
+    )
+
+    base_url = reverse("api-v1:projects:project-features-list", args=[project.id])
+    url = f"{base_url}?environment={environment.id}"
+
+    # When
+    response = admin_client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+
+    num_identity_overrides = {
+        result["id"]: result["num_identity_overrides"]
+        for result in response.json()["results"]
+    }
+    assert num_identity_overrides == {feature.id: 1, feature_without_overrides.id: 0}
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from environments.identities.models import Identity
@@ -59,3 +61,21 @@ def test_amplitude_when_generate_user_data_with_correct_values_then_success():
     }
 
     assert expected_user_data == user_data
+
+
+def test_amplitude_identify_users_sends_single_request(mocker):
+    # Given
+    mocked_http_dispatcher = mocker.patch(
+        "integrations.amplitude.amplitude.http_dispatcher"
+    )
+    amplitude_wrapper = AmplitudeWrapper(AmplitudeConfiguration(api_key="123key"))
+    users_data = [{"user_id": "user_1"}, {"user_id": "user_2"}]
+
+    # When
+    amplitude_wrapper.identify_users(users_data)
+
+    # Then
+    mocked_http_dispatcher.post.assert_called_once_with(
+        amplitude_wrapper.url,
+        data={"api_key": "123key", "identification": json.dumps(users_data)},
+    )
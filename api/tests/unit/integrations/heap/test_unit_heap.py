@@ -36,3 +36,28 @@ def test_heap_when_generate_user_data_with_correct_values_then_success():
         "properties": {"Test Feature": False},
     }
     assert expected_user_data == user_data
+
+
+def test_heap_identify_users_sends_bulk_track_request(mocker):
+    # Given
+    mocked_http_dispatcher = mocker.patch("integrations.heap.heap.http_dispatcher")
+    heap_wrapper = HeapWrapper(HeapConfiguration(api_key="123key"))
+    users_data = [
+        {"app_id": "123key", "identity": f"user_{i}", "properties": {}}
+        for i in range(2)
+    ]
+
+    # When
+    heap_wrapper.identify_users(users_data)
+
+    # Then
+    mocked_http_dispatcher.post.assert_called_once_with(
+        heap_wrapper.url,
+        json={
+            "app_id": "123key",
+            "events": [
+                {"identity": "user_0", "properties": {}},
+                {"identity": "user_1", "properties": {}},
+            ],
+        },
+    )
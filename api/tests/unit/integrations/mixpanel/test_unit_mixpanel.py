@@ -46,3 +46,22 @@ def test_mixpanel_generate_user_data(project, feature, identity):
     ]
 
     assert user_data == expected_user_data
+
+
+def test_mixpanel_identify_users_sends_single_request(mocker):
+    # Given
+    mocked_http_dispatcher = mocker.patch(
+        "integrations.mixpanel.mixpanel.http_dispatcher"
+    )
+    mixpanel = MixpanelWrapper(MixpanelConfiguration(api_key="123key"))
+    users_data = [[{"$distinct_id": "user_1"}], [{"$distinct_id": "user_2"}]]
+
+    # When
+    mixpanel.identify_users(users_data)
+
+    # Then
+    mocked_http_dispatcher.post.assert_called_once_with(
+        mixpanel.url,
+        headers=mixpanel.headers,
+        json=[{"$distinct_id": "user_1"}, {"$distinct_id": "user_2"}],
+    )
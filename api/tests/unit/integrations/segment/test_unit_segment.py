@@ -54,3 +54,26 @@ def test_segment_when_generate_user_data_with_correct_values_then_success():
     }
 
     assert expected_user_data == user_data
+
+
+def test_segment_identify_users_sends_single_batch(mocker):
+    # Given
+    mocked_segment_post = mocker.patch("integrations.segment.segment.segment_post")
+    segment_wrapper = SegmentWrapper(SegmentConfiguration(api_key="123key"))
+
+    # When
+    segment_wrapper.identify_users(
+        [
+            {"user_id": "user_1", "traits": {"foo": True}},
+            {"user_id": "user_2", "traits": {"foo": False}},
+        ]
+    )
+
+    # Then
+    mocked_segment_post.assert_called_once()
+    batch = mocked_segment_post.call_args.kwargs["batch"]
+    assert [(message["userId"], message["traits"]) for message in batch] == [
+        ("user_1", {"foo": True}),
+        ("user_2", {"foo": False}),
+    ]
+    assert all(message["type"] == "identify" for message in batch)
@@ -1,6 +1,11 @@
+from integrations import integration
 from integrations.amplitude.models import AmplitudeConfiguration
-from integrations.integration import identify_integrations
+from integrations.integration import (
+    get_integration_manifest,
+    identify_integrations,
+)
 from integrations.segment.models import SegmentConfiguration
+from integrations.webhook.models import WebhookConfiguration
 
 
 def test_identify_integrations_amplitude_called(mocker, environment, identity):
@@ -40,8 +45,13 @@ def test_identify_integrations_calls_every_integration_in_identity_integrations_
     integration_a_config = mocker.MagicMock()
     integration_b_config = mocker.MagicMock()
 
-    identity.environment.integration_a_config = integration_a_config
-    identity.environment.integration_b_config = integration_b_config
+    mocker.patch(
+        "integrations.integration.get_integration_manifest",
+        return_value={
+            "integration_a_config": integration_a_config,
+            "integration_b_config": integration_b_config,
+        },
+    )
 
     identity_integrations = [
         {"relation_name": "integration_a_config", "wrapper": integration_wrapper_a},
@@ -87,3 +97,102 @@ def test_identify_integrations_calls_every_integration_in_identity_integrations_
     integration_wrapper_b.return_value.identify_user_async.assert_called_with(
         data=integration_b_mocked_generate_user_data.return_value
     )
+
+
+def test_get_integration_manifest_returns_configured_integrations(environment):
+    # Given
+    amplitude_config = AmplitudeConfiguration.objects.create(
+        api_key="abc-123", environment=environment
+    )
+    webhook_config = WebhookConfiguration.objects.create(
+        url="https://example.com/webhook", environment=environment
+    )
+
+    # When
+    manifest = get_integration_manifest(environment.id)
+
+    # Then
+    assert manifest == {
+        "amplitude_config": amplitude_config,
+        "webhook_config": webhook_config,
+    }
+
+
+def test_get_integration_manifest_is_cached(environment, mocker):
+    # Given
+    AmplitudeConfiguration.objects.create(api_key="abc-123", environment=environment)
+    spy_build_integration_manifest = mocker.spy(
+        integration, "_build_integration_manifest"
+    )
+    get_integration_manifest(environment.id)
+
+    # When
+    manifest = get_integration_manifest(environment.id)
+
+    # Then
+    assert manifest["amplitude_config"].api_key == "abc-123"
+    spy_build_integration_manifest.assert_called_once_with(environment.id)
+
+
+def test_get_integration_manifest_is_cleared_when_config_changes(
+    environment, django_capture_on_commit_callbacks
+):
+    # Given
+    with django_capture_on_commit_callbacks(execute=True):
+        amplitude_config = AmplitudeConfiguration.objects.create(
+            api_key="abc-123", environment=environment
+        )
+    get_integration_manifest(environment.id)
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        amplitude_config.api_key = "def-456"
+        amplitude_config.save()
+    updated_manifest = get_integration_manifest(environment.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        amplitude_config.delete()
+    manifest_after_delete = get_integration_manifest(environment.id)
+
+    # Then
+    assert updated_manifest["amplitude_config"].api_key == "def-456"
+    assert manifest_after_delete == {}
+
+
+def test_get_integration_manifest_is_cleared_when_webhook_config_created(
+    environment, django_capture_on_commit_callbacks
+):
+    # Given
+    get_integration_manifest(environment.id)
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        webhook_config = WebhookConfiguration.objects.create(
+            url="https://example.com/webhook", environment=environment
+        )
+
+    # Then
+    assert get_integration_manifest(environment.id) == {
+        "webhook_config": webhook_config
+    }
+
+
+def test_get_integration_manifest_is_not_cleared_until_committed(
+    environment, django_capture_on_commit_callbacks
+):
+    # Given
+    get_integration_manifest(environment.id)
+
+    # When
+    with django_capture_on_commit_callbacks() as callbacks:
+        WebhookConfiguration.objects.create(
+            url="https://example.com/webhook", environment=environment
+        )
+        manifest_before_commit = get_integration_manifest(environment.id)
+
+    for callback in callbacks:
+        callback()
+
+    # Then
+    assert manifest_before_commit == {}
+    assert "webhook_config" in get_integration_manifest(environment.id)
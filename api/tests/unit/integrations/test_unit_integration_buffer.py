@@ -0,0 +1,184 @@
+import pytest
+
+from integrations.common.buffer import (
+    IdentityIntegrationBuffer,
+    _flush_identity_integration_buffer_on_exit,
+)
+
+
+@pytest.fixture()
+def mocked_postpone_executor(mocker):
+    return mocker.patch("integrations.common.buffer.postpone_executor")
+
+
+@pytest.fixture()
+def mocked_background_flusher(mocker):
+    return mocker.patch("integrations.common.buffer.BackgroundFlusher")
+
+
+@pytest.fixture()
+def make_wrapper(mocker):
+    # the wrappers are mocked so that no requests are made to the integrations
+    def _make_wrapper(batch_key="key", max_batch_size=None):
+        return mocker.MagicMock(batch_key=batch_key, max_batch_size=max_batch_size)
+
+    return _make_wrapper
+
+
+@pytest.fixture()
+def buffer(mocked_background_flusher):
+    return IdentityIntegrationBuffer(
+        window_seconds=60, max_batch_size=2, max_buffered_users=3
+    )
+
+
+def test_identity_integration_buffer_flushes_batch_when_full(
+    buffer, mocked_postpone_executor, make_wrapper
+):
+    # Given
+    wrapper = make_wrapper()
+
+    # When
+    buffer.add(wrapper, {"user_id": "user_1"})
+    buffer.add(wrapper, {"user_id": "user_2"})
+
+    # Then
+    mocked_postpone_executor.submit.assert_called_once_with(
+        wrapper.identify_users, [{"user_id": "user_1"}, {"user_id": "user_2"}]
+    )
+    assert buffer.metrics == {
+        "buffered": 2,
+        "dropped": 0,
+        "flushed_batches": 1,
+        "flushed_users": 2,
+        "pending": 0,
+    }
+
+
+def test_identity_integration_buffer_batches_users_per_destination(
+    buffer, mocked_postpone_executor, make_wrapper
+):
+    # Given
+    wrapper = make_wrapper("key")
+    other_wrapper = make_wrapper("other_key")
+    wrapper_for_same_key = make_wrapper("key")
+
+    # When
+    buffer.add(wrapper, {"user_id": "user_1"})
+    buffer.add(other_wrapper, {"user_id": "user_2"})
+    buffer.add(wrapper_for_same_key, {"user_id": "user_3"})
+    buffer.flush_all()
+
+    # Then
+    assert mocked_postpone_executor.submit.call_count == 3
+    assert {
+        call.args[0]: call.args[1]
+        for call in mocked_postpone_executor.submit.call_args_list
+    } == {
+        wrapper.identify_users: [{"user_id": "user_1"}],
+        other_wrapper.identify_users: [{"user_id": "user_2"}],
+        wrapper_for_same_key.identify_users: [{"user_id": "user_3"}],
+    }
+
+
+def test_identity_integration_buffer_drops_users_when_full(
+    buffer, mocked_postpone_executor, make_wrapper
+):
+    # Given
+    wrappers = [make_wrapper(f"key_{i}") for i in range(4)]
+
+    # When
+    for i, wrapper in enumerate(wrappers):
+        buffer.add(wrapper, {"user_id": f"user_{i}"})
+
+    # Then
+    mocked_postpone_executor.submit.assert_not_called()
+    assert buffer.metrics["dropped"] == 1
+    assert buffer.metrics["pending"] == 3
+
+
+def test_identity_integration_buffer_flushes_immediately_without_window(
+    mocked_postpone_executor, mocked_background_flusher, make_wrapper
+):
+    # Given
+    buffer = IdentityIntegrationBuffer(
+        window_seconds=0, max_batch_size=10, max_buffered_users=10
+    )
+    wrapper = make_wrapper()
+
+    # When
+    buffer.add(wrapper, {"user_id": "user_1"})
+
+    # Then
+    mocked_postpone_executor.submit.assert_called_once_with(
+        wrapper.identify_users, [{"user_id": "user_1"}]
+    )
+    mocked_background_flusher.return_value.ensure_started.assert_not_called()
+
+
+def test_identity_integration_buffer_uses_integration_max_batch_size(
+    mocked_postpone_executor, mocked_background_flusher, make_wrapper
+):
+    # Given
+    buffer = IdentityIntegrationBuffer(
+        window_seconds=60, max_batch_size=10, max_buffered_users=10
+    )
+    wrapper = make_wrapper(max_batch_size=1)
+
+    # When
+    buffer.add(wrapper, {"user_id": "user_1"})
+
+    # Then
+    mocked_postpone_executor.submit.assert_called_once()
+
+
+def test_identity_integration_buffer_flushes_all_batches_in_background(
+    buffer, mocked_postpone_executor, mocked_background_flusher, make_wrapper
+):
+    # Given
+    wrapper = make_wrapper("key")
+    other_wrapper = make_wrapper("other_key")
+
+    # When
+    buffer.add(wrapper, {"user_id": "user_1"})
+    buffer.add(other_wrapper, {"user_id": "user_2"})
+
+    # Then
+    # a single flusher is used for all the batches
+    mocked_background_flusher.assert_called_once_with(
+        buffer.flush_all, 60, name="identity-integration-buffer"
+    )
+    assert mocked_background_flusher.return_value.ensure_started.call_count == 2
+    mocked_postpone_executor.submit.assert_not_called()
+
+    # When, the flusher runs
+    flush, *_ = mocked_background_flusher.call_args.args
+    flush()
+
+    # Then
+    assert [call.args for call in mocked_postpone_executor.submit.call_args_list] == [
+        (wrapper.identify_users, [{"user_id": "user_1"}]),
+        (other_wrapper.identify_users, [{"user_id": "user_2"}]),
+    ]
+
+
+def test_flush_identity_integration_buffer_on_exit_sends_batches_synchronously(
+    buffer, mocked_postpone_executor, make_wrapper, mocker
+):
+    # Given
+    mocker.patch("integrations.common.buffer.identity_integration_buffer", buffer)
+    wrapper = make_wrapper("key")
+    failing_wrapper = make_wrapper("other_key")
+    failing_wrapper.identify_users.side_effect = RuntimeError()
+
+    buffer.add(failing_wrapper, {"user_id": "user_1"})
+    buffer.add(wrapper, {"user_id": "user_2"})
+
+    # When
+    _flush_identity_integration_buffer_on_exit()
+
+    # Then
+    mocked_postpone_executor.submit.assert_not_called()
+    failing_wrapper.identify_users.assert_called_once_with([{"user_id": "user_1"}])
+    wrapper.identify_users.assert_called_once_with([{"user_id": "user_2"}])
+    assert buffer.metrics["pending"] == 0
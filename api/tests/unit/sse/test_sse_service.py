@@ -2,6 +2,7 @@ import pytest
 from pytest_lazyfixture import lazy_fixture
 
 from sse.sse_service import (
+    IDENTITY_UPDATE_MESSAGES_BATCH_SIZE,
     send_environment_update_message_for_environment,
     send_environment_update_message_for_project,
     send_identity_update_message,
@@ -95,7 +96,7 @@ def test_send_environment_update_message_for_environment_schedules_task_correctl
     mocked_tasks.send_environment_update_message.delay.assert_called_once_with(
         args=(
             realtime_enabled_project_environment_one.api_key,
-            realtime_enabled_project_environment_one.updated_at.isoformat(),
+            realtime_enabled_project_environment_one.updated_at,
         )
     )
 
@@ -168,7 +169,7 @@ def test_send_identity_update_messages_exits_early_without_scheduling_task(
     )
 
     # Then
-    mocked_tasks.send_identity_update_messages.delay.assert_not_called()
+    mocked_tasks.send_identity_update_messages.fan_out.assert_not_called()
 
 
 def test_send_identity_update_messages_schedules_task_correctly(
@@ -183,9 +184,8 @@ def test_send_identity_update_messages_schedules_task_correctly(
     )
 
     # Then
-    mocked_tasks.send_identity_update_messages.delay.assert_called_once_with(
-        args=(
-            realtime_enabled_project_environment_one.api_key,
-            ["test-identity-1", "test-identity-2"],
-        )
+    mocked_tasks.send_identity_update_messages.fan_out.assert_called_once_with(
+        ["test-identity-1", "test-identity-2"],
+        batch_size=IDENTITY_UPDATE_MESSAGES_BATCH_SIZE,
+        args=(realtime_enabled_project_environment_one.api_key,),
     )
@@ -25,13 +25,13 @@ def test_send_environment_update_message_for_project_make_correct_request(
 
     settings.SSE_SERVER_BASE_URL = base_url
     settings.SSE_AUTHENTICATION_TOKEN = token
-    mocked_requests = mocker.patch("sse.tasks.requests")
+    mocked_http_dispatcher = mocker.patch("sse.tasks.http_dispatcher")
 
     # When
     send_environment_update_message_for_project(realtime_enabled_project.id)
 
     # Then
-    mocked_requests.post.has_calls(
+    mocked_http_dispatcher.post.has_calls(
         mocker.call(
             f"{base_url}/sse/environments/{realtime_enabled_project_environment_one.api_key}/queue-change",
             headers={"Authorization": f"Token {token}"},
@@ -49,25 +49,30 @@ def test_send_environment_update_message_for_project_make_correct_request(
     )
 
 
-def test_send_environment_update_message_make_correct_request(mocker, settings):
+@pytest.mark.parametrize("serialize_updated_at", (False, True))
+def test_send_environment_update_message_make_correct_request(
+    mocker, settings, serialize_updated_at
+):
     # Given
     base_url = "http://localhost:8000"
     token = "token"
     environment_key = "test_environment"
-    updated_at = datetime.now().isoformat()
+    now = datetime.now()
+    # tasks created before datetimes could be serialized receive a string
+    updated_at = now.isoformat() if serialize_updated_at else now
 
     settings.SSE_SERVER_BASE_URL = base_url
     settings.SSE_AUTHENTICATION_TOKEN = token
-    mocked_requests = mocker.patch("sse.tasks.requests")
+    mocked_http_dispatcher = mocker.patch("sse.tasks.http_dispatcher")
 
     # When
     send_environment_update_message(environment_key, updated_at)
 
     # Then
-    mocked_requests.post.assert_called_once_with(
+    mocked_http_dispatcher.post.assert_called_once_with(
         f"{base_url}/sse/environments/{environment_key}/queue-change",
         headers={"Authorization": f"Token {token}"},
-        json={"updated_at": updated_at},
+        json={"updated_at": now.isoformat()},
     )
 
 
@@ -80,13 +85,13 @@ def test_send_identity_update_message_make_correct_request(mocker, settings):
 
     settings.SSE_SERVER_BASE_URL = base_url
     settings.SSE_AUTHENTICATION_TOKEN = token
-    mocked_requests = mocker.patch("sse.tasks.requests")
+    mocked_http_dispatcher = mocker.patch("sse.tasks.http_dispatcher")
 
     # When
     send_identity_update_message(environment_key, identifier)
 
     # Then
-    mocked_requests.post.assert_called_once_with(
+    mocked_http_dispatcher.post.assert_called_once_with(
         f"{base_url}/sse/environments/{environment_key}/identities/queue-change",
         headers={"Authorization": f"Token {token}"},
         json={"identifier": identifier},
@@ -1,6 +1,23 @@
 import logging
+import math
+from datetime import timedelta
 
-from task_processor.decorators import register_task_handler
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from task_processor.decorators import (
+    BULK_CREATE_BATCH_SIZE,
+    register_recurring_task,
+    register_task_handler,
+)
+from task_processor.models import Task, TaskPriority
+from task_processor.task_registry import (
+    RecurringTaskConfig,
+    registered_recurring_tasks,
+    registered_tasks,
+)
+from task_processor.task_run_method import TaskRunMethod
 
 
 def test_register_task_handler_run_in_thread(mocker, caplog):
@@ -38,3 +55,282 @@ def test_register_task_handler_run_in_thread(mocker, caplog):
     assert (
         caplog.records[0].message == "Running function my_function in unmanaged thread."
     )
+
+
+def test_delay_notifies_task_runners_when_using_task_processor(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mock_notify_task_created = mocker.patch(
+        "task_processor.decorators.notify_task_created"
+    )
+
+    @register_task_handler()
+    def my_function(*args, **kwargs):
+        pass
+
+    # When
+    task = my_function.delay(args=("foo",))
+
+    # Then
+    assert task.id
+    mock_notify_task_created.assert_called_once_with()
+
+
+def test_delay_does_not_notify_task_runners_for_scheduled_task(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mock_notify_task_created = mocker.patch(
+        "task_processor.decorators.notify_task_created"
+    )
+
+    @register_task_handler()
+    def my_function(*args, **kwargs):
+        pass
+
+    # When
+    my_function.delay(delay_until=timezone.now() + timedelta(hours=1))
+
+    # Then
+    mock_notify_task_created.assert_not_called()
+
+
+def test_delay_creates_task_with_queue_and_priority(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    @register_task_handler(queue="bulk", priority=TaskPriority.LOW)
+    def my_function(*args, **kwargs):
+        pass
+
+    # When
+    task = my_function.delay()
+
+    # Then
+    task.refresh_from_db()
+    assert task.queue == "bulk"
+    assert task.priority == TaskPriority.LOW
+
+
+@register_task_handler(coalesce_key=lambda project_id: str(project_id))
+def _coalesced_task(project_id: int):
+    pass
+
+
+def test_delay_coalesces_task_with_pending_task(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    pending_task = _coalesced_task.delay(args=(1,))
+
+    # When
+    task = _coalesced_task.delay(args=(1,))
+
+    # Then
+    assert task == pending_task
+    assert Task.objects.count() == 1
+    assert task.coalesce_key == f"{_coalesced_task.task_identifier}:1"
+
+
+def test_delay_does_not_coalesce_tasks_with_different_keys(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    pending_task = _coalesced_task.delay(args=(1,))
+
+    # When
+    task = _coalesced_task.delay(args=(2,))
+
+    # Then
+    assert task != pending_task
+    assert Task.objects.count() == 2
+
+
+def test_delay_brings_coalesced_task_forward(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mock_notify_task_created = mocker.patch(
+        "task_processor.decorators.notify_task_created"
+    )
+
+    pending_task = _coalesced_task.delay(
+        args=(1,), delay_until=timezone.now() + timedelta(hours=1)
+    )
+
+    # When
+    task = _coalesced_task.delay(args=(1,))
+
+    # Then
+    assert task == pending_task
+    pending_task.refresh_from_db()
+    assert pending_task.scheduled_for <= timezone.now()
+    mock_notify_task_created.assert_called_once_with()
+
+
+def test_delay_does_not_push_coalesced_task_back(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    pending_task = _coalesced_task.delay(args=(1,))
+
+    # When
+    task = _coalesced_task.delay(
+        args=(1,), delay_until=timezone.now() + timedelta(hours=1)
+    )
+
+    # Then
+    assert task == pending_task
+    assert task.scheduled_for == pending_task.scheduled_for
+
+
+def test_delay_does_not_coalesce_task_with_started_task(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    started_task = _coalesced_task.delay(args=(1,))
+    started_task.locked_until = timezone.now() + timedelta(minutes=5)
+    started_task.locked_by = "worker-1"
+    started_task.save()
+
+    failed_task = _coalesced_task.delay(args=(1,))
+    failed_task.num_failures = 1
+    failed_task.save()
+
+    # When
+    task = _coalesced_task.delay(args=(1,))
+
+    # Then
+    assert task not in (started_task, failed_task)
+    assert Task.objects.count() == 3
+
+
+def test_register_recurring_task(mocker):
+    # Given
+    mocker.patch.dict(registered_recurring_tasks, clear=True)
+
+    # When
+    @register_recurring_task(run_every=timedelta(minutes=5), args=("foo",))
+    def my_recurring_task(arg):
+        pass
+
+    # Then
+    task_identifier = my_recurring_task.task_identifier
+    assert registered_tasks[task_identifier] == my_recurring_task
+    assert registered_recurring_tasks == {
+        task_identifier: RecurringTaskConfig(
+            run_every=timedelta(minutes=5), args=("foo",)
+        )
+    }
+
+
+@register_task_handler()
+def _bulk_task(*args, **kwargs):
+    pass
+
+
+def test_delay_many_creates_tasks_in_bulk(
+    db, settings, mocker, django_assert_num_queries
+):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mock_notify_task_created = mocker.patch(
+        "task_processor.decorators.notify_task_created"
+    )
+
+    # the tasks are created using a single query per batch, where the batch size
+    # may be limited by the database (e.g. sqlite limits the number of query
+    # parameters)
+    num_tasks = 100
+    batch_size = min(
+        BULK_CREATE_BATCH_SIZE,
+        connection.ops.bulk_batch_size(
+            [field for field in Task._meta.concrete_fields if not field.primary_key],
+            [None] * num_tasks,
+        ),
+    )
+
+    # When
+    with django_assert_num_queries(math.ceil(num_tasks / batch_size)):
+        tasks = _bulk_task.delay_many(args_list=[(i,) for i in range(num_tasks)])
+
+    # Then
+    assert len(tasks) == Task.objects.count() == 100
+    assert sorted(task.args for task in Task.objects.all()) == [[i] for i in range(100)]
+    mock_notify_task_created.assert_called_once_with()
+
+
+def test_delay_many_with_args_and_kwargs(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    # When
+    tasks = _bulk_task.delay_many(
+        args_list=[("foo",), ("bar",)], kwargs_list=[{"baz": 1}, {"baz": 2}]
+    )
+
+    # Then
+    assert [(task.args, task.kwargs) for task in tasks] == [
+        (["foo"], {"baz": 1}),
+        (["bar"], {"baz": 2}),
+    ]
+
+
+def test_delay_many_raises_error_if_args_and_kwargs_lengths_differ(db, settings):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+
+    # When / Then
+    with pytest.raises(ValueError):
+        _bulk_task.delay_many(args_list=[("foo",)], kwargs_list=[{}, {}])
+
+
+def test_delay_many_runs_function_synchronously(settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.SYNCHRONOUSLY
+    function = mocker.MagicMock(__name__="function")
+    function_with_delay = register_task_handler("my_bulk_task")(function)
+
+    # When
+    tasks = function_with_delay.delay_many(args_list=[("foo",), ("bar",)])
+
+    # Then
+    assert tasks == []
+    assert function.call_args_list == [mocker.call("foo"), mocker.call("bar")]
+
+
+def test_delay_many_coalesces_tasks(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    pending_task = _coalesced_task.delay(args=(1,))
+
+    # When
+    tasks = _coalesced_task.delay_many(args_list=[(1,), (2,), (2,), (3,)])
+
+    # Then
+    assert [task.args for task in tasks] == [[2], [3]]
+    assert Task.objects.exclude(id=pending_task.id).count() == 2
+
+
+def test_fan_out_creates_task_per_batch(db, settings, mocker):
+    # Given
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    mocker.patch("task_processor.decorators.notify_task_created")
+
+    # When
+    tasks = _bulk_task.fan_out(
+        range(5), batch_size=2, args=("foo",), kwargs={"bar": "baz"}
+    )
+
+    # Then
+    assert [(task.args, task.kwargs) for task in tasks] == [
+        (["foo", [0, 1]], {"bar": "baz"}),
+        (["foo", [2, 3]], {"bar": "baz"}),
+        (["foo", [4]], {"bar": "baz"}),
+    ]
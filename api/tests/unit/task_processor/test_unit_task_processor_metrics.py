@@ -0,0 +1,199 @@
+from datetime import timedelta
+from threading import Thread
+from urllib.request import urlopen
+
+import pytest
+from django.utils import timezone
+
+from task_processor.metrics import (
+    ProcessMetrics,
+    TaskProcessorMetrics,
+    TaskRunStats,
+    get_process_metrics,
+    render_metrics,
+    start_metrics_server,
+)
+from task_processor.models import Task, TaskResult, TaskRun
+
+
+def _create_task_run(task_identifier, result, duration=None):
+    started_at = timezone.now()
+    return TaskRun(
+        task=Task.create(task_identifier),
+        started_at=started_at,
+        finished_at=started_at + duration if duration else None,
+        result=result.value,
+    )
+
+
+def test_task_processor_metrics_records_task_runs():
+    # Given
+    metrics = TaskProcessorMetrics()
+    task_runs = [
+        _create_task_run("some_task", TaskResult.SUCCESS, timedelta(seconds=0.2)),
+        _create_task_run("some_task", TaskResult.SUCCESS, timedelta(seconds=3)),
+        _create_task_run("some_task", TaskResult.FAILURE),
+        _create_task_run("slow_task", TaskResult.SUCCESS, timedelta(minutes=10)),
+    ]
+
+    # When
+    metrics.record_task_runs(task_runs)
+
+    # Then
+    task_run_stats = metrics.get_task_run_stats()
+    assert task_run_stats.keys() == {"some_task", "slow_task"}
+
+    some_task_stats = task_run_stats["some_task"]
+    assert some_task_stats.num_runs == {
+        TaskResult.SUCCESS.value: 2,
+        TaskResult.FAILURE.value: 1,
+    }
+    assert some_task_stats.duration_seconds == pytest.approx(3.2)
+    assert some_task_stats.bucket_counts == [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0]
+
+    assert task_run_stats["slow_task"].bucket_counts[-1] == 1
+
+
+def test_get_process_metrics_returns_last_poll_of_each_thread():
+    # Given
+    last_checked_for_tasks = timezone.now()
+    polled_thread = Thread(name="polled")
+    polled_thread.last_checked_for_tasks = last_checked_for_tasks
+    new_thread = Thread(name="new")
+    new_thread.last_checked_for_tasks = None
+
+    # When
+    process_metrics = get_process_metrics([polled_thread, new_thread])
+
+    # Then
+    assert process_metrics.thread_last_polls == {
+        "polled": last_checked_for_tasks.timestamp()
+    }
+
+
+def test_get_process_metrics_returns_webhook_delivery_metrics(mocker):
+    # Given
+    webhook_delivery_metrics = {
+        "delivered": 3,
+        "failed": 1,
+        "retried": 2,
+        "throttled": 0,
+    }
+    mocker.patch(
+        "webhooks.webhooks.get_webhook_delivery_metrics",
+        return_value=webhook_delivery_metrics,
+    )
+
+    # When
+    process_metrics = get_process_metrics([])
+
+    # Then
+    assert process_metrics.webhook_deliveries == webhook_delivery_metrics
+
+
+def test_render_metrics_renders_task_queue_metrics(db):
+    # Given
+    now = timezone.now()
+    Task.schedule_task(now - timedelta(minutes=1), "some_task").save()
+    Task.schedule_task(now - timedelta(minutes=5), "some_task").save()
+    Task.schedule_task(now + timedelta(minutes=5), "scheduled_task").save()
+    failed_task = Task.create("failed_task")
+    failed_task.num_failures = 3
+    failed_task.save()
+
+    # When
+    metrics = render_metrics({})
+
+    # Then
+    assert 'task_processor_pending_tasks{task_identifier="some_task"} 2' in metrics
+    assert 'task_identifier="scheduled_task"' not in metrics
+    assert "task_processor_failed_tasks 1" in metrics
+
+    (oldest_pending_task_age,) = [
+        line
+        for line in metrics.splitlines()
+        if line.startswith("task_processor_oldest_pending_task_age_seconds{")
+    ]
+    assert float(oldest_pending_task_age.split()[-1]) >= 300
+
+
+def test_render_metrics_renders_process_metrics(db):
+    # Given
+    bucket_counts = [0] * 13
+    bucket_counts[2] = 1
+    bucket_counts[4] = 2
+    process_metrics = {
+        "TaskProcessor-0": ProcessMetrics(
+            task_run_stats={
+                "some_task": TaskRunStats(
+                    num_runs={"SUCCESS": 3, "FAILURE": 1},
+                    duration_seconds=1.2,
+                    bucket_counts=bucket_counts,
+                )
+            },
+            thread_last_polls={"Thread-1": 1700000000.5},
+            webhook_deliveries={"delivered": 5, "failed": 1},
+        )
+    }
+
+    # When
+    metrics = render_metrics(process_metrics)
+
+    # Then
+    labels = 'process="TaskProcessor-0",task_identifier="some_task"'
+    assert f'task_processor_task_runs_total{{{labels},result="SUCCESS"}} 3' in metrics
+    assert f'task_processor_task_runs_total{{{labels},result="FAILURE"}} 1' in metrics
+
+    name = "task_processor_task_run_duration_seconds"
+    assert f"# TYPE {name} histogram" in metrics
+    assert f'{name}_bucket{{{labels},le="0.05"}} 0' in metrics
+    assert f'{name}_bucket{{{labels},le="0.1"}} 1' in metrics
+    assert f'{name}_bucket{{{labels},le="0.5"}} 3' in metrics
+    assert f'{name}_bucket{{{labels},le="+Inf"}} 3' in metrics
+    assert f"{name}_sum{{{labels}}} 1.2" in metrics
+    assert f"{name}_count{{{labels}}} 3" in metrics
+
+    assert (
+        "task_processor_thread_last_poll_timestamp_seconds"
+        '{process="TaskProcessor-0",thread="Thread-1"} 1700000000.5'
+    ) in metrics
+
+    assert (
+        "task_processor_webhook_deliveries_total"
+        '{process="TaskProcessor-0",result="delivered"} 5'
+    ) in metrics
+    assert (
+        "task_processor_webhook_deliveries_total"
+        '{process="TaskProcessor-0",result="failed"} 1'
+    ) in metrics
+
+
+def test_render_metrics_escapes_label_values(db):
+    # Given
+    Task.create('some "quoted" \\ task').save()
+
+    # When
+    metrics = render_metrics({})
+
+    # Then
+    assert 'task_identifier="some \\"quoted\\" \\\\ task"' in metrics
+
+
+def test_start_metrics_server_serves_metrics(mocker):
+    # Given
+    mocker.patch(
+        "task_processor.metrics.render_metrics", return_value="some_metric 1\n"
+    )
+    server = start_metrics_server(0, dict)
+
+    # When
+    try:
+        response = urlopen(f"http://localhost:{server.server_port}/metrics")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Then
+    assert response.status == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert response.read() == b"some_metric 1\n"
@@ -1,3 +1,6 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
 from task_processor.decorators import register_task_handler
 from task_processor.models import Task
 
@@ -20,3 +23,38 @@ def test_task_run():
 
     # Then
     assert result == my_callable(*args, **kwargs)
+
+
+def test_task_args_and_kwargs_keep_their_types(db):
+    # Given
+    args = [datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone.utc), Decimal("1.10")]
+    kwargs = {"arg_two": {"day": date(2023, 1, 2), "values": [1, "two", None]}}
+
+    task = Task.create(my_callable.task_identifier, args=args, kwargs=kwargs)
+    task.save()
+
+    # When
+    task = Task.objects.get(id=task.id)
+
+    # Then
+    assert task.args == args
+    assert task.kwargs == kwargs
+
+
+def test_task_args_and_kwargs_are_read_from_json_text(db):
+    # Given
+    # a task created before the args and kwargs were serialized to binary
+    task = Task.objects.create(
+        task_identifier=my_callable.task_identifier,
+        serialized_args='["foo"]',
+        serialized_kwargs='{"arg_two": "bar"}',
+    )
+
+    # When
+    task = Task.objects.get(id=task.id)
+    result = task.run()
+
+    # Then
+    assert task.args == ["foo"]
+    assert task.kwargs == {"arg_two": "bar"}
+    assert result == ("foo", "bar")
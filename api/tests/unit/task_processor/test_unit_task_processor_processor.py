@@ -1,14 +1,30 @@
 import time
 import uuid
+from datetime import timedelta
 from threading import Thread
 
+import pytest
 from django.db import transaction
 from django.test.testcases import TransactionTestCase
+from django.utils import timezone
 
 from organisations.models import Organisation
+from task_processor import processor
 from task_processor.decorators import register_task_handler
-from task_processor.models import Task, TaskResult, TaskRun
-from task_processor.processor import run_tasks
+from task_processor.models import (
+    RecurringTask,
+    RecurringTaskRun,
+    Task,
+    TaskPriority,
+    TaskResult,
+    TaskRun,
+)
+from task_processor.processor import (
+    initialise_recurring_tasks,
+    run_recurring_tasks,
+    run_tasks,
+)
+from task_processor.task_registry import RecurringTaskConfig
 
 
 def test_run_task_runs_task_and_creates_task_run_object_when_success(db):
@@ -88,7 +104,7 @@ def test_run_next_task_runs_tasks_in_correct_order(db):
 class TestProcessor(TransactionTestCase):
     def test_get_next_task_skips_locked_rows(self):
         """
-        This test verifies that tasks are locked while being executed, and hence
+        This test verifies that tasks are leased while being executed, and hence
         new task runners are not able to pick up 'in progress' tasks.
         """
         # Given
@@ -153,6 +169,355 @@ def test_run_more_than_one_task(db):
         assert task.completed
 
 
+def test_run_tasks_releases_lease_after_running_task(db):
+    # Given
+    task = Task.create(_create_organisation.task_identifier, args=("test org",))
+    task.save()
+
+    # When
+    run_tasks(worker_id="worker-1")
+
+    # Then
+    task.refresh_from_db()
+    assert task.completed
+    assert task.locked_until is None
+    assert task.locked_by is None
+
+
+def test_run_tasks_releases_lease_after_task_failure(db):
+    # Given
+    task = Task.create(_raise_exception.task_identifier)
+    task.save()
+
+    # When
+    run_tasks(worker_id="worker-1")
+
+    # Then
+    task.refresh_from_db()
+    assert not task.completed
+    assert task.num_failures == 1
+    assert task.locked_until is None
+    assert task.locked_by is None
+
+
+def test_run_tasks_does_not_run_task_leased_by_another_worker(db):
+    # Given
+    task = Task.create(_create_organisation.task_identifier, args=("test org",))
+    task.locked_until = timezone.now() + timedelta(minutes=5)
+    task.locked_by = "worker-1"
+    task.save()
+
+    # When
+    task_runs = run_tasks(worker_id="worker-2")
+
+    # Then
+    assert task_runs == []
+    assert not Organisation.objects.filter(name="test org").exists()
+
+    task.refresh_from_db()
+    assert not task.completed
+    assert task.locked_by == "worker-1"
+
+
+def test_run_tasks_runs_task_with_expired_lease(db):
+    # Given
+    # a task leased by a worker which died while running it
+    task = Task.create(_create_organisation.task_identifier, args=("test org",))
+    task.locked_until = timezone.now() - timedelta(seconds=1)
+    task.locked_by = "worker-1"
+    task.save()
+
+    # When
+    task_runs = run_tasks(worker_id="worker-2")
+
+    # Then
+    assert len(task_runs) == 1
+    assert task_runs[0].result == TaskResult.SUCCESS
+    assert Organisation.objects.filter(name="test org").exists()
+
+    task.refresh_from_db()
+    assert task.completed
+    assert task.locked_by is None
+
+
+def test_run_tasks_does_not_release_task_leased_by_another_worker(db, mocker):
+    # Given
+    task = Task.create(_create_organisation.task_identifier, args=("test org",))
+    task.save()
+
+    def _reclaim_task(task_to_run):
+        # simulate the lease expiring while running the task, and the task
+        # being claimed by another worker
+        Task.objects.filter(id=task_to_run.id).update(locked_by="worker-2")
+        task_to_run.run()
+        task_to_run.completed = True
+        return TaskRun(
+            task=task_to_run, started_at=timezone.now(), result=TaskResult.SUCCESS
+        )
+
+    mocker.patch("task_processor.processor._run_task", side_effect=_reclaim_task)
+
+    # When
+    run_tasks(worker_id="worker-1")
+
+    # Then
+    task.refresh_from_db()
+    assert task.locked_by == "worker-2"
+    assert not task.completed
+
+
+def test_run_tasks_completes_task_which_has_already_succeeded(db, mocker):
+    # Given
+    task = Task.create(_create_organisation.task_identifier, args=("test org",))
+    task.save()
+    TaskRun.objects.create(
+        task=task, started_at=timezone.now(), result=TaskResult.SUCCESS
+    )
+    mocked_run = mocker.patch.object(Task, "run")
+
+    # When
+    task_runs = run_tasks()
+
+    # Then
+    assert task_runs == []
+    mocked_run.assert_not_called()
+    task.refresh_from_db()
+    assert task.completed
+    assert task.locked_by is None
+
+    # and the task isn't claimed again
+    mocked_claim_tasks = mocker.spy(processor, "_claim_tasks")
+    assert run_tasks() == []
+    assert mocked_claim_tasks.spy_return == []
+
+
+def test_run_tasks_does_not_hold_transaction_while_running_task(db, mocker):
+    # Given
+    task = Task.create(_create_organisation.task_identifier, args=("test org",))
+    task.save()
+
+    # the test itself runs in a transaction, so we check that no savepoint (i.e.
+    # nested transaction) is open while the task is run
+    connection = transaction.get_connection()
+    num_savepoints = len(connection.savepoint_ids)
+
+    savepoints_while_running = []
+    mocker.patch(
+        "task_processor.processor._run_task",
+        side_effect=lambda task_to_run: savepoints_while_running.append(
+            len(connection.savepoint_ids)
+        ),
+    )
+
+    # When
+    run_tasks()
+
+    # Then
+    assert savepoints_while_running == [num_savepoints]
+
+
+def test_run_tasks_runs_tasks_in_priority_order(db):
+    # Given
+    low_priority_task = Task.create(
+        _create_organisation.task_identifier,
+        args=("low priority",),
+        priority=TaskPriority.LOW,
+    )
+    low_priority_task.save()
+
+    high_priority_task = Task.create(
+        _create_organisation.task_identifier,
+        args=("high priority",),
+        priority=TaskPriority.HIGH,
+    )
+    high_priority_task.save()
+
+    # When
+    task_runs = run_tasks(2)
+
+    # Then
+    assert [task_run.task for task_run in task_runs] == [
+        high_priority_task,
+        low_priority_task,
+    ]
+
+
+def test_run_tasks_only_runs_tasks_from_given_queues(db):
+    # Given
+    default_queue_task = Task.create(
+        _create_organisation.task_identifier, args=("default queue",)
+    )
+    default_queue_task.save()
+
+    bulk_queue_task = Task.create(
+        _create_organisation.task_identifier, args=("bulk queue",), queue="bulk"
+    )
+    bulk_queue_task.save()
+
+    # When
+    task_runs = run_tasks(2, queues=["bulk"])
+
+    # Then
+    assert [task_run.task for task_run in task_runs] == [bulk_queue_task]
+
+    default_queue_task.refresh_from_db()
+    assert not default_queue_task.completed
+
+
+@pytest.fixture()
+def recurring_task(db, mocker):
+    mocker.patch.dict(
+        "task_processor.processor.registered_recurring_tasks",
+        {
+            _create_organisation.task_identifier: RecurringTaskConfig(
+                run_every=timedelta(hours=1), args=("recurring org",)
+            )
+        },
+        clear=True,
+    )
+    initialise_recurring_tasks()
+    return RecurringTask.objects.get()
+
+
+def test_initialise_recurring_tasks_creates_recurring_tasks(recurring_task):
+    assert recurring_task.task_identifier == _create_organisation.task_identifier
+    assert recurring_task.run_every == timedelta(hours=1)
+    assert recurring_task.args == ["recurring org"]
+    assert recurring_task.kwargs == {}
+    assert recurring_task.next_run_at <= timezone.now()
+
+
+def test_initialise_recurring_tasks_updates_existing_recurring_tasks(
+    recurring_task, mocker
+):
+    # Given
+    next_run_at = timezone.now() + timedelta(minutes=30)
+    recurring_task.next_run_at = next_run_at
+    recurring_task.save()
+
+    mocker.patch.dict(
+        "task_processor.processor.registered_recurring_tasks",
+        {
+            _create_organisation.task_identifier: RecurringTaskConfig(
+                run_every=timedelta(minutes=5), args=("other org",)
+            )
+        },
+        clear=True,
+    )
+
+    # When
+    initialise_recurring_tasks()
+
+    # Then
+    recurring_task.refresh_from_db()
+    assert RecurringTask.objects.count() == 1
+    assert recurring_task.run_every == timedelta(minutes=5)
+    assert recurring_task.args == ["other org"]
+    assert recurring_task.next_run_at == next_run_at
+
+
+def test_run_recurring_tasks_runs_task_and_schedules_next_run(recurring_task):
+    # Given
+    next_run_at = recurring_task.next_run_at + timedelta(hours=1)
+
+    # When
+    task_runs = run_recurring_tasks(worker_id="worker-1")
+
+    # Then
+    assert Organisation.objects.filter(name="recurring org").exists()
+
+    assert len(task_runs) == RecurringTaskRun.objects.count() == 1
+    assert task_runs[0].result == TaskResult.SUCCESS
+
+    recurring_task.refresh_from_db()
+    assert recurring_task.next_run_at == next_run_at
+    assert recurring_task.locked_until is None
+    assert recurring_task.locked_by is None
+
+
+def test_run_recurring_tasks_only_runs_task_once_per_period(recurring_task):
+    # Given
+    run_recurring_tasks(worker_id="worker-1")
+
+    # When
+    task_runs = run_recurring_tasks(worker_id="worker-2")
+
+    # Then
+    assert task_runs == []
+    assert RecurringTaskRun.objects.count() == 1
+
+
+def test_run_recurring_tasks_does_not_run_task_leased_by_another_worker(
+    recurring_task,
+):
+    # Given
+    recurring_task.locked_until = timezone.now() + timedelta(minutes=5)
+    recurring_task.locked_by = "worker-1"
+    recurring_task.save()
+
+    # When
+    task_runs = run_recurring_tasks(worker_id="worker-2")
+
+    # Then
+    assert task_runs == []
+    assert not Organisation.objects.filter(name="recurring org").exists()
+
+
+def test_run_recurring_tasks_skips_missed_runs(recurring_task):
+    # Given
+    recurring_task.next_run_at = timezone.now() - timedelta(days=1)
+    recurring_task.save()
+
+    # When
+    run_recurring_tasks()
+
+    # Then
+    recurring_task.refresh_from_db()
+    assert recurring_task.next_run_at > timezone.now()
+    assert recurring_task.next_run_at <= timezone.now() + timedelta(hours=1)
+
+
+def test_run_recurring_tasks_schedules_next_run_after_failure(recurring_task, mocker):
+    # Given
+    recurring_task.task_identifier = _raise_exception.task_identifier
+    recurring_task.serialized_args = "[]"
+    recurring_task.save()
+    next_run_at = recurring_task.next_run_at + timedelta(hours=1)
+
+    mocker.patch.dict(
+        "task_processor.processor.registered_recurring_tasks",
+        {
+            _raise_exception.task_identifier: RecurringTaskConfig(
+                run_every=timedelta(hours=1)
+            )
+        },
+        clear=True,
+    )
+
+    # When
+    task_runs = run_recurring_tasks()
+
+    # Then
+    assert task_runs[0].result == TaskResult.FAILURE
+    assert task_runs[0].error_details is not None
+
+    recurring_task.refresh_from_db()
+    assert recurring_task.next_run_at == next_run_at
+
+
+def test_run_recurring_tasks_does_not_run_unregistered_tasks(recurring_task, mocker):
+    # Given
+    mocker.patch.dict(
+        "task_processor.processor.registered_recurring_tasks", {}, clear=True
+    )
+
+    # When
+    task_runs = run_recurring_tasks()
+
+    # Then
+    assert task_runs == []
+
+
 @register_task_handler()
 def _create_organisation(name: str):
     """function used to test that task is being run successfully"""
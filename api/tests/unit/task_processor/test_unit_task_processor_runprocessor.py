@@ -0,0 +1,138 @@
+import queue
+import time
+from argparse import ArgumentTypeError
+
+import pytest
+
+from task_processor.management.commands.runprocessor import (
+    Command,
+    _parse_queue,
+)
+from task_processor.metrics import ProcessMetrics
+
+
+@pytest.fixture()
+def command(mocker):
+    # don't replace the signal handlers of the test process
+    mocker.patch("task_processor.management.commands.runprocessor.signal")
+
+    command = Command()
+    command._ms_before_unhealthy = 5000
+    command._health_queue = mocker.MagicMock()
+    command._health_queue.get_nowait.side_effect = _empty_queue
+    return command
+
+
+def _empty_queue():
+    raise queue.Empty()
+
+
+def test_supervise_processes_restarts_dead_process(command, mocker):
+    # Given
+    process = mocker.MagicMock()
+    process.name = "TaskProcessor-0"
+    process.is_alive.return_value = False
+    command._processes = {0: process}
+    command._process_health = {0: (time.monotonic(), [])}
+
+    mocked_start_process = mocker.patch.object(command, "_start_process")
+
+    # When
+    unhealthy_names = command._supervise_processes()
+
+    # Then
+    assert unhealthy_names == ["TaskProcessor-0"]
+    mocked_start_process.assert_called_once_with(0)
+
+
+def test_supervise_processes_kills_unresponsive_process(command, mocker):
+    # Given
+    process = mocker.MagicMock()
+    process.name = "TaskProcessor-0"
+    process.is_alive.return_value = True
+    command._processes = {0: process}
+    command._process_health = {0: (time.monotonic() - 10, [])}
+
+    mocked_start_process = mocker.patch.object(command, "_start_process")
+
+    # When
+    unhealthy_names = command._supervise_processes()
+
+    # Then
+    assert unhealthy_names == ["TaskProcessor-0"]
+    process.kill.assert_called_once_with()
+    mocked_start_process.assert_not_called()
+
+
+def test_supervise_processes_returns_unhealthy_threads_reported_by_processes(
+    command, mocker
+):
+    # Given
+    healthy_process = mocker.MagicMock()
+    healthy_process.name = "TaskProcessor-0"
+    unhealthy_process = mocker.MagicMock()
+    unhealthy_process.name = "TaskProcessor-1"
+    command._processes = {0: healthy_process, 1: unhealthy_process}
+    command._process_health = {
+        0: (time.monotonic() - 10, []),
+        1: (time.monotonic() - 10, []),
+    }
+
+    healthy_process_metrics = ProcessMetrics(task_run_stats={}, thread_last_polls={})
+    unhealthy_process_metrics = ProcessMetrics(task_run_stats={}, thread_last_polls={})
+    reports = [
+        (0, [], healthy_process_metrics),
+        (1, ["TaskProcessor-1:Thread-1"], unhealthy_process_metrics),
+    ]
+
+    def get_report():
+        if not reports:
+            _empty_queue()
+        return reports.pop(0)
+
+    command._health_queue.get_nowait.side_effect = get_report
+
+    # When
+    unhealthy_names = command._supervise_processes()
+
+    # Then
+    assert unhealthy_names == ["TaskProcessor-1:Thread-1"]
+    healthy_process.kill.assert_not_called()
+    unhealthy_process.kill.assert_not_called()
+    assert command._process_metrics == {
+        "TaskProcessor-0": healthy_process_metrics,
+        "TaskProcessor-1": unhealthy_process_metrics,
+    }
+
+
+def test_supervise_processes_does_not_restart_processes_when_stopping(command, mocker):
+    # Given
+    process = mocker.MagicMock()
+    process.is_alive.return_value = False
+    command._processes = {0: process}
+    command._process_health = {0: (time.monotonic(), [])}
+
+    mocked_start_process = mocker.patch.object(command, "_start_process")
+
+    # When
+    command._exit_gracefully()
+    unhealthy_names = command._supervise_processes()
+
+    # Then
+    assert unhealthy_names == []
+    process.terminate.assert_called_once_with()
+    mocked_start_process.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "value, expected_queue",
+    (("default", ("default", 1)), ("bulk:5", ("bulk", 5))),
+)
+def test_parse_queue(value, expected_queue):
+    assert _parse_queue(value) == expected_queue
+
+
+@pytest.mark.parametrize("value", ("", ":1", "bulk:0", "bulk:-1", "bulk:foo"))
+def test_parse_queue_raises_error_for_invalid_queue(value):
+    with pytest.raises(ArgumentTypeError):
+        _parse_queue(value)
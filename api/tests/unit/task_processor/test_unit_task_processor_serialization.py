@@ -0,0 +1,76 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.http.request import HttpHeaders
+
+from task_processor.serialization import TYPE_KEY, deserialize, serialize
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        [1, 2.5, "three", None, True, {"four": [5]}],
+        datetime(2023, 1, 2, 3, 4, 5, 6),
+        datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=2))),
+        date(2023, 1, 2),
+        Decimal("1.10"),
+        {"nested": [{"updated_at": datetime(2023, 1, 2, tzinfo=timezone.utc)}]},
+    ),
+)
+def test_serialize_and_deserialize_keep_types(data):
+    assert deserialize(serialize(data)) == data
+
+
+def test_serialize_serializes_tuples_as_lists():
+    assert deserialize(serialize((1, (2, 3)))) == [1, [2, 3]]
+
+
+def test_serialize_serializes_uuids_as_strings():
+    # Given
+    value = uuid.uuid4()
+
+    # When
+    deserialized_value = deserialize(serialize(value))
+
+    # Then
+    assert deserialized_value == str(value)
+
+
+def test_serialize_serializes_mappings_as_dicts():
+    # Given
+    headers = HttpHeaders({"HTTP_X_ENVIRONMENT_KEY": "key"})
+
+    # When
+    deserialized_headers = deserialize(serialize(headers))
+
+    # Then
+    assert deserialized_headers == {"X-Environment-Key": "key"}
+
+
+def test_serialize_serializes_non_string_keys_as_strings():
+    assert deserialize(serialize({1: "one"})) == {"1": "one"}
+
+
+def test_serialize_raises_type_error_for_unsupported_types():
+    with pytest.raises(TypeError):
+        serialize(object())
+
+
+def test_deserialize_reads_memoryview():
+    # Given
+    # binary fields are read from postgres as memoryviews
+    data = memoryview(serialize({"key": date(2023, 1, 2)}))
+
+    # When
+    deserialized_data = deserialize(data)
+
+    # Then
+    assert deserialized_data == {"key": date(2023, 1, 2)}
+
+
+def test_serialized_type_is_tagged():
+    assert serialize(Decimal("1.10")) == (
+        b'{"' + TYPE_KEY.encode() + b'":"decimal","value":"1.10"}'
+    )
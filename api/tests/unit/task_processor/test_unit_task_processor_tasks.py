@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from task_processor.models import (
+    RecurringTask,
+    RecurringTaskRun,
+    Task,
+    TaskResult,
+    TaskRun,
+    TaskRunSummary,
+)
+from task_processor.tasks import clean_up_old_tasks
+
+now = timezone.now()
+three_weeks_ago = now - timedelta(days=21)
+
+
+@pytest.fixture(autouse=True)
+def clean_up_settings(settings):
+    settings.ENABLE_CLEAN_UP_OLD_TASKS = True
+    settings.TASK_DELETE_RETENTION_DAYS = 15
+    settings.TASK_DELETE_BATCH_SIZE = 2
+    settings.TASK_DELETE_INCLUDE_FAILED_TASKS = False
+
+
+def _create_task(scheduled_for, completed=False, num_failures=0, results=()):
+    task = Task.schedule_task(scheduled_for, "some_identifier")
+    task.completed = completed
+    task.num_failures = num_failures
+    task.save()
+    for result in results:
+        TaskRun.objects.create(
+            task=task,
+            started_at=scheduled_for,
+            finished_at=scheduled_for + timedelta(seconds=2),
+            result=result.value,
+        )
+    return task
+
+
+def test_clean_up_old_tasks_deletes_old_completed_tasks_and_their_runs(db):
+    # Given
+    old_tasks = [
+        _create_task(
+            three_weeks_ago,
+            completed=True,
+            results=(TaskResult.FAILURE, TaskResult.SUCCESS),
+        )
+        for _ in range(3)
+    ]
+    recent_task = _create_task(now, completed=True, results=(TaskResult.SUCCESS,))
+    incomplete_task = _create_task(three_weeks_ago, num_failures=1)
+
+    # When
+    clean_up_old_tasks()
+
+    # Then
+    assert set(Task.objects.all()) == {recent_task, incomplete_task}
+    assert not TaskRun.objects.filter(task__in=old_tasks).exists()
+    assert TaskRun.objects.filter(task=recent_task).count() == 1
+
+
+def test_clean_up_old_tasks_summarises_deleted_task_runs(db):
+    # Given
+    for _ in range(3):
+        _create_task(
+            three_weeks_ago,
+            completed=True,
+            results=(TaskResult.FAILURE, TaskResult.SUCCESS),
+        )
+
+    TaskRunSummary.objects.create(
+        task_identifier="some_identifier",
+        date=three_weeks_ago.date(),
+        result=TaskResult.SUCCESS.value,
+        num_runs=1,
+        total_duration=timedelta(seconds=1),
+    )
+
+    # When
+    clean_up_old_tasks()
+
+    # Then
+    summaries = {
+        summary.result: summary
+        for summary in TaskRunSummary.objects.filter(
+            task_identifier="some_identifier", date=three_weeks_ago.date()
+        )
+    }
+    assert summaries.keys() == {TaskResult.SUCCESS.value, TaskResult.FAILURE.value}
+    assert summaries[TaskResult.SUCCESS.value].num_runs == 4
+    assert summaries[TaskResult.SUCCESS.value].total_duration == timedelta(seconds=7)
+    assert summaries[TaskResult.FAILURE.value].num_runs == 3
+    assert summaries[TaskResult.FAILURE.value].total_duration == timedelta(seconds=6)
+
+
+@pytest.mark.parametrize(
+    "include_failed_tasks, expected_remaining_tasks", ((False, 1), (True, 0))
+)
+def test_clean_up_old_tasks_deletes_failed_tasks_if_configured(
+    db, settings, include_failed_tasks, expected_remaining_tasks
+):
+    # Given
+    settings.TASK_DELETE_INCLUDE_FAILED_TASKS = include_failed_tasks
+    _create_task(three_weeks_ago, num_failures=3, results=(TaskResult.FAILURE,) * 3)
+
+    # When
+    clean_up_old_tasks()
+
+    # Then
+    assert Task.objects.count() == expected_remaining_tasks
+
+
+def test_clean_up_old_tasks_does_nothing_if_disabled(db, settings):
+    # Given
+    settings.ENABLE_CLEAN_UP_OLD_TASKS = False
+    task = _create_task(three_weeks_ago, completed=True, results=(TaskResult.SUCCESS,))
+
+    # When
+    clean_up_old_tasks()
+
+    # Then
+    assert list(Task.objects.all()) == [task]
+    assert not TaskRunSummary.objects.exists()
+
+
+def test_clean_up_old_tasks_deletes_old_recurring_task_runs(db):
+    # Given
+    recurring_task = RecurringTask.objects.create(
+        task_identifier="some_recurring_identifier", run_every=timedelta(hours=1)
+    )
+    for started_at in (three_weeks_ago, three_weeks_ago, three_weeks_ago, now):
+        RecurringTaskRun.objects.create(
+            task=recurring_task,
+            started_at=started_at,
+            finished_at=started_at + timedelta(seconds=1),
+            result=TaskResult.SUCCESS.value,
+        )
+
+    # When
+    clean_up_old_tasks()
+
+    # Then
+    assert list(RecurringTaskRun.objects.values_list("started_at", flat=True)) == [now]
+    summary = TaskRunSummary.objects.get(task_identifier="some_recurring_identifier")
+    assert summary.num_runs == 3
+    assert summary.total_duration == timedelta(seconds=3)
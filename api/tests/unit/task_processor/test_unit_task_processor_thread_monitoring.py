@@ -6,6 +6,7 @@ from task_processor.thread_monitoring import (
     UNHEALTHY_THREADS_FILE_PATH,
     clear_unhealthy_threads,
     get_unhealthy_thread_names,
+    write_unhealthy_thread_names,
     write_unhealthy_threads,
 )
 
@@ -41,6 +42,19 @@ def test_write_unhealthy_threads():
     )
 
 
+def test_write_unhealthy_thread_names():
+    # Given
+    thread_names = ["TaskProcessor-0:Thread-1", "TaskProcessor-1"]
+
+    # When
+    with patch("builtins.open", mock_open()) as mocked_open:
+        write_unhealthy_thread_names(thread_names)
+
+    # Then
+    mocked_open.assert_called_once_with(UNHEALTHY_THREADS_FILE_PATH, "w+")
+    mocked_open.return_value.write.assert_called_once_with(json.dumps(thread_names))
+
+
 def test_get_unhealthy_thread_names_returns_empty_list_if_file_does_not_exist(mocker):
     # Given
     mocked_os = mocker.patch("task_processor.thread_monitoring.os")
@@ -0,0 +1,222 @@
+import pytest
+
+from task_processor.notifications import TaskCreatedListener
+from task_processor.threads import TaskRunner
+
+
+@pytest.fixture(autouse=True)
+def mock_run_recurring_tasks(mocker):
+    return mocker.patch("task_processor.threads.run_recurring_tasks", return_value=[])
+
+
+@pytest.fixture()
+def task_runner():
+    return TaskRunner(sleep_interval_millis=1000, min_sleep_interval_millis=100)
+
+
+def _stop_after(task_runner, num_calls, return_value=None):
+    calls = []
+
+    def side_effect(*args, **kwargs):
+        calls.append(args)
+        if len(calls) >= num_calls:
+            task_runner.stop()
+        return return_value
+
+    return side_effect
+
+
+def test_task_runner_runs_tasks_again_immediately_if_tasks_were_run(
+    task_runner, mocker
+):
+    # Given
+    mocker.patch("task_processor.threads.is_notification_supported", return_value=False)
+    mock_sleep = mocker.patch("task_processor.threads.time.sleep")
+    mock_run_tasks = mocker.patch(
+        "task_processor.threads.run_tasks",
+        side_effect=_stop_after(task_runner, 3, return_value=[mocker.MagicMock()]),
+    )
+
+    # When
+    task_runner.run()
+
+    # Then
+    assert mock_run_tasks.call_count == 3
+    mock_sleep.assert_not_called()
+
+
+def test_task_runner_backs_off_when_polling_an_empty_queue(task_runner, mocker):
+    # Given
+    mocker.patch("task_processor.threads.is_notification_supported", return_value=False)
+    mock_sleep = mocker.patch("task_processor.threads.time.sleep")
+    mocker.patch(
+        "task_processor.threads.run_tasks",
+        side_effect=_stop_after(task_runner, 6, return_value=[]),
+    )
+
+    # When
+    task_runner.run()
+
+    # Then
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [
+        0.1,
+        0.2,
+        0.4,
+        0.8,
+        1,
+        1,
+    ]
+
+
+def test_task_runner_waits_for_notification_when_supported(task_runner, mocker):
+    # Given
+    mocker.patch("task_processor.threads.is_notification_supported", return_value=True)
+    mock_listener_class = mocker.patch("task_processor.threads.TaskCreatedListener")
+    mock_sleep = mocker.patch("task_processor.threads.time.sleep")
+    mocker.patch(
+        "task_processor.threads.run_tasks",
+        side_effect=_stop_after(task_runner, 2, return_value=[]),
+    )
+
+    # When
+    task_runner.run()
+
+    # Then
+    mock_listener_class.return_value.wait.assert_called_with(1)
+    assert mock_listener_class.return_value.wait.call_count == 2
+    mock_sleep.assert_not_called()
+
+
+def test_task_created_listener_returns_buffered_notifications(mocker):
+    # Given
+    mock_connection = mocker.patch("task_processor.notifications.connection")
+    mock_select = mocker.patch("task_processor.notifications.select.select")
+    pg_connection = mock_connection.connection
+    pg_connection.notifies = [mocker.MagicMock()]
+
+    listener = TaskCreatedListener()
+
+    # When
+    notified = listener.wait(1)
+
+    # Then
+    assert notified is True
+    assert pg_connection.notifies == []
+    mock_select.assert_not_called()
+    mock_connection.cursor.return_value.__enter__.return_value.execute.assert_called_once_with(
+        "LISTEN task_processor_task_created"
+    )
+
+
+def test_task_created_listener_waits_for_notification(mocker):
+    # Given
+    mock_connection = mocker.patch("task_processor.notifications.connection")
+    pg_connection = mock_connection.connection
+    pg_connection.notifies = []
+
+    def select(*args):
+        pg_connection.notifies.append(mocker.MagicMock())
+        return [pg_connection], [], []
+
+    mock_select = mocker.patch(
+        "task_processor.notifications.select.select", side_effect=select
+    )
+
+    listener = TaskCreatedListener()
+
+    # When
+    notified = listener.wait(1.5)
+
+    # Then
+    assert notified is True
+    mock_select.assert_called_once_with([pg_connection], [], [], 1.5)
+
+
+def test_task_created_listener_returns_false_on_timeout(mocker):
+    # Given
+    mock_connection = mocker.patch("task_processor.notifications.connection")
+    mock_connection.connection.notifies = []
+    mocker.patch(
+        "task_processor.notifications.select.select", return_value=([], [], [])
+    )
+
+    listener = TaskCreatedListener()
+
+    # When
+    notified = listener.wait(1)
+
+    # Then
+    assert notified is False
+
+
+def test_task_runner_runs_tasks_from_all_queues_by_default(task_runner, mocker):
+    # Given
+    mocker.patch("task_processor.threads.is_notification_supported", return_value=False)
+    mock_run_tasks = mocker.patch(
+        "task_processor.threads.run_tasks",
+        side_effect=_stop_after(task_runner, 1, return_value=[mocker.MagicMock()]),
+    )
+
+    # When
+    task_runner.run()
+
+    # Then
+    mock_run_tasks.assert_called_once_with(task_runner.queue_pop_size)
+
+
+def test_task_runner_falls_back_to_other_queues_if_queue_is_empty(mocker):
+    # Given
+    task_runner = TaskRunner(queue_weights={"default": 1, "bulk": 1})
+    mocker.patch("task_processor.threads.is_notification_supported", return_value=False)
+    mocker.patch.object(
+        task_runner, "_get_queue_order", return_value=["bulk", "default"]
+    )
+
+    def run_tasks(num_tasks, queues):
+        task_runner.stop()
+        return [mocker.MagicMock()] if queues == ["default"] else []
+
+    mock_run_tasks = mocker.patch(
+        "task_processor.threads.run_tasks", side_effect=run_tasks
+    )
+
+    # When
+    task_runner.run()
+
+    # Then
+    assert [call.kwargs["queues"] for call in mock_run_tasks.call_args_list] == [
+        ["bulk"],
+        ["default"],
+    ]
+
+
+def test_task_runner_queue_order_is_weighted(mocker):
+    # Given
+    task_runner = TaskRunner(queue_weights={"default": 3, "bulk": 1})
+    # When
+    first_queues = [task_runner._get_queue_order()[0] for _ in range(1000)]
+
+    # Then
+    assert sorted(task_runner._get_queue_order()) == ["bulk", "default"]
+    assert 650 < first_queues.count("default") < 850
+
+
+def test_task_runner_runs_recurring_tasks(
+    task_runner, mocker, mock_run_recurring_tasks
+):
+    # Given
+    mocker.patch("task_processor.threads.is_notification_supported", return_value=False)
+    mock_sleep = mocker.patch("task_processor.threads.time.sleep")
+    mock_run_recurring_tasks.side_effect = _stop_after(
+        task_runner, 2, return_value=[mocker.MagicMock()]
+    )
+    mocker.patch("task_processor.threads.run_tasks", return_value=[])
+
+    # When
+    task_runner.run()
+
+    # Then
+    # the runner doesn't wait for new tasks after running recurring tasks
+    assert mock_run_recurring_tasks.call_count == 2
+    mock_run_recurring_tasks.assert_called_with(task_runner.queue_pop_size)
+    mock_sleep.assert_not_called()
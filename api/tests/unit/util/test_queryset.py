@@ -1,34 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from util.queryset import iterator_with_prefetch
 
 
-def test_iterator_with_prefetch_adds_order_by_to_queryset_if_not_present(
-    mocker, identity
-):
+@pytest.fixture()
+def identities_with_traits(environment):
+    identities = []
+    for i in range(20):
+        identity = Identity.objects.create(
+            identifier=f"test_user_{i}", environment=environment
+        )
+        Trait.objects.create(identity=identity, trait_key=f"test_key{i}")
+        identities.append(identity)
+    return identities
+
+
+def test_iterator_with_prefetch_orders_queryset_by_pk(identities_with_traits):
+    # Given
+    queryset = Identity.objects.order_by("-identifier")
+
+    # When
+    identities = list(iterator_with_prefetch(queryset, chunk_size=3))
+
+    # Then
+    assert identities == identities_with_traits
+
+
+def test_iterator_with_prefetch_uses_keyset_pagination(identities_with_traits):
     # Given
     queryset = Identity.objects.all()
-    mocked_paginator = mocker.patch("util.queryset.Paginator")
 
     # When
-    list(iterator_with_prefetch(queryset, chunk_size=1))
+    with CaptureQueriesContext(connection) as captured_queries:
+        list(iterator_with_prefetch(queryset, chunk_size=15))
 
     # Then
-    args, _ = mocked_paginator.call_args
-    assert args[0].query.order_by == ("pk",)
+    first_query, second_query = (query["sql"] for query in captured_queries)
+    assert "COUNT(" not in first_query
+    assert "OFFSET" not in second_query
+    assert (
+        f'WHERE "environments_identity"."id" > {identities_with_traits[14].id}'
+        in second_query
+    )
 
 
 def test_iterator_with_prefetch_make_correct_number_of_queries(
-    mocker, environment, django_assert_num_queries
+    identities_with_traits, environment, django_assert_num_queries
 ):
     # Given
-    # First, let's create some identities and traits
-    for i in range(20):
-        identity = Identity.objects.create(
-            identifier=f"test_user_{i}", environment=environment
-        )
-        Trait.objects.create(identity=identity, trait_key=f"test_key{i}")
-
     queryset = (
         Identity.objects.filter(environment=environment)
         .select_related("environment")
@@ -38,12 +61,39 @@ def test_iterator_with_prefetch_make_correct_number_of_queries(
     iterator = iterator_with_prefetch(queryset, chunk_size=10)
 
     # Then, test, that we only make 5 queries
-    # first one to fetch the count
-    # second one to fetch first page of identities
-    # third one to fetch traits for the first page of identities
-    # fourth one to fetch identities for the second page
-    # and the last one to fetch traits for the last page of identities
+    # first one to fetch first page of identities
+    # second one to fetch traits for the first page of identities
+    # third one to fetch identities for the second page
+    # fourth one to fetch traits for the second page of identities
+    # and the last one to make sure that there are no more identities
     with django_assert_num_queries(5):
         for identity in iterator:
             assert identity.environment.name
             assert identity.identity_traits.all().first().trait_key
+
+
+def test_iterator_with_prefetch_using_server_side_cursor(
+    identities_with_traits, environment, django_assert_num_queries
+):
+    # Given
+    queryset = (
+        Identity.objects.filter(environment=environment)
+        .select_related("environment")
+        .prefetch_related("identity_traits")
+    )
+
+    # When
+    iterator = iterator_with_prefetch(queryset, chunk_size=15, server_side_cursor=True)
+
+    # Then, test, that we make 3 queries
+    # first one to fetch all the identities using the cursor
+    # and one to fetch the traits for each chunk of identities
+    with django_assert_num_queries(3):
+        identities = [
+            (identity, identity.identity_traits.all().first().trait_key)
+            for identity in iterator
+        ]
+
+    assert identities == [
+        (identity, f"test_key{i}") for i, identity in enumerate(identities_with_traits)
+    ]
@@ -0,0 +1,47 @@
+import threading
+
+from util.flusher import BackgroundFlusher
+
+
+def test_background_flusher_calls_flush_periodically():
+    # Given
+    flushes = []
+    flushed_twice = threading.Event()
+
+    def flush():
+        flushes.append(1)
+        if len(flushes) == 2:
+            flushed_twice.set()
+
+    flusher = BackgroundFlusher(flush, interval_seconds=0.01, name="test")
+
+    # When
+    flusher.ensure_started()
+    thread = flusher._thread
+    flusher.ensure_started()
+
+    # Then
+    assert flusher._thread is thread
+    assert flushed_twice.wait(timeout=5)
+    flusher.stop()
+
+
+def test_background_flusher_keeps_flushing_after_error():
+    # Given
+    flushed_after_error = threading.Event()
+    calls = []
+
+    def flush():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Exception("flush failed")
+        flushed_after_error.set()
+
+    flusher = BackgroundFlusher(flush, interval_seconds=0.01, name="test")
+
+    # When
+    flusher.ensure_started()
+
+    # Then
+    assert flushed_after_error.wait(timeout=5)
+    flusher.stop()
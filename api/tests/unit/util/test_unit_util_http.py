@@ -0,0 +1,117 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import responses
+from requests.adapters import HTTPAdapter
+
+from util.http import OutboundHTTPDispatcher
+
+
+@pytest.fixture()
+def dispatcher() -> OutboundHTTPDispatcher:
+    return OutboundHTTPDispatcher(
+        max_workers=2,
+        max_connections_per_host=5,
+        timeout=3,
+        max_retries=2,
+        retry_backoff_factor=0,
+    )
+
+
+def test_request_uses_a_session_per_host(dispatcher, mocker):
+    # Given
+    mocked_session = mocker.patch("util.http.requests.Session")
+
+    # When
+    dispatcher.post("https://host-1.com/a", json={"foo": "bar"})
+    dispatcher.post("https://host-1.com/b", json={"foo": "bar"})
+    dispatcher.get("https://host-2.com/a")
+
+    # Then
+    assert mocked_session.call_count == 2
+    mocked_session.return_value.request.assert_any_call(
+        "POST", "https://host-1.com/a", json={"foo": "bar"}, timeout=3
+    )
+    mocked_session.return_value.request.assert_called_with(
+        "GET", "https://host-2.com/a", timeout=3
+    )
+
+
+def test_request_does_not_override_given_timeout(dispatcher, mocker):
+    # Given
+    mocked_session = mocker.patch("util.http.requests.Session")
+
+    # When
+    dispatcher.post("https://host.com", timeout=1)
+
+    # Then
+    mocked_session.return_value.request.assert_called_once_with(
+        "POST", "https://host.com", timeout=1
+    )
+
+
+def test_session_connection_pool_is_bounded_and_retries(dispatcher):
+    # When
+    session = dispatcher._get_session("https://host.com/some/path")
+
+    # Then
+    adapter = session.get_adapter("https://host.com")
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_maxsize == 5
+    assert adapter._pool_block is True
+    assert adapter.max_retries.total == 2
+    assert adapter.max_retries.read == 0
+    assert "POST" in adapter.max_retries.allowed_methods
+
+
+@pytest.fixture()
+def unavailable_once_server():
+    """
+    A local http server which responds to the first request with a 503, and to
+    any further requests with a 200.
+    """
+    received_requests = []
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received_requests.append(body)
+            self.send_response(503 if len(received_requests) == 1 else 200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), RequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://localhost:{server.server_port}/", received_requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_post_is_retried_if_host_is_unavailable(dispatcher, unavailable_once_server):
+    # Given
+    url, received_requests = unavailable_once_server
+
+    # When
+    response = dispatcher.post(url, json={"foo": "bar"})
+
+    # Then
+    assert response.status_code == 200
+    assert received_requests == [b'{"foo": "bar"}', b'{"foo": "bar"}']
+
+
+@responses.activate
+def test_submit_makes_the_request_in_the_background(dispatcher):
+    # Given
+    url = "https://host.com/"
+    responses.add(responses.POST, url, status=200)
+
+    # When
+    future = dispatcher.submit("POST", url, json={"foo": "bar"})
+
+    # Then
+    assert future.result().status_code == 200
+    assert responses.calls[0].request.body == b'{"foo": "bar"}'
@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+
+from util.util import BoundedExecutor, OverflowPolicy, postpone
+
+
+@pytest.fixture()
+def blocked_executor():
+    """
+    An executor with a single thread and room for one queued call, and an event
+    that can be set to unblock the thread.
+    """
+    executor = BoundedExecutor(
+        max_workers=1,
+        max_queue_size=1,
+        overflow_policy=OverflowPolicy.DROP,
+        name="test",
+    )
+    unblock = threading.Event()
+    executor.submit(unblock.wait)
+    yield executor, unblock
+    unblock.set()
+    executor.shutdown(wait=True)
+
+
+def test_bounded_executor_runs_function(blocked_executor):
+    # Given
+    executor, unblock = blocked_executor
+    results = []
+
+    # When
+    future = executor.submit(results.append, "foo")
+    unblock.set()
+    future.result(timeout=5)
+
+    # Then
+    assert results == ["foo"]
+    assert executor.metrics == {
+        "submitted": 2,
+        "completed": 2,
+        "failed": 0,
+        "rejected": 0,
+        "caller_completed": 0,
+        "caller_failed": 0,
+        "pending": 0,
+    }
+
+
+def test_bounded_executor_drops_calls_when_full(blocked_executor, caplog):
+    # Given
+    executor, unblock = blocked_executor
+    results = []
+    executor.submit(results.append, "queued")
+
+    # When
+    future = executor.submit(results.append, "dropped")
+
+    # Then
+    assert future is None
+    assert executor.metrics["rejected"] == 1
+    assert executor.metrics["pending"] == 2
+
+    unblock.set()
+    executor.shutdown(wait=True)
+    assert results == ["queued"]
+
+
+def test_bounded_executor_runs_calls_in_caller_thread_when_full(blocked_executor):
+    # Given
+    executor, unblock = blocked_executor
+    executor.overflow_policy = OverflowPolicy.CALLER_RUNS
+    executor.submit(lambda: None)
+    thread_names = []
+
+    # When
+    executor.submit(lambda: thread_names.append(threading.current_thread().name))
+
+    # Then
+    assert thread_names == [threading.current_thread().name]
+    assert executor.metrics["rejected"] == 1
+
+
+def test_bounded_executor_counts_calls_run_in_caller_thread_separately(
+    blocked_executor,
+):
+    # Given
+    executor, unblock = blocked_executor
+    executor.overflow_policy = OverflowPolicy.CALLER_RUNS
+
+    def fail():
+        raise ValueError()
+
+    # When
+    for function in (lambda: None, lambda: None, fail):
+        executor.submit(function)
+
+    # Then
+    # the first call is queued, and the others are run in the calling thread
+    assert executor.metrics == {
+        "submitted": 2,
+        "completed": 0,
+        "failed": 0,
+        "rejected": 2,
+        "caller_completed": 1,
+        "caller_failed": 1,
+        "pending": 2,
+    }
+
+    # When
+    unblock.set()
+    executor.shutdown(wait=True)
+
+    # Then
+    assert executor.metrics["completed"] == 2
+    assert executor.metrics["pending"] == 0
+
+
+def test_bounded_executor_records_failures():
+    # Given
+    executor = BoundedExecutor(
+        max_workers=1,
+        max_queue_size=1,
+        overflow_policy=OverflowPolicy.DROP,
+        name="test",
+    )
+
+    def fail():
+        raise ValueError()
+
+    # When
+    executor.submit(fail)
+    executor.shutdown(wait=True)
+
+    # Then
+    assert executor.metrics["failed"] == 1
+    assert executor.metrics["pending"] == 0
+
+
+def test_postpone_submits_function_to_executor(mocker):
+    # Given
+    mocked_executor = mocker.patch("util.util.postpone_executor")
+
+    def function(*args, **kwargs):
+        pass
+
+    # When
+    postpone(function)("foo", bar="baz")
+
+    # Then
+    mocked_executor.submit.assert_called_once_with(function, "foo", bar="baz")
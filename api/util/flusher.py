@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+import typing
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundFlusher:
+    """
+    Calls `flush` every `interval_seconds` from a single daemon thread, so that
+    buffered data is written even when the buffer stops receiving data (e.g.
+    because the worker is idle).
+
+    The thread is started on first use, rather than on import, so that each
+    (forked) worker process gets its own thread.
+    """
+
+    def __init__(
+        self, flush: typing.Callable[[], None], interval_seconds: float, name: str
+    ):
+        self.flush = flush
+        self.interval_seconds = interval_seconds
+        self.name = name
+
+        self._thread: typing.Optional[threading.Thread] = None
+        self._pid: typing.Optional[int] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Error flushing %s.", self.name)
+            finally:
+                # the flush may have used the database connection of this thread
+                close_old_connections()
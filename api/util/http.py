@@ -0,0 +1,112 @@
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+T = typing.TypeVar("T")
+
+
+class OutboundHTTPDispatcher:
+    """
+    Shared dispatcher for the outbound HTTP requests made by the application
+    (e.g. webhooks, integrations, sse and edge request forwarding).
+
+    Requests to each host share a session so that connections are pooled and
+    kept alive, with at most `max_connections_per_host` concurrent connections
+    to each host. Requests that fail to connect, or that receive a response
+    indicating that the host is (temporarily) unavailable, are retried with
+    exponential backoff.
+
+    Requests can either be made synchronously, using `request` (or `get` / `post`),
+    or submitted to be made in the background, using `submit` (or `submit_call`,
+    e.g. to make a sequence of requests one after another).
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_connections_per_host: int,
+        timeout: float,
+        max_retries: int,
+        retry_backoff_factor: float,
+    ):
+        self.max_workers = max_workers
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff_factor = retry_backoff_factor
+
+        self._sessions: typing.Dict[str, requests.Session] = {}
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self._get_session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def submit(self, method: str, url: str, **kwargs) -> "Future[requests.Response]":
+        return self._get_executor().submit(self.request, method, url, **kwargs)
+
+    def submit_call(self, fn: typing.Callable[..., T], *args, **kwargs) -> "Future[T]":
+        return self._get_executor().submit(fn, *args, **kwargs)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="outbound-http"
+                )
+            return self._executor
+
+    def _get_session(self, url: str) -> requests.Session:
+        split_url = urlsplit(url)
+        host = f"{split_url.scheme}://{split_url.netloc}"
+        with self._lock:
+            if host not in self._sessions:
+                self._sessions[host] = self._create_session()
+            return self._sessions[host]
+
+    def _create_session(self) -> requests.Session:
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_connections_per_host,
+            pool_block=True,
+            max_retries=Retry(
+                total=self.max_retries,
+                # read errors are not retried since the request may have been
+                # processed by the host
+                read=0,
+                status_forcelist=self.RETRY_STATUSES,
+                # most of the outbound requests are POSTs (e.g. webhooks), which
+                # aren't retried by default
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+                backoff_factor=self.retry_backoff_factor,
+                raise_on_status=False,
+            ),
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+http_dispatcher = OutboundHTTPDispatcher(
+    max_workers=settings.OUTBOUND_HTTP_MAX_WORKERS,
+    max_connections_per_host=settings.OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST,
+    timeout=settings.OUTBOUND_HTTP_TIMEOUT_SECONDS,
+    max_retries=settings.OUTBOUND_HTTP_MAX_RETRIES,
+    retry_backoff_factor=settings.OUTBOUND_HTTP_RETRY_BACKOFF_FACTOR,
+)
@@ -1,16 +1,62 @@
-from django.core.paginator import Paginator
+import typing
 
+from django.db.models import Model, QuerySet, prefetch_related_objects
 
-def iterator_with_prefetch(queryset, chunk_size=2000):
+
+def iterator_with_prefetch(
+    queryset: QuerySet, chunk_size: int = 2000, server_side_cursor: bool = False
+) -> typing.Iterator[Model]:
     """
-    Since queryset.iterator() does not support prefetch_related.
-    Using Paginator() we can mimic the (somewhat)same behavior
+    Since queryset.iterator() does not support prefetch_related, iterate over
+    the queryset in chunks(ordered by pk) and prefetch the related objects for
+    each chunk.
+
+    By default, chunks are fetched using keyset pagination, i.e.
+    `WHERE pk > last_pk ORDER BY pk LIMIT chunk_size`, which (unlike OFFSET
+    pagination) does not get slower as we move through the table.
+
+    If `server_side_cursor` is True, the rows are instead streamed from a single
+    query using queryset.iterator() (which uses a server side cursor on postgres)
     https://docs.djangoproject.com/en/3.2/ref/models/querysets/#iterator
     """
-    if not queryset.query.order_by:
-        # Paginator() throws a warning if there is no sorting attached to the queryset
-        queryset = queryset.order_by("pk")
+    queryset = queryset.order_by("pk")
+    chunks = (
+        _iterate_chunks_with_server_side_cursor(queryset, chunk_size)
+        if server_side_cursor
+        else _iterate_chunks_with_keyset_pagination(queryset, chunk_size)
+    )
+    for chunk in chunks:
+        yield from chunk
+
+
+def _iterate_chunks_with_keyset_pagination(
+    queryset: QuerySet, chunk_size: int
+) -> typing.Iterator[typing.List[Model]]:
+    chunk_queryset = queryset
+    while True:
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            return
+        chunk_queryset = queryset.filter(pk__gt=chunk[-1].pk)
+
+
+def _iterate_chunks_with_server_side_cursor(
+    queryset: QuerySet, chunk_size: int
+) -> typing.Iterator[typing.List[Model]]:
+    prefetch_lookups = queryset._prefetch_related_lookups
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            prefetch_related_objects(chunk, *prefetch_lookups)
+            yield chunk
+            chunk = []
 
-    paginator = Paginator(queryset, chunk_size)
-    for index in range(paginator.num_pages):
-        yield from paginator.get_page(index + 1)
+    if chunk:
+        prefetch_related_objects(chunk, *prefetch_lookups)
+        yield chunk
@@ -1,10 +1,151 @@
-from threading import Thread
+import atexit
+import enum
+import logging
+import threading
+import typing
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(enum.Enum):
+    # drop the function call (and log a warning)
+    DROP = "DROP"
+    # run the function in the calling thread
+    CALLER_RUNS = "CALLER_RUNS"
+
+
+class BoundedExecutor:
+    """
+    Runs functions in a fixed size pool of threads. At most `max_queue_size`
+    function calls can be waiting for a thread, any further calls are handled
+    according to the `overflow_policy`.
+
+    Calls which are rejected but then run in the calling thread are counted as
+    `caller_completed` or `caller_failed`, rather than `completed` or `failed`,
+    since they were never submitted to (and so are never pending in) the pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue_size: int,
+        overflow_policy: OverflowPolicy,
+        name: str,
+    ):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.name = name
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_size)
+        self._metrics = Counter()
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def metrics(self) -> typing.Dict[str, int]:
+        with self._metrics_lock:
+            metrics = {
+                key: self._metrics[key]
+                for key in (
+                    "submitted",
+                    "completed",
+                    "failed",
+                    "rejected",
+                    "caller_completed",
+                    "caller_failed",
+                )
+            }
+        metrics["pending"] = (
+            metrics["submitted"] - metrics["completed"] - metrics["failed"]
+        )
+        return metrics
+
+    def submit(
+        self, function: typing.Callable, *args, **kwargs
+    ) -> typing.Optional[Future]:
+        if not self._slots.acquire(blocking=False):
+            self._increment("rejected")
+            if self.overflow_policy == OverflowPolicy.CALLER_RUNS:
+                self._run(function, args, kwargs, caller_runs=True)
+                return None
+
+            logger.warning(
+                "Executor %s is full, dropping call to %s.",
+                self.name,
+                getattr(function, "__qualname__", function),
+            )
+            return None
+
+        self._increment("submitted")
+        try:
+            return self._executor.submit(self._run, function, args, kwargs)
+        except RuntimeError:
+            # the executor has been shut down
+            self._increment("submitted", -1)
+            self._slots.release()
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(
+        self,
+        function: typing.Callable,
+        args: tuple,
+        kwargs: dict,
+        caller_runs: bool = False,
+    ) -> typing.Any:
+        metric_prefix = "caller_" if caller_runs else ""
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            self._increment(f"{metric_prefix}failed")
+            logger.exception(
+                "Error running %s in executor %s.",
+                getattr(function, "__qualname__", function),
+                self.name,
+            )
+        else:
+            self._increment(f"{metric_prefix}completed")
+            return result
+        finally:
+            if not caller_runs:
+                self._slots.release()
+
+    def _increment(self, metric: str, value: int = 1) -> None:
+        with self._metrics_lock:
+            self._metrics[metric] += value
+
+
+postpone_executor = BoundedExecutor(
+    max_workers=settings.POSTPONE_EXECUTOR_MAX_WORKERS,
+    max_queue_size=settings.POSTPONE_EXECUTOR_MAX_QUEUE_SIZE,
+    overflow_policy=OverflowPolicy(settings.POSTPONE_EXECUTOR_OVERFLOW_POLICY),
+    name="postpone",
+)
+
+
+@atexit.register
+def _drain_postpone_executor_on_exit():
+    postpone_executor.shutdown(wait=True)
 
 
 def postpone(function):
+    """
+    Run the decorated function in the background, using the (bounded) pool of
+    threads shared by all postponed functions.
+    """
+
+    @wraps(function)
     def decorator(*args, **kwargs):
-        t = Thread(target=function, args=args, kwargs=kwargs)
-        t.daemon = True
-        t.start()
+        postpone_executor.submit(function, *args, **kwargs)
 
     return decorator
@@ -1,23 +1,34 @@
 import hashlib
 import hmac
 import json
+import threading
+from datetime import timedelta
 from unittest import TestCase, mock
 
 import pytest
+import requests
 from core.constants import FLAGSMITH_SIGNATURE_HEADER
+from django.utils import timezone
 
 from environments.models import Environment, Webhook
 from organisations.models import Organisation, OrganisationWebhook
 from projects.models import Project
+from task_processor.models import Task
+from task_processor.task_run_method import TaskRunMethod
 from webhooks.sample_webhook_data import (
     environment_webhook_data,
     organisation_webhook_data,
 )
 from webhooks.webhooks import (
+    WebhookDeliveryBuffer,
     WebhookEventType,
     WebhookType,
+    _get_endpoint_slots,
     call_environment_webhooks,
+    call_webhook,
+    get_webhook_delivery_metrics,
     trigger_sample_webhook,
+    webhook_delivery_dispatcher,
 )
 
 
@@ -30,8 +41,8 @@ class WebhooksTestCase(TestCase):
             name="Test environment", project=project
         )
 
-    @mock.patch("webhooks.webhooks.requests")
-    def test_requests_made_to_all_urls_for_environment(self, mock_requests):
+    @mock.patch("webhooks.webhooks.http_dispatcher")
+    def test_requests_made_to_all_urls_for_environment(self, mock_http_dispatcher):
         # Given
         webhook_1 = Webhook.objects.create(
             url="http://url.1.com", enabled=True, environment=self.environment
@@ -48,18 +59,18 @@ class WebhooksTestCase(TestCase):
         )
 
         # Then
-        assert len(mock_requests.post.call_args_list) == 2
+        assert len(mock_http_dispatcher.post.call_args_list) == 2
 
         # and
-        call_1_args, _ = mock_requests.post.call_args_list[0]
-        call_2_args, _ = mock_requests.post.call_args_list[1]
+        call_1_args, _ = mock_http_dispatcher.post.call_args_list[0]
+        call_2_args, _ = mock_http_dispatcher.post.call_args_list[1]
         all_call_args = call_1_args + call_2_args
         assert all(
             str(webhook.url) in all_call_args for webhook in (webhook_1, webhook_2)
         )
 
-    @mock.patch("webhooks.webhooks.requests")
-    def test_request_not_made_to_disabled_webhook(self, mock_requests):
+    @mock.patch("webhooks.webhooks.http_dispatcher")
+    def test_request_not_made_to_disabled_webhook(self, mock_http_dispatcher):
         # Given
         Webhook.objects.create(
             url="http://url.1.com", enabled=False, environment=self.environment
@@ -73,39 +84,34 @@ class WebhooksTestCase(TestCase):
         )
 
         # Then
-        mock_requests.post.assert_not_called()
+        mock_http_dispatcher.post.assert_not_called()
 
-    @mock.patch("webhooks.webhooks.requests")
+    @mock.patch("webhooks.webhooks.http_dispatcher")
     def test_trigger_sample_webhook_makes_correct_post_request_for_environment(
-        self, mock_request
+        self, mock_http_dispatcher
     ):
         url = "http://test.test"
         webhook = Webhook(url=url)
         trigger_sample_webhook(webhook, WebhookType.ENVIRONMENT)
-        args, kwargs = mock_request.post.call_args
+        args, kwargs = mock_http_dispatcher.post.call_args
         assert json.loads(kwargs["data"]) == environment_webhook_data
         assert args[0] == url
 
-    @mock.patch("webhooks.webhooks.requests")
+    @mock.patch("webhooks.webhooks.http_dispatcher")
     def test_trigger_sample_webhook_makes_correct_post_request_for_organisation(
-        self, mock_request
+        self, mock_http_dispatcher
     ):
         url = "http://test.test"
         webhook = OrganisationWebhook(url=url)
 
         trigger_sample_webhook(webhook, WebhookType.ORGANISATION)
-        args, kwargs = mock_request.post.call_args
+        args, kwargs = mock_http_dispatcher.post.call_args
         assert json.loads(kwargs["data"]) == organisation_webhook_data
         assert args[0] == url
 
-    @mock.patch("webhooks.webhooks.WebhookSerializer")
-    @mock.patch("webhooks.webhooks.requests")
-    def test_request_made_with_correct_signature(
-        self, mock_requests, webhook_serializer
-    ):
+    @mock.patch("webhooks.webhooks.http_dispatcher")
+    def test_request_made_with_correct_signature(self, mock_http_dispatcher):
         # Given
-        payload = {"key": "value"}
-        webhook_serializer.return_value.data = payload
         secret = "random_key"
         Webhook.objects.create(
             url="http://url.1.com",
@@ -114,26 +120,28 @@ class WebhooksTestCase(TestCase):
             secret=secret,
         )
 
+        expected_payload = {"data": {"key": "value"}, "event_type": "FLAG_UPDATED"}
         expected_signature = hmac.new(
             key=secret.encode(),
-            msg=json.dumps(payload).encode(),
+            msg=json.dumps(expected_payload, sort_keys=True).encode(),
             digestmod=hashlib.sha256,
         ).hexdigest()
 
         call_environment_webhooks(
             environment=self.environment,
-            data={},
+            data={"key": "value"},
             event_type=WebhookEventType.FLAG_UPDATED,
         )
         # When
-        _, kwargs = mock_requests.post.call_args_list[0]
+        _, kwargs = mock_http_dispatcher.post.call_args_list[0]
         # Then
+        assert json.loads(kwargs["data"]) == expected_payload
         received_signature = kwargs["headers"][FLAGSMITH_SIGNATURE_HEADER]
         assert hmac.compare_digest(expected_signature, received_signature) is True
 
-    @mock.patch("webhooks.webhooks.requests")
+    @mock.patch("webhooks.webhooks.http_dispatcher")
     def test_request_does_not_have_signature_header_if_secret_is_not_set(
-        self, mock_requests
+        self, mock_http_dispatcher
     ):
         # Given
         Webhook.objects.create(
@@ -147,5 +155,256 @@ class WebhooksTestCase(TestCase):
         )
 
         # Then
-        _, kwargs = mock_requests.post.call_args_list[0]
+        _, kwargs = mock_http_dispatcher.post.call_args_list[0]
         assert FLAGSMITH_SIGNATURE_HEADER not in kwargs["headers"]
+
+
+@pytest.fixture()
+def environment_webhook(environment):
+    return Webhook.objects.create(
+        url="http://url.1.com", enabled=True, environment=environment
+    )
+
+
+@pytest.fixture()
+def task_processor_mode(settings):
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+
+
+@pytest.mark.parametrize("status_code", (None, 429, 503))
+def test_call_webhook_schedules_retry_with_backoff(
+    environment_webhook, task_processor_mode, settings, mocker, status_code
+):
+    # Given
+    settings.WEBHOOK_RETRY_BACKOFF_SECONDS = 10
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.webhook_delivery_dispatcher")
+    if status_code:
+        mock_http_dispatcher.post.return_value.status_code = status_code
+    else:
+        mock_http_dispatcher.post.side_effect = requests.exceptions.ConnectionError
+    mock_send_failure_email = mocker.patch("webhooks.webhooks.send_failure_email")
+    payload = json.dumps({"data": {}, "event_type": "FLAG_UPDATED"})
+
+    now = timezone.now()
+    mocker.patch("webhooks.webhooks.timezone.now", return_value=now)
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, payload, 2)
+
+    # Then
+    task = Task.objects.get(task_identifier=call_webhook.task_identifier)
+    assert task.scheduled_for == now + timedelta(seconds=20)
+    assert task.args == [
+        WebhookType.ENVIRONMENT.value,
+        environment_webhook.id,
+        payload,
+        3,
+    ]
+    mock_send_failure_email.assert_not_called()
+
+
+def test_call_webhook_is_not_retried_by_dispatcher_when_using_task_processor(
+    environment_webhook, task_processor_mode, mocker
+):
+    # Given
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.http_dispatcher")
+    mock_post = mocker.patch.object(webhook_delivery_dispatcher, "post")
+    mock_post.return_value.status_code = 200
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, "{}")
+
+    # Then
+    mock_post.assert_called_once_with(
+        environment_webhook.url, data="{}", headers=mocker.ANY
+    )
+    mock_http_dispatcher.post.assert_not_called()
+    assert webhook_delivery_dispatcher.max_retries == 0
+
+
+def test_call_webhook_sends_failure_email_after_max_attempts(
+    environment_webhook, task_processor_mode, settings, mocker
+):
+    # Given
+    settings.WEBHOOK_MAX_ATTEMPTS = 3
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.webhook_delivery_dispatcher")
+    mock_http_dispatcher.post.return_value.status_code = 503
+    mock_send_failure_email = mocker.patch("webhooks.webhooks.send_failure_email")
+    payload = json.dumps({"data": {}, "event_type": "FLAG_UPDATED"})
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, payload, 3)
+
+    # Then
+    assert not Task.objects.filter(
+        task_identifier=call_webhook.task_identifier
+    ).exists()
+    mock_send_failure_email.assert_called_once_with(
+        environment_webhook, json.loads(payload), WebhookType.ENVIRONMENT, 503
+    )
+
+
+def test_call_webhook_does_not_retry_client_errors(
+    environment_webhook, task_processor_mode, mocker
+):
+    # Given
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.webhook_delivery_dispatcher")
+    mock_http_dispatcher.post.return_value.status_code = 400
+    mock_send_failure_email = mocker.patch("webhooks.webhooks.send_failure_email")
+    payload = json.dumps({"data": {}, "event_type": "FLAG_UPDATED"})
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, payload)
+
+    # Then
+    assert not Task.objects.filter(
+        task_identifier=call_webhook.task_identifier
+    ).exists()
+    mock_send_failure_email.assert_called_once_with(
+        environment_webhook, json.loads(payload), WebhookType.ENVIRONMENT, 400
+    )
+
+
+def test_call_webhook_sends_failure_email_without_task_processor(
+    environment_webhook, mocker
+):
+    # Given
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.http_dispatcher")
+    mock_http_dispatcher.post.side_effect = requests.exceptions.ConnectionError
+    mock_send_failure_email = mocker.patch("webhooks.webhooks.send_failure_email")
+    payload = json.dumps({"data": {}, "event_type": "FLAG_UPDATED"})
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, payload)
+
+    # Then
+    mock_send_failure_email.assert_called_once_with(
+        environment_webhook, json.loads(payload), WebhookType.ENVIRONMENT, None
+    )
+
+
+def test_call_webhook_delays_delivery_when_endpoint_is_busy(
+    environment_webhook, task_processor_mode, settings, mocker
+):
+    # Given
+    settings.WEBHOOK_MAX_CONCURRENT_DELIVERIES_PER_ENDPOINT = 1
+    mocker.patch.dict("webhooks.webhooks._endpoint_slots", clear=True)
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.webhook_delivery_dispatcher")
+    payload = json.dumps({"data": {}, "event_type": "FLAG_UPDATED"})
+
+    endpoint_slots = _get_endpoint_slots(environment_webhook.url)
+    endpoint_slots.acquire()
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, payload)
+
+    # Then
+    mock_http_dispatcher.post.assert_not_called()
+    task = Task.objects.get(task_identifier=call_webhook.task_identifier)
+    assert task.args == [
+        WebhookType.ENVIRONMENT.value,
+        environment_webhook.id,
+        payload,
+        1,
+    ]
+
+    endpoint_slots.release()
+
+
+@pytest.mark.parametrize("status_code", (200, 202, 204))
+def test_call_webhook_records_delivery_metrics(
+    environment_webhook, task_processor_mode, mocker, status_code
+):
+    # Given
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.webhook_delivery_dispatcher")
+    mock_http_dispatcher.post.return_value.status_code = status_code
+    mock_send_failure_email = mocker.patch("webhooks.webhooks.send_failure_email")
+    delivered = get_webhook_delivery_metrics()["delivered"]
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, "{}")
+
+    # Then
+    assert get_webhook_delivery_metrics()["delivered"] == delivered + 1
+    assert not Task.objects.filter(
+        task_identifier=call_webhook.task_identifier
+    ).exists()
+    mock_send_failure_email.assert_not_called()
+
+
+def test_call_webhook_does_nothing_for_disabled_webhook(environment_webhook, mocker):
+    # Given
+    environment_webhook.enabled = False
+    environment_webhook.save()
+    mock_http_dispatcher = mocker.patch("webhooks.webhooks.http_dispatcher")
+
+    # When
+    call_webhook(WebhookType.ENVIRONMENT.value, environment_webhook.id, "{}")
+
+    # Then
+    mock_http_dispatcher.post.assert_not_called()
+
+
+def test_webhook_delivery_buffer_delivers_events_in_a_single_request(
+    environment_webhook, mocker
+):
+    # Given
+    mock_call_webhook = mocker.patch("webhooks.webhooks.call_webhook")
+    buffer = WebhookDeliveryBuffer(window_seconds=60, max_size=2)
+    events = [
+        json.dumps({"data": {"id": 1}, "event_type": "FLAG_UPDATED"}),
+        json.dumps({"data": {"id": 2}, "event_type": "FLAG_UPDATED"}),
+    ]
+
+    # When
+    for event in events:
+        buffer.add(WebhookType.ENVIRONMENT, environment_webhook.id, event)
+
+    # Then
+    mock_call_webhook.delay.assert_called_once_with(
+        args=(WebhookType.ENVIRONMENT.value, environment_webhook.id, mocker.ANY)
+    )
+    payload = mock_call_webhook.delay.call_args.kwargs["args"][2]
+    assert json.loads(payload) == [json.loads(event) for event in events]
+
+
+def test_webhook_delivery_buffer_flushes_buffered_events_in_the_background(
+    environment_webhook, mocker
+):
+    # Given
+    flushed = threading.Event()
+    mock_call_webhook = mocker.patch("webhooks.webhooks.call_webhook")
+    mock_call_webhook.delay.side_effect = lambda **kwargs: flushed.set()
+    buffer = WebhookDeliveryBuffer(window_seconds=0.01, max_size=100)
+    event = json.dumps({"data": {"id": 1}, "event_type": "FLAG_UPDATED"})
+
+    # When
+    buffer.add(WebhookType.ENVIRONMENT, environment_webhook.id, event)
+
+    # Then
+    assert flushed.wait(timeout=5)
+    buffer._flusher.stop()
+    mock_call_webhook.delay.assert_called_once_with(
+        args=(WebhookType.ENVIRONMENT.value, environment_webhook.id, f"[{event}]")
+    )
+
+
+def test_webhook_delivery_buffer_add_many_creates_tasks_in_a_single_call(
+    environment_webhook, mocker
+):
+    # Given
+    mock_call_webhook = mocker.patch("webhooks.webhooks.call_webhook")
+    buffer = WebhookDeliveryBuffer(window_seconds=0, max_size=100)
+    event = json.dumps({"data": {"id": 1}, "event_type": "FLAG_UPDATED"})
+
+    # When
+    buffer.add_many(WebhookType.ENVIRONMENT, [environment_webhook.id, 999], event)
+
+    # Then
+    mock_call_webhook.delay_many.assert_called_once_with(
+        args_list=[
+            (WebhookType.ENVIRONMENT.value, environment_webhook.id, event),
+            (WebhookType.ENVIRONMENT.value, 999, event),
+        ]
+    )
+    mock_call_webhook.delay.assert_not_called()
@@ -1,6 +1,11 @@
+import atexit
 import enum
 import json
+import logging
+import threading
 import typing
+from collections import Counter, defaultdict
+from datetime import timedelta
 
 import requests
 from core.constants import FLAGSMITH_SIGNATURE_HEADER
@@ -9,9 +14,15 @@ from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.core.serializers.json import DjangoJSONEncoder
 from django.template.loader import get_template
+from django.utils import timezone
 
 from environments.models import Webhook
 from organisations.models import OrganisationWebhook
+from task_processor.decorators import register_task_handler
+from task_processor.models import TaskPriority
+from task_processor.task_run_method import TaskRunMethod
+from util.flusher import BackgroundFlusher
+from util.http import OutboundHTTPDispatcher, http_dispatcher
 from webhooks.sample_webhook_data import (
     environment_webhook_data,
     organisation_webhook_data,
@@ -23,6 +34,8 @@ from .serializers import WebhookSerializer
 if typing.TYPE_CHECKING:
     import environments  # noqa
 
+logger = logging.getLogger(__name__)
+
 WebhookModels = typing.Union[OrganisationWebhook, "environments.models.Webhook"]
 
 
@@ -42,6 +55,123 @@ WEBHOOK_SAMPLE_DATA = {
     WebhookType.ENVIRONMENT: environment_webhook_data,
 }
 
+# any 2xx response means that the webhook was delivered
+SUCCESS_STATUS_CODES = range(200, 300)
+# responses with these status codes (or no response at all) are retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class WebhookDeliveryBuffer:
+    """
+    Buffers the (serialized) events to deliver to each webhook for (up to)
+    `window_seconds` so that they can be delivered in a single request, with a
+    payload containing the list of events. If `window_seconds` is 0, each event
+    is delivered in its own request (with the event as the payload).
+
+    Buffered events are flushed once there are `max_size` events for a webhook, or
+    else by a single background thread which flushes all of the buffered events
+    every `window_seconds`.
+    """
+
+    def __init__(self, window_seconds: float, max_size: int):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+
+        self._events: typing.Dict[
+            typing.Tuple[str, int], typing.List[str]
+        ] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._flusher = BackgroundFlusher(
+            self.flush_all, window_seconds, name="webhook-delivery-buffer"
+        )
+
+    def add(self, webhook_type: WebhookType, webhook_id: int, event: str) -> None:
+        if not self.window_seconds:
+            call_webhook.delay(args=(webhook_type.value, webhook_id, event))
+            return
+
+        key = (webhook_type.value, webhook_id)
+        with self._lock:
+            self._events[key].append(event)
+            should_flush = len(self._events[key]) >= self.max_size
+
+        if should_flush:
+            self.flush(key)
+        else:
+            self._flusher.ensure_started()
+
+    def add_many(
+        self, webhook_type: WebhookType, webhook_ids: typing.List[int], event: str
+    ) -> None:
+        if not self.window_seconds:
+            # the tasks for all of the webhooks are created in a single query
+            call_webhook.delay_many(
+                args_list=[
+                    (webhook_type.value, webhook_id, event)
+                    for webhook_id in webhook_ids
+                ]
+            )
+            return
+
+        for webhook_id in webhook_ids:
+            self.add(webhook_type, webhook_id, event)
+
+    def flush(self, key: typing.Tuple[str, int]) -> None:
+        with self._lock:
+            events = self._events.pop(key, [])
+
+        if not events:
+            return
+
+        call_webhook.delay(args=(*key, "[%s]" % ", ".join(events)))
+
+    def flush_all(self) -> None:
+        with self._lock:
+            keys = list(self._events)
+
+        for key in keys:
+            self.flush(key)
+
+
+webhook_delivery_buffer = WebhookDeliveryBuffer(
+    window_seconds=settings.WEBHOOK_BATCH_WINDOW_SECONDS,
+    max_size=settings.WEBHOOK_MAX_BATCH_SIZE,
+)
+
+# deliveries made by the task processor are retried by the call_webhook task itself
+# (with a much longer backoff), so they are made without the dispatcher's retries,
+# which would multiply the number of attempts for each event and hold the endpoint's
+# delivery slot while backing off
+webhook_delivery_dispatcher = OutboundHTTPDispatcher(
+    max_workers=settings.OUTBOUND_HTTP_MAX_WORKERS,
+    max_connections_per_host=settings.OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST,
+    timeout=settings.OUTBOUND_HTTP_TIMEOUT_SECONDS,
+    max_retries=0,
+    retry_backoff_factor=0,
+)
+
+_delivery_metrics = Counter()
+_delivery_metrics_lock = threading.Lock()
+
+_endpoint_slots: typing.Dict[str, threading.BoundedSemaphore] = {}
+_endpoint_slots_lock = threading.Lock()
+
+
+@atexit.register
+def _flush_webhook_delivery_buffer_on_exit():
+    # tasks run in a separate thread would be killed during interpreter shutdown
+    # so we only flush if the task can be persisted for the task processor
+    if settings.TASK_RUN_METHOD == TaskRunMethod.TASK_PROCESSOR:
+        webhook_delivery_buffer.flush_all()
+
+
+def get_webhook_delivery_metrics() -> typing.Dict[str, int]:
+    with _delivery_metrics_lock:
+        return {
+            key: _delivery_metrics[key]
+            for key in ("delivered", "failed", "retried", "throttled")
+        }
+
 
 def get_webhook_model(webhook_type: WebhookType) -> typing.Union[WebhookModels]:
     if webhook_type == WebhookType.ORGANISATION:
@@ -91,35 +221,119 @@ def trigger_sample_webhook(
 def _call_webhook(
     webhook: typing.Type[AbstractBaseWebhookModel],
     data: typing.Mapping,
+) -> requests.models.Response:
+    return _send_webhook_request(webhook, _serialize_webhook_data(data))
+
+
+def _send_webhook_request(
+    webhook: typing.Type[AbstractBaseWebhookModel],
+    json_data: str,
+    dispatcher: typing.Optional[OutboundHTTPDispatcher] = None,
 ) -> requests.models.Response:
     headers = {"content-type": "application/json"}
-    json_data = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
     if webhook.secret:
         signature = sign_payload(json_data, key=webhook.secret)
         headers.update({FLAGSMITH_SIGNATURE_HEADER: signature})
 
-    return requests.post(str(webhook.url), data=json_data, headers=headers)
+    dispatcher = dispatcher or http_dispatcher
+    return dispatcher.post(str(webhook.url), data=json_data, headers=headers)
+
 
+def _serialize_webhook_data(data: typing.Mapping) -> str:
+    return json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
 
-def _call_webhook_email_on_error(
-    webhook: WebhookModels, data: typing.Mapping, webhook_type: WebhookType
-):
+
+def _call_webhooks(webhooks, data, event_type, webhook_type):
+    # the event is serialized once, and then only signed for each webhook
+    event = _serialize_webhook_data({"event_type": event_type.value, "data": data})
+    webhook_delivery_buffer.add_many(
+        webhook_type, list(webhooks.values_list("id", flat=True)), event
+    )
+
+
+@register_task_handler(priority=TaskPriority.LOW)
+def call_webhook(
+    webhook_type: str,
+    webhook_id: int,
+    payload: str,
+    attempt: int = 1,
+) -> None:
+    """
+    Deliver the (serialized) payload to the webhook. When using the task processor, failed
+    deliveries are retried (with exponential backoff) up to WEBHOOK_MAX_ATTEMPTS
+    times, before an email is sent to notify the organisation of the failure.
+    """
+    webhook_type = WebhookType(webhook_type)
+    webhook = (
+        get_webhook_model(webhook_type)
+        .objects.filter(id=webhook_id, enabled=True)
+        .first()
+    )
+    if not webhook:
+        return
+
+    use_task_processor = settings.TASK_RUN_METHOD == TaskRunMethod.TASK_PROCESSOR
+
+    endpoint_slots = _get_endpoint_slots(str(webhook.url))
+    if not endpoint_slots.acquire(blocking=not use_task_processor):
+        # rather than block a task processor thread while waiting for the other
+        # deliveries to the endpoint to finish, try again shortly
+        _increment_delivery_metric("throttled")
+        call_webhook.delay(
+            delay_until=timezone.now()
+            + timedelta(seconds=settings.WEBHOOK_THROTTLE_DELAY_SECONDS),
+            args=(webhook_type.value, webhook_id, payload, attempt),
+        )
+        return
+
+    dispatcher = webhook_delivery_dispatcher if use_task_processor else http_dispatcher
     try:
-        res = _call_webhook(webhook, data)
-    except requests.exceptions.ConnectionError:
-        send_failure_email(webhook, data, webhook_type)
+        status_code = _send_webhook_request(webhook, payload, dispatcher).status_code
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        status_code = None
+    finally:
+        endpoint_slots.release()
+
+    if status_code in SUCCESS_STATUS_CODES:
+        _increment_delivery_metric("delivered")
+        return
+
+    if (
+        use_task_processor
+        and attempt < settings.WEBHOOK_MAX_ATTEMPTS
+        and (status_code is None or status_code in RETRY_STATUS_CODES)
+    ):
+        _increment_delivery_metric("retried")
+        retry_delay = settings.WEBHOOK_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+        call_webhook.delay(
+            delay_until=timezone.now() + timedelta(seconds=retry_delay),
+            args=(webhook_type.value, webhook_id, payload, attempt + 1),
+        )
         return
 
-    if res.status_code != 200:
-        send_failure_email(webhook, data, webhook_type, res.status_code)
+    _increment_delivery_metric("failed")
+    logger.warning(
+        "Failed to deliver webhook %d to %s after %d attempt(s). Status code: %s",
+        webhook_id,
+        webhook.url,
+        attempt,
+        status_code,
+    )
+    send_failure_email(webhook, json.loads(payload), webhook_type, status_code)
 
 
-def _call_webhooks(webhooks, data, event_type, webhook_type):
-    webhook_data = {"event_type": event_type.value, "data": data}
-    serializer = WebhookSerializer(data=webhook_data)
-    serializer.is_valid(raise_exception=False)
-    for webhook in webhooks:
-        _call_webhook_email_on_error(webhook, serializer.data, webhook_type)
+def _get_endpoint_slots(url: str) -> threading.BoundedSemaphore:
+    with _endpoint_slots_lock:
+        if url not in _endpoint_slots:
+            _endpoint_slots[url] = threading.BoundedSemaphore(
+                settings.WEBHOOK_MAX_CONCURRENT_DELIVERIES_PER_ENDPOINT
+            )
+        return _endpoint_slots[url]
+
+
+def _increment_delivery_metric(metric: str) -> None:
+    with _delivery_metrics_lock:
+        _delivery_metrics[metric] += 1
 
 
 def send_failure_email(webhook, data, webhook_type, status_code=None):